@@ -0,0 +1,43 @@
+"""
+Fixture Recorder - Refresh benchmarks/fixtures from the live sites
+Fetches one ML offers page, one ML listing and one Amazon search through the
+TieredFetcher and saves the HTML the benchmark serves. Needs network.
+
+Usage:
+    python -m benchmarks.record [--query "Parafusadeira de impacto"]
+"""
+import argparse
+import os
+from urllib.parse import quote_plus
+from benchmarks.run import FIXTURES_DIR
+from src.scrapers.fetcher import TieredFetcher
+from src.scrapers import playwright_scraper as ps
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--query", default="Parafusadeira de impacto")
+    args = parser.parse_args(argv)
+
+    pages = {
+        "ml_offers.html": (ps.ML_OFFERS_URL, "ml_offers", ps.ML_MARKERS),
+        "ml_list.html": (ps.ML_LIST_URL.format(args.query.replace(" ", "-")), "ml_search", ps.ML_MARKERS),
+        "amazon_search.html": (ps.AMAZON_SEARCH_URL.format(quote_plus(args.query)), "amazon_search", ps.AMAZON_MARKERS),
+    }
+
+    fetcher = TieredFetcher()
+    try:
+        for name, (url, source, markers) in pages.items():
+            page = fetcher.fetch(url, source, markers)
+            if page is None:
+                print(f"❌ Could not fetch {url}; keeping the old {name}")
+                continue
+            with open(os.path.join(FIXTURES_DIR, name), "w", encoding="utf-8") as f:
+                f.write(page.html)
+            print(f"✅ {name}: {len(page.html) // 1024} KB via {page.tier}")
+    finally:
+        fetcher.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""
+Offline Benchmark - job() -> process_deals() against recorded pages
+Serves benchmarks/fixtures/*.html from a local HTTP server, stubs the Node
+/send-deal endpoint on the same server, and writes to a temp SQLite DB, so
+the full scrape -> filter -> dedup -> dispatch path runs with no network.
+
+Reports throughput (deals/s), per-stage latency percentiles and peak RSS,
+and compares against benchmarks/baseline.json.
+
+Usage:
+    python -m benchmarks.run                   # run and compare to baseline
+    python -m benchmarks.run --save-baseline   # record this machine's baseline
+    python -m benchmarks.run --runs 5 --output report.json
+    python -m benchmarks.run --synthetic 100000  # seeded load test, no page parsing
+
+Fixtures can be refreshed from the live sites with `python -m benchmarks.record`.
+ML affiliate link generation drives a real browser, so it is disabled here.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+
+# Path prefix -> fixture served for every page under it
+ROUTES = {
+    "/ml/": "ml_offers.html",
+    "/lista/": "ml_list.html",
+    "/amazon/": "amazon_search.html",
+}
+
+# Pipeline stages in flow order (the source is timed as "scrape")
+STAGES = ("scrape", "normalize", "observe", "exclude_negative", "dedup", "same_product", "rank", "within_budget", "affiliate_links", "dispatch")
+
+
+class FixtureServer:
+    """Recorded pages plus a /send-deal stub, on 127.0.0.1 in a background thread."""
+
+    def __init__(self, send_latency: float = 0.0):
+        self.pages = {}
+        for prefix, name in ROUTES.items():
+            with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+                self.pages[prefix] = f.read()
+        self.send_latency = send_latency
+        self.sent = 0
+        self.page_hits = 0
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                for prefix, body in server.pages.items():
+                    if self.path.startswith(prefix):
+                        with server._lock:
+                            server.page_hits += 1
+                        return self._reply(200, body, "text/html; charset=utf-8")
+                self._reply(404, b"not found", "text/plain")
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                if self.path != "/send-deal" or not payload.get("deal") or not payload.get("message"):
+                    return self._reply(400, b'{"error": "Missing deal data"}', "application/json")
+                if server.send_latency:
+                    time.sleep(server.send_latency)
+                with server._lock:
+                    server.sent += 1
+                self._reply(200, b'{"success": true, "sent_to": ["bench"]}', "application/json")
+
+            def _reply(self, status, body, content_type):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+class StageProbe:
+    """
+    Wraps the pipeline stages so each deal is timestamped as it leaves a stage.
+    A stage's latency for a deal is the time since it left the previous stage.
+    """
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self._last: Dict[str, float] = {}
+        self._last_scraped: Optional[float] = None
+
+    def reset_run(self):
+        self._last.clear()
+        self._last_scraped = time.perf_counter()
+
+    def mark(self, stage: str, deal):
+        now = time.perf_counter()
+        key = getattr(deal, "id", None) or id(deal)
+        if stage == "scrape":
+            # Time to produce this deal since the previous one came out of the source
+            self.latencies[stage].append(now - self._last_scraped)
+            self._last_scraped = now
+        elif key in self._last:
+            self.latencies[stage].append(now - self._last[key])
+        self._last[key] = now
+
+    def install(self, pipeline):
+        for stage in STAGES:
+            target = "prefetch" if stage == "scrape" else stage
+            setattr(pipeline, target, self._wrap(stage, getattr(pipeline, target)))
+
+    def _wrap(self, stage, fn):
+        def staged(*args, **kwargs):
+            for deal in fn(*args, **kwargs):
+                self.mark(stage, deal)
+                yield deal
+        staged.__name__ = fn.__name__
+        return staged
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def configure_env(base_url: str, db_path: str, synthetic: int = 0):
+    """Point the app at the fixture server before src.config is imported."""
+    if synthetic:
+        os.environ.update({"SCRAPER_BACKEND": "synthetic", "SYNTHETIC_VOLUME": str(synthetic)})
+    os.environ.update({
+        "ML_BASE_URL": f"{base_url}/ml",
+        "ML_LIST_BASE_URL": f"{base_url}/lista",
+        "AMAZON_BASE_URL": f"{base_url}/amazon",
+        "WHATSAPP_SERVICE_URL": f"{base_url}/send-deal",
+        "DB_PATH": db_path,
+        "START_SCHEDULER": "0",
+        "SCORE_WINDOW_MINUTES": "0",  # Rank within each run instead of holding deals for an hour
+        "ENABLE_SHOPEE": "0",
+    })
+
+
+def run_benchmark(runs: int, seed: int, send_latency: float, verbose: bool, synthetic: int = 0) -> Dict:
+    with FixtureServer(send_latency) as server, tempfile.TemporaryDirectory() as tmp:
+        configure_env(server.base_url, os.path.join(tmp, "warmup.db"), synthetic)
+
+        quiet = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+        with quiet:
+            from src import main, pipeline
+            from src.config import Config
+            from src.database import Database
+            from src.matching import SentProducts
+            from src.scoring import DealRanker
+
+        main.ENABLE_ML_AFFILIATE_LINKS = False
+        Config.MAX_DAILY_DEALS = 10 ** 6  # Measure the pipeline, not the daily budget
+        Config.SCORE_HEAP_SIZE = 10 ** 6
+
+        probe = StageProbe()
+        probe.install(pipeline)
+
+        elapsed = []
+        sent = 0
+        for run in range(runs):
+            random.seed(seed + run)
+            if main.synthetic.get():
+                main.synthetic.get().seed = seed + run
+            main.db = Database(os.path.join(tmp, f"run{run}.db"))
+            main._all_deals = []
+            main.ranker = DealRanker()
+            main.products = SentProducts()
+            before = server.sent
+
+            probe.reset_run()
+            quiet = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+            start = time.perf_counter()
+            with quiet:
+                main.job()
+                main.db.flush()  # Buffered sends count toward the run
+            elapsed.append(time.perf_counter() - start)
+            sent += server.sent - before
+
+        total = sum(elapsed)
+        return {
+            "backend": f"synthetic:{synthetic}" if synthetic else "fixtures",
+            "runs": runs,
+            "seed": seed,
+            "deals_sent": sent,
+            "pages_served": server.page_hits,
+            "elapsed_s": round(total, 4),
+            "deals_per_s": round(sent / total, 2) if total else 0.0,
+            "run_s": {"p50": round(percentile(elapsed, 50), 4), "max": round(max(elapsed), 4)},
+            "stages_ms": {
+                stage: {
+                    "count": len(probe.latencies[stage]),
+                    "p50": round(percentile(probe.latencies[stage], 50) * 1000, 3),
+                    "p95": round(percentile(probe.latencies[stage], 95) * 1000, 3),
+                    "p99": round(percentile(probe.latencies[stage], 99) * 1000, 3),
+                }
+                for stage in STAGES
+            },
+            "peak_rss_mb": peak_rss_mb(),
+        }
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float) -> bool:
+    """Print the deltas against the baseline; False if throughput or memory regressed past tolerance."""
+    ok = True
+    print("\n📏 Against baseline:")
+    for key, higher_is_better in (("deals_per_s", True), ("peak_rss_mb", False)):
+        old, new = baseline.get(key), report.get(key)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        regressed = change < -tolerance if higher_is_better else change > tolerance
+        ok = ok and not regressed
+        print(f"   {'❌' if regressed else '✅'} {key}: {old} -> {new} ({change:+.1%})")
+    for stage in STAGES:
+        old = baseline.get("stages_ms", {}).get(stage, {}).get("p95")
+        new = report["stages_ms"][stage]["p95"]
+        if old:
+            print(f"   {stage:>16} p95: {old}ms -> {new}ms ({(new - old) / old:+.1%})")
+    return ok
+
+
+def print_report(report: Dict):
+    print(f"\n📊 {report['deals_sent']} deals in {report['elapsed_s']}s over {report['runs']} run(s)"
+          f" -> {report['deals_per_s']} deals/s, peak RSS {report['peak_rss_mb']} MB")
+    print(f"   {'stage':>16} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for stage, stats in report["stages_ms"].items():
+        print(f"   {stage:>16} {stats['count']:>6} {stats['p50']:>9} {stats['p95']:>9} {stats['p99']:>9}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42, help="Seeds the keyword sample per run")
+    parser.add_argument("--send-latency-ms", type=float, default=0.0, help="Simulated /send-deal latency")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression vs baseline (0.2 = 20%%)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--output", help="Also write the report JSON here")
+    parser.add_argument("--synthetic", type=int, default=0, metavar="VOLUME",
+                        help="Replace the fixture pages with a seeded synthetic stream of VOLUME deals")
+    parser.add_argument("--verbose", action="store_true", help="Show the bot's own logging")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.runs, args.seed, args.send_latency_ms / 1000, args.verbose, args.synthetic)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Baseline saved to {args.baseline}")
+        return 0
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("backend", "fixtures") != report["backend"]:
+            print(f"\nℹ️ Baseline was recorded with {baseline.get('backend', 'fixtures')}; not comparing")
+            return 0
+        return 0 if compare(report, baseline, args.tolerance) else 1
+    print("\nℹ️ No baseline yet; record one with --save-baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
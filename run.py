@@ -10,12 +10,12 @@ from src.config import Config
 from src.scrapers.playwright_scraper import PlaywrightScraper
 from src.scrapers.coupon_scraper import CouponScraper
 from src.services.whatsapp import WhatsAppService
+from src.services.templates import render_deal
 from src.services.ml_link_generator import get_ml_affiliate_link
 
 app = Flask(__name__)
 whatsapp = WhatsAppService()
 scraper = PlaywrightScraper()
-coupon_scraper = CouponScraper()
 
 from src.database import Database
 
@@ -45,18 +45,18 @@ def job():
     # Filter ML deals by keywords and negative keywords
     filtered_ml_deals = []
     for deal in ml_deals:
-        title_lower = deal['title'].lower()
+        title_lower = deal.title.lower()
         
         # Check negative keywords first
         if any(neg in title_lower for neg in Config.NEGATIVE_KEYWORDS):
-            # print(f"Skipped ML deal (Negative keyword): {deal['title']}")
+            # print(f"Skipped ML deal (Negative keyword): {deal.title}")
             continue
 
         # Check if any keyword is in the title (case insensitive)
         if any(keyword.lower() in title_lower for keyword in Config.KEYWORDS):
             filtered_ml_deals.append(deal)
         else:
-            # print(f"Skipped ML deal (No keyword match): {deal['title']}")
+            # print(f"Skipped ML deal (No keyword match): {deal.title}")
             pass
             
     print(f"Found {len(ml_deals)} total ML deals, {len(filtered_ml_deals)} matched keywords.")
@@ -64,9 +64,8 @@ def job():
     # Process ML Deals
     process_deals(filtered_ml_deals)
 
-    # 1.5 Scrape Mercado Livre Coupons (New Engine)
-    print("Fetching Mercado Livre Coupon Deals...")
-    coupon_deals = coupon_scraper.scrape_ml_coupons()
+    # 1.5 Mercado Livre Coupons: taken from the offers fetched above, not a second crawl
+    coupon_deals = list(CouponScraper.couponed(ml_deals))
     print(f"Found {len(coupon_deals)} coupon deals.")
     process_deals(coupon_deals)
 
@@ -90,52 +89,34 @@ def process_deals(deals):
             return
 
         # Check negative keywords (Double check for Amazon/Scraped items)
-        if any(neg in deal['title'].lower() for neg in Config.NEGATIVE_KEYWORDS):
-            # print(f"Skipped deal (Negative keyword): {deal['title']}")
+        if any(neg in deal.title.lower() for neg in Config.NEGATIVE_KEYWORDS):
+            # print(f"Skipped deal (Negative keyword): {deal.title}")
             continue
 
         # Generate ML affiliate link if this is a Mercado Livre deal
-        if 'mercadolivre.com' in deal.get('link', ''):
-            print(f"🔗 Generating ML affiliate link for: {deal['title'][:30]}...")
-            original_link = deal['link']
-            affiliate_link = get_ml_affiliate_link(original_link)
-            if affiliate_link != original_link:
-                deal['link'] = affiliate_link
+        if 'mercadolivre.com' in deal.link:
+            print(f"🔗 Generating ML affiliate link for: {deal.title[:30]}...")
+            original_link = deal.link
+            affiliate_link = get_ml_affiliate_link(original_link, deal.title)
+            if affiliate_link and affiliate_link != original_link:
+                deal = deal.with_link(affiliate_link)
                 print(f"   ✅ Generated: {affiliate_link}")
             else:
                 print(f"   ⚠️ Using original link (generation failed)")
         
         # Check DB for duplicates
-        print(f"Processing Deal ID: {deal['id']} | Title: {deal['title'][:20]}...")
-        if not db.is_deal_sent_today(deal['id']):
+        print(f"Processing Deal ID: {deal.id} | Title: {deal.title[:20]}...")
+        if not db.is_deal_sent_today(deal.id):
             # Add to global list for dashboard
             all_deals.insert(0, deal)
             if len(all_deals) > 100:
                 all_deals.pop()
 
-            # Format message
-            rating_str = f"⭐ {deal.get('rating', 'N/A')}" if deal.get('rating') else ""
-            
-            msg = f"*OFERTA ENCONTRADA!* 🚀\n\n" \
-                  f"*{deal['title']}*\n" \
-                  f"💰 De: ~R$ {deal['original_price']}~\n" \
-                  f"🔥 *Por: R$ {deal['price']}*\n" \
-                  f"📉 Desconto: {deal['discount']}%\n" \
-                  f"{rating_str}\n\n" \
-                  f"🔗 *Link:* {deal['link']}"
-            
+            # Format message (same template as src.main) and send through the
+            # WhatsApp service client, which posts the rendered message with the deal
+            msg = render_deal(deal, "whatsapp")
             print(f"Would send to WhatsApp: \n{msg}\n")
-            
-            # Send to WhatsApp Service (Node.js)
-            try:
-                import requests
-                response = requests.post('http://localhost:3001/send-deal', json={'deal': deal})
-                if response.status_code == 200:
-                    print("✅ Sent to WhatsApp Service!")
-                else:
-                    print(f"❌ WhatsApp Service Error: {response.text}")
-            except Exception as e:
-                print(f"❌ Could not connect to WhatsApp Service: {e}")
+            whatsapp.send_deal(deal, msg)
             
             # Mark as sent in DB (Pass full deal object now)
             db.mark_deal_as_sent(deal)
@@ -143,7 +124,7 @@ def process_deals(deals):
             count = db.get_today_deals_count()
             print(f"Deals sent today: {count}/{Config.MAX_DAILY_DEALS}")
         else:
-            # print(f"Duplicate deal skipped: {deal['title']}")
+            # print(f"Duplicate deal skipped: {deal.title}")
             pass
 
 def run_scheduler():
@@ -158,7 +139,7 @@ def index():
 
 @app.route('/api/deals')
 def get_deals():
-    return jsonify(all_deals)
+    return jsonify([deal.to_json() for deal in all_deals])
 
 @app.route('/webhook', methods=['GET', 'POST'])
 def webhook():
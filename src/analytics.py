@@ -0,0 +1,277 @@
+"""
+Analytics Export - Historical deals as partitioned columnar files + rollups
+Every Config.ANALYTICS_EXPORT_MINUTES, in its own thread, the exporter:
+
+1. reads the sent_deals rows of the open months (live table over a read-only
+   connection, plus those months' archive files from src/maintenance.py) and
+   writes one file per month: analytics/sent_deals/month=YYYY-MM/part.parquet
+2. drains the scrape observations (every deal the scrapers returned, sent or
+   not, recorded by pipeline.observe) into
+   analytics/observations/date=YYYY-MM-DD/part-HHMMSS.parquet
+3. computes rollups (by source, category, discount band, hour, day) with
+   NumPy and writes analytics/rollups.json, which /api/stats serves as is.
+
+A month closes at the first export after it ends: its partition is written
+one last time and its summable totals (deals, discount and price sums per
+group) go to analytics/export_state.json. Later exports never read or write
+closed months again; the rollups are the stored totals plus the open months'.
+A closed partition keeps a send even if a later resend overwrites the live row.
+
+Files are Parquet (pyarrow, imported on the first export so startup stays
+light); without pyarrow the export fails instead of writing anything else.
+The live DB is in WAL mode, so the export's reads never block the scheduler's
+writes, and stats requests never touch the DB.
+"""
+import datetime
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from src.config import Config
+from src.filtering import any_of, title_flags
+from src.maintenance import iter_archive
+from src.models import Deal
+
+DISCOUNT_BANDS = (25, 40, 60)   # Band edges: <25, 25-39, 40-59, 60+
+BAND_LABELS = ("<25", "25-39", "40-59", "60+")
+ROLLUP_DAYS = 30                # by_day covers the last month
+GROUPS = ("by_source", "by_category", "by_discount_band", "by_hour", "by_day")
+OBSERVATION_COLUMNS = ("observed_at", "source", "id", "price", "original_price", "discount", "rating")
+_CATEGORY_PATTERNS = [(category, any_of(keywords)) for category, keywords in Config.KEYWORD_CATEGORIES.items()]
+
+
+def categorize(titles: Sequence[str]) -> List[str]:
+    """First Config.KEYWORD_CATEGORIES category each title mentions ('other' if none)."""
+    labels = np.full(len(titles), "other", dtype=object)
+    unassigned = np.ones(len(titles), dtype=bool)
+    for category, pattern in _CATEGORY_PATTERNS:
+        hits = unassigned & title_flags(titles, pattern)
+        labels[hits] = category
+        unassigned &= ~hits
+    return labels.tolist()
+
+
+def discount_bands(discounts: Sequence[float]) -> List[str]:
+    return [BAND_LABELS[i] for i in np.digitize(np.asarray(discounts, dtype=float), DISCOUNT_BANDS)]
+
+
+class ObservationLog:
+    """Bounded in-memory buffer of scraped deals, drained by each export."""
+
+    def __init__(self, limit: Optional[int] = None):
+        # Oldest observations are dropped if exports stop draining
+        self._rows = deque(maxlen=limit or Config.ANALYTICS_OBSERVATION_LIMIT)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def record(self, deal: Deal):
+        self._rows.append((time.time(), deal.source, deal.id, deal.price, deal.original_price, deal.discount, deal.rating))
+
+    def drain(self) -> List[tuple]:
+        # popleft is atomic, so rows recorded meanwhile are kept for the next drain
+        rows = []
+        while True:
+            try:
+                rows.append(self._rows.popleft())
+            except IndexError:
+                return rows
+
+
+def _write_table(base: str, columns: Dict[str, list]) -> str:
+    """Columns to base.parquet, replacing any previous file atomically."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("analytics export needs pyarrow (pip install -r requirements.txt)") from e
+    os.makedirs(os.path.dirname(base), exist_ok=True)
+    path = base + ".parquet"
+    pq.write_table(pa.table(columns), path + ".tmp", compression="zstd")
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def _month(ts: float) -> str:
+    return datetime.datetime.fromtimestamp(ts).strftime("%Y-%m")
+
+
+def _next_month(month: str) -> str:
+    year, number = map(int, month.split("-"))
+    return f"{year + number // 12:04d}-{number % 12 + 1:02d}"
+
+
+def _write_json(path: str, data: Dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+
+
+def _read_sent_deals(db_path: str, archive_dir: Optional[str], since_month: Optional[str] = None) -> List[Dict]:
+    """
+    Archive + live rows sent from since_month (YYYY-MM) on, or all of them.
+    Keyed so a row caught in both by an interrupted archive counts once.
+    """
+    rows = {(row["id"], row.get("sent_ts")): row for row in iter_archive(archive_dir, since_month)}
+    since = datetime.datetime.strptime(since_month, "%Y-%m").timestamp() if since_month else 0
+    # Read-only connection: never takes a write lock; WAL lets the scheduler write meanwhile
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        conn.row_factory = sqlite3.Row
+        for row in conn.execute('SELECT * FROM sent_deals WHERE sent_ts >= ?', (since,)):
+            row = dict(row)
+            rows[(row["id"], row["sent_ts"])] = row
+    finally:
+        conn.close()
+    return sorted(rows.values(), key=lambda row: row["sent_ts"])
+
+
+def _group(keys: Sequence[str], discount: np.ndarray, price: np.ndarray) -> Dict[str, List[float]]:
+    """{key: [deals, discount sum, price sum]} in one bincount per measure."""
+    if not len(keys):
+        return {}
+    labels, index, counts = np.unique(np.asarray(keys, dtype=object).astype(str), return_inverse=True, return_counts=True)
+    discount_sum = np.bincount(index, weights=discount)
+    price_sum = np.bincount(index, weights=price)
+    return {str(label): [int(count), float(d), float(p)]
+            for label, count, d, p in zip(labels, counts, discount_sum, price_sum)}
+
+
+def aggregate(rows: List[Dict]) -> Dict[str, Dict[str, List[float]]]:
+    """Summable totals per group; totals of disjoint row sets add up with merge()."""
+    discount = np.array([row["discount"] or 0 for row in rows], dtype=float)
+    price = np.array([row["price"] or 0 for row in rows], dtype=float)
+    moments = [datetime.datetime.fromtimestamp(row["sent_ts"]) for row in rows]
+    keys = {
+        "by_source": [row["source"] or "unknown" for row in rows],
+        "by_category": categorize([row["title"] or "" for row in rows]),
+        "by_discount_band": discount_bands(discount),
+        "by_hour": [f"{moment.hour:02d}" for moment in moments],
+        "by_day": [moment.date().isoformat() for moment in moments],
+    }
+    return {group: _group(keys[group], discount, price) for group in GROUPS}
+
+
+def merge(*totals: Dict[str, Dict[str, List[float]]]) -> Dict[str, Dict[str, List[float]]]:
+    merged: Dict[str, Dict[str, List[float]]] = {group: {} for group in GROUPS}
+    for part in totals:
+        for group, sums in part.items():
+            for key, (deals, discount_sum, price_sum) in sums.items():
+                running = merged[group].setdefault(key, [0, 0.0, 0.0])
+                running[0] += deals
+                running[1] += discount_sum
+                running[2] += price_sum
+    return merged
+
+
+def summarize(totals: Dict[str, Dict[str, List[float]]], now: Optional[float] = None) -> Dict:
+    """Averages per group from merged totals; by_day keeps the last ROLLUP_DAYS days."""
+    now = now or time.time()
+    first_day = datetime.date.fromtimestamp(now - ROLLUP_DAYS * 86400).isoformat()
+    deals = sum(count for count, _, _ in totals["by_source"].values())
+    discount_sum = sum(d for _, d, _ in totals["by_source"].values())
+    report = {"deals": deals, "avg_discount": round(discount_sum / deals, 1) if deals else None}
+    for group in GROUPS:
+        report[group] = {
+            key: {"deals": count, "avg_discount": round(d / count, 1), "avg_price": round(p / count, 2)}
+            for key, (count, d, p) in sorted(totals[group].items())
+            if group != "by_day" or key >= first_day
+        }
+    return report
+
+
+def rollups(rows: List[Dict], now: Optional[float] = None) -> Dict:
+    return summarize(aggregate(rows), now)
+
+
+def _merge_observed(previous: Dict, observations: List[tuple]) -> Dict:
+    """Running per-day/per-source scrape counts; observations are drained, so they are added, not recomputed."""
+    observed = {day: {source: dict(totals) for source, totals in sources.items()}
+                for day, sources in previous.items()}
+    for observed_at, source, _, _, _, discount, _ in observations:
+        day = datetime.date.fromtimestamp(observed_at).isoformat()
+        totals = observed.setdefault(day, {}).setdefault(source, {"seen": 0, "discount_sum": 0})
+        totals["seen"] += 1
+        totals["discount_sum"] += discount
+    return observed
+
+
+class Exporter:
+    def __init__(self, db_path: Optional[str] = None, out_dir: Optional[str] = None,
+                 archive_dir: Optional[str] = None, observations: Optional[ObservationLog] = None):
+        self.db_path = db_path or Config.DB_PATH
+        self.out_dir = out_dir or Config.ANALYTICS_DIR
+        self.archive_dir = archive_dir or Config.ARCHIVE_DIR
+        self.observations = observations or ObservationLog()
+        self.rollups_path = os.path.join(self.out_dir, "rollups.json")
+        self.state_path = os.path.join(self.out_dir, "export_state.json")
+        self._lock = threading.Lock()  # One export at a time
+        self._cache = (None, None)     # (mtime, parsed rollups) for stats()
+
+    def _closed_months(self) -> Dict[str, Dict]:
+        """Month -> frozen totals; empty before the first export (which reads all history)."""
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                return json.load(f)["closed"]
+        except FileNotFoundError:
+            return {}
+
+    def export(self, extra: Optional[Dict] = None) -> Dict:
+        """Write the open months' partitions and the rollups. `extra` (e.g. filter stats) is stored alongside."""
+        with self._lock:
+            start = time.perf_counter()
+            closed = self._closed_months()
+            current = _month(time.time())
+            rows = _read_sent_deals(self.db_path, self.archive_dir, _next_month(max(closed)) if closed else None)
+            by_month: Dict[str, List[Dict]] = {}
+            for row in rows:
+                by_month.setdefault(_month(row["sent_ts"]), []).append(row)
+            files, open_totals = [], []
+            for month, month_rows in sorted(by_month.items()):
+                names = dict.fromkeys(name for row in month_rows for name in row)  # Archived months may predate a column
+                columns = {name: [row.get(name) for row in month_rows] for name in names}
+                columns["category"] = categorize(columns["title"])
+                columns["discount_band"] = discount_bands([d or 0 for d in columns["discount"]])
+                files.append(_write_table(os.path.join(self.out_dir, "sent_deals", f"month={month}", "part"), columns))
+                if month < current:
+                    closed[month] = aggregate(month_rows)  # Over: this was its last write
+                else:
+                    open_totals.append(aggregate(month_rows))
+
+            observations = self.observations.drain()
+            by_day: Dict[str, List[tuple]] = {}
+            for observation in observations:
+                by_day.setdefault(datetime.date.fromtimestamp(observation[0]).isoformat(), []).append(observation)
+            stamp = datetime.datetime.now().strftime("%H%M%S")
+            for day, day_rows in by_day.items():
+                columns = {name: list(values) for name, values in zip(OBSERVATION_COLUMNS, zip(*day_rows))}
+                files.append(_write_table(os.path.join(self.out_dir, "observations", f"date={day}", f"part-{stamp}"), columns))
+
+            previous = self.stats() or {}
+            report = {
+                "generated_at": time.time(),
+                "sent": summarize(merge(*closed.values(), *open_totals)),
+                "observed": _merge_observed(previous.get("observed", {}), observations),
+                **(extra or {}),
+            }
+            _write_json(self.state_path, {"closed": closed})
+            _write_json(self.rollups_path, report)
+            print(f"📈 Analytics export: {len(rows)} sent read, {len(observations)} observed, "
+                  f"{len(files)} file(s) in {time.perf_counter() - start:.2f}s")
+            return report
+
+    def stats(self) -> Optional[Dict]:
+        """Latest rollups (re-read only when the file changes); None before the first export."""
+        try:
+            mtime = os.path.getmtime(self.rollups_path)
+        except OSError:
+            return None
+        if self._cache[0] != mtime:
+            with open(self.rollups_path, encoding="utf-8") as f:
+                self._cache = (mtime, json.load(f))
+        return self._cache[1]
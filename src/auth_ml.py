@@ -1,24 +1,32 @@
 #!/usr/bin/env python3
 """
 Mercado Livre Authentication Script
-Opens a browser for manual login and saves session cookies for affiliate link generation.
+Opens a browser for manual login and saves the session (Playwright storage
+state) for affiliate link generation. Run once per affiliate account:
+
+    python -m src.auth_ml            # account "default"
+    python -m src.auth_ml conta2     # another account for the rotation pool
 """
 from playwright.sync_api import sync_playwright
-import json
 import os
+import sys
 
-COOKIES_FILE = os.path.join(os.path.dirname(__file__), '..', 'ml_auth.json')
+ROOT_DIR = os.path.join(os.path.dirname(__file__), '..')
 ML_AFFILIATE_URL = "https://afiliados.mercadolivre.com.br/"
 
-def capture_ml_session():
-    """Opens browser for ML login and saves cookies."""
+def capture_ml_session(account: str = "default"):
+    """Opens browser for ML login and saves the account's storage state."""
+    from src.config import Config
+    accounts_dir = os.path.join(ROOT_DIR, Config.ML_ACCOUNTS_DIR)
+    state_file = os.path.join(accounts_dir, f"{account}.json")
+    
     print("🔐 Mercado Livre Authentication Script")
     print("=" * 50)
     print("\nThis script will:")
     print("1. Open a Chrome window")
     print("2. Navigate to ML Affiliate Portal")
     print("3. Wait for you to log in")
-    print("4. Save your session cookies\n")
+    print(f"4. Save your session as account '{account}'\n")
     
     input("Press ENTER to start...")
     
@@ -39,21 +47,18 @@ def capture_ml_session():
         
         input("Press ENTER once you've successfully logged in...")
         
-        # Get cookies
-        cookies = context.cookies()
-        
-        # Save to file
-        with open(COOKIES_FILE, 'w') as f:
-            json.dump(cookies, f, indent=2)
+        # Cookies + local storage, loaded as-is by the session pool
+        os.makedirs(accounts_dir, exist_ok=True)
+        context.storage_state(path=state_file)
         
-        print(f"\n✅ Session saved to: {COOKIES_FILE}")
+        print(f"\n✅ Session saved to: {state_file}")
         print("   The bot can now generate affiliate links automatically!\n")
         
         browser.close()
 
 if __name__ == "__main__":
     try:
-        capture_ml_session()
+        capture_ml_session(sys.argv[1] if len(sys.argv) > 1 else "default")
     except KeyboardInterrupt:
         print("\n\n❌ Cancelled by user.")
     except Exception as e:
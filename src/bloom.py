@@ -0,0 +1,105 @@
+"""
+Bloom Filter - In-memory "have we ever sent this id?" pre-check
+Seeded from sent_deals when the Database opens and updated on every mark, so
+an id that was never sent (most of what the scrapers return) is answered
+without touching SQLite. A "maybe" still goes to the DB, so false positives
+only cost the lookup we would have done anyway.
+
+Sized with the usual formulas for Config.BLOOM_CAPACITY ids at
+Config.BLOOM_ERROR_RATE; once the count passes the capacity the owner rebuilds
+it twice as large.
+"""
+import hashlib
+import math
+import threading
+from typing import Dict, Iterable, Optional
+import numpy as np
+from src.config import Config
+
+_UINT64 = (1 << 64) - 1
+
+
+class BloomFilter:
+    def __init__(self, capacity: Optional[int] = None, error_rate: Optional[float] = None):
+        self.capacity = max(int(capacity or Config.BLOOM_CAPACITY), 1)
+        self.error_rate = error_rate or Config.BLOOM_ERROR_RATE
+        # m = -n ln p / (ln 2)^2 bits, k = m/n ln 2 hashes
+        self.size = max(8, math.ceil(-self.capacity * math.log(self.error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        self.count = 0
+        self.checks = 0
+        self.skipped = 0   # Checks answered "definitely not" (no DB lookup)
+        self._steps = np.arange(self.hashes, dtype=np.uint64)
+        self._lock = threading.Lock()
+
+    def _positions(self, keys: Iterable[str]) -> np.ndarray:
+        """(len(keys), k) bit positions, double hashing two 64-bit halves of one digest per key."""
+        digests = [hashlib.blake2b(key.encode(), digest_size=16).digest() for key in keys]
+        h1 = np.array([int.from_bytes(d[:8], "little") for d in digests], dtype=np.uint64)
+        h2 = np.array([int.from_bytes(d[8:], "little") | 1 for d in digests], dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            return (h1[:, None] + self._steps[None, :] * h2[:, None]) % np.uint64(self.size)
+
+    def add(self, key: str):
+        self.update([key])
+
+    def update(self, keys: Iterable[str]):
+        """Add many ids with one scatter into the bit array."""
+        keys = list(keys)
+        if not keys:
+            return
+        positions = self._positions(keys).ravel()
+        with self._lock:
+            np.bitwise_or.at(self.bits, positions >> np.uint64(3),
+                             np.left_shift(1, positions & np.uint64(7)).astype(np.uint8))
+            self.count += len(keys)
+
+    def __contains__(self, key: str) -> bool:
+        # Plain ints for one key (NumPy call overhead would dominate), wrapped like uint64
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        bits = self.bits
+        found = True
+        for i in range(self.hashes):
+            position = ((h1 + i * h2) & _UINT64) % self.size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                found = False
+                break
+        self._counted(1, 0 if found else 1)
+        return found
+
+    def contains_many(self, keys: Iterable[str]) -> np.ndarray:
+        """Bool per key: possibly seen (True) or definitely new (False)."""
+        keys = list(keys)
+        if not keys:
+            return np.zeros(0, dtype=bool)
+        positions = self._positions(keys)
+        found = np.all(self.bits[positions >> np.uint64(3)] & np.left_shift(1, positions & np.uint64(7)), axis=1)
+        self._counted(len(keys), int(len(keys) - found.sum()))
+        return found
+
+    def _counted(self, checks: int, skipped: int):
+        with self._lock:
+            self.checks += checks
+            self.skipped += skipped
+
+    @property
+    def full(self) -> bool:
+        return self.count > self.capacity
+
+    def false_positive_rate(self) -> float:
+        """Expected rate at the current fill: (1 - e^(-kn/m))^k."""
+        return (1 - math.exp(-self.hashes * self.count / self.size)) ** self.hashes
+
+    def stats(self) -> Dict:
+        return {
+            "ids": self.count,
+            "capacity": self.capacity,
+            "memory_kb": round(self.bits.nbytes / 1024, 1),
+            "hashes": self.hashes,
+            "false_positive_rate": round(self.false_positive_rate(), 6),
+            "checks": self.checks,
+            "db_lookups_skipped": self.skipped,
+        }
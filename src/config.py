@@ -13,37 +13,45 @@ class Config:
     WHATSAPP_TOKEN = os.getenv("WHATSAPP_TOKEN", "")
     WHATSAPP_PHONE_ID = os.getenv("WHATSAPP_PHONE_ID", "")
     FACEBOOK_GROUP_ID = os.getenv("FACEBOOK_GROUP_ID", "")
+    WHATSAPP_SERVICE_URL = os.getenv("WHATSAPP_SERVICE_URL", "http://localhost:3001/send-deal")  # Node relay
     
     # Filtering Rules
     MIN_DISCOUNT = 15  # User requested to widen the cut (was 25)
     MIN_RATING = 4.0   # User requested min 4.0 stars
-    MAX_DAILY_DEALS = 15 # User requested max 15 deals per day
+    MAX_DAILY_DEALS = int(os.getenv("MAX_DAILY_DEALS", "15")) # User requested max 15 deals per day
     
-    # Search Keywords (Alfa Ofertas Niche)
-    KEYWORDS = [
+    # Search Keywords (Alfa Ofertas Niche), grouped by category for scoring
+    KEYWORD_CATEGORIES = {
         # --- Category A: Tools & Hardware (Primary) ---
-        "Jogo de ferramentas", "Kit ferramentas completo", "Maleta de ferramentas", "Caixa de ferramentas", "Ferramentas manuais",
-        "Parafusadeira e Furadeira", "Parafusadeira de impacto", "Martelete rompedor", "Esmerilhadeira angular",
-        "Serra tico tico", "Serra circular", "Lixadeira orbital", "Nível a laser", "Trena a laser", "Medidor de distância",
-        
+        "tools": [
+            "Jogo de ferramentas", "Kit ferramentas completo", "Maleta de ferramentas", "Caixa de ferramentas", "Ferramentas manuais",
+            "Parafusadeira e Furadeira", "Parafusadeira de impacto", "Martelete rompedor", "Esmerilhadeira angular",
+            "Serra tico tico", "Serra circular", "Lixadeira orbital", "Nível a laser", "Trena a laser", "Medidor de distância",
+        ],
         # --- Category B: Automotive & Garage ---
-        "Aspirador automotivo portátil", "Compressor de ar portátil", "Mini compressor pneu", "Auxiliar de partida", "Jump starter",
-        "Carregador de bateria carro", "Macaco hidráulico garrafa", "Macaco jacaré", "Chave de roda cruz",
-        "Kit limpeza automotiva", "Cera automotiva", "Lavadora de alta pressão", "Organizador de garagem", "Painel de ferramentas",
-        
+        "automotive": [
+            "Aspirador automotivo portátil", "Compressor de ar portátil", "Mini compressor pneu", "Auxiliar de partida", "Jump starter",
+            "Carregador de bateria carro", "Macaco hidráulico garrafa", "Macaco jacaré", "Chave de roda cruz",
+            "Kit limpeza automotiva", "Cera automotiva", "Lavadora de alta pressão", "Organizador de garagem", "Painel de ferramentas",
+        ],
         # --- Category C: Tactical, Outdoor & EDC ---
-        "Canivete tático", "Canivete dobrável", "Faca tática", "Faca sobrevivência", 
-        "Lanterna tática", "Mochila tática", "Mochila militar", "Bornal de perna", "Pochete tática", "Luva tática",
-        "Pederneira", "Filtro de água portátil", "Kit primeiros socorros tático", "Isqueiro plasma", "Maçarico portátil",
-        
+        "tactical": [
+            "Canivete tático", "Canivete dobrável", "Faca tática", "Faca sobrevivência",
+            "Lanterna tática", "Mochila tática", "Mochila militar", "Bornal de perna", "Pochete tática", "Luva tática",
+            "Pederneira", "Filtro de água portátil", "Kit primeiros socorros tático", "Isqueiro plasma", "Maçarico portátil",
+        ],
         # --- Category D: Rugged Tech & Utility ---
-        "Power bank robusto", "Carregador portátil alta capacidade", "Smartwatch robusto", "Caixa de som bluetooth resistente",
-        "Cabos reforçados", "Suporte celular moto metálico", "Suporte celular carro robusto",
-        
+        "tech": [
+            "Power bank robusto", "Carregador portátil alta capacidade", "Smartwatch robusto", "Caixa de som bluetooth resistente",
+            "Cabos reforçados", "Suporte celular moto metálico", "Suporte celular carro robusto",
+        ],
         # --- Category E: Lifestyle & BBQ ---
-        "Kit churrasco inox", "Faca do chef", "Faca churrasco artesanal", "Tábua de carne rústica",
-        "Garrafa térmica", "Copo térmico", "Cooler", "Caixa térmica"
-    ]
+        "lifestyle": [
+            "Kit churrasco inox", "Faca do chef", "Faca churrasco artesanal", "Tábua de carne rústica",
+            "Garrafa térmica", "Copo térmico", "Cooler", "Caixa térmica",
+        ],
+    }
+    KEYWORDS = [keyword for keywords in KEYWORD_CATEGORIES.values() for keyword in keywords]
     
     # Negative Keywords (Exclude results containing these)
     NEGATIVE_KEYWORDS = [
@@ -51,16 +59,139 @@ class Config:
     ]
     
     # Brand Filtering (Quality Gate)
-    # Tier 1: Pro/High Demand
-    # Tier 2: Prosumer/Reliable
     # Others: Auto/Tech/Lifestyle
-    PREFERRED_BRANDS = [
-        "Bosch", "Makita", "DeWalt", "Stanley", "Vonder", "Worx", "Black+Decker",
-        "Anker", "Baseus", "JBL", "WAP", "Karcher", "Vonixx", "3M", "Coleman"
+    BRAND_TIERS = [
+        ["Bosch", "Makita", "DeWalt", "Stanley", "Vonder", "Worx", "Black+Decker"],     # Tier 1: Pro/High Demand
+        ["Anker", "Baseus", "JBL", "WAP", "Karcher", "Vonixx", "3M", "Coleman"],        # Tier 2: Prosumer/Reliable
     ]
+    PREFERRED_BRANDS = [brand for tier in BRAND_TIERS for brand in tier]
     
+    # Marketplace Endpoints (overridable so benchmarks can serve recorded pages locally)
+    ML_BASE_URL = os.getenv("ML_BASE_URL", "https://www.mercadolivre.com.br")
+    ML_LIST_BASE_URL = os.getenv("ML_LIST_BASE_URL", "https://lista.mercadolivre.com.br")
+    AMAZON_BASE_URL = os.getenv("AMAZON_BASE_URL", "https://www.amazon.com.br")
+    DB_PATH = os.getenv("DB_PATH", "deals.db")
+    START_SCHEDULER = os.getenv("START_SCHEDULER", "1") == "1"  # Off when src.main is imported as a library
+    RUN_ON_START = os.getenv("RUN_ON_START", "1") == "1"        # First job right after the worker warms up
+
+    # Lean Page Loading (Playwright route interception)
+    # Images are read from data-src/src attributes, so the bytes are never needed.
+    BLOCK_RESOURCES = os.getenv("BLOCK_RESOURCES", "1") == "1"
+    BLOCKED_RESOURCE_TYPES = ["image", "media", "font"]
+    BLOCKED_URL_PATTERNS = [
+        "google-analytics.com", "googletagmanager.com", "doubleclick.net",
+        "googlesyndication.com", "facebook.net", "hotjar.com", "clarity.ms",
+        "amazon-adsystem.com", "melidata", "mercadolibre.com/tracks", "/pixel"
+    ]
+    SCROLL_MAX_ROUNDS = 10      # Upper bound on lazy-load scrolls per page
+    SCROLL_SETTLE_MS = 800      # How long to wait for new cards after each scroll
+
+    # Fetch Tiers (pooled HTTP first, browser only when HTTP is blocked)
+    HTTP_TIMEOUT = 15
+    HTTP_POOL_SIZE = 10
+    FETCH_STATS_WINDOW = 20        # Outcomes remembered per source/tier
+    FETCH_MIN_SAMPLES = 3          # Don't judge a tier before this many tries
+    FETCH_MIN_SUCCESS_RATE = 0.5   # Below this, the tier is skipped for that source...
+    FETCH_REPROBE_EVERY = 10       # ...but retried every N fetches in case it recovered
+    BLOCK_MARKERS = ["validatecaptcha", "account-verification", "suspicious-traffic", "negative_traffic"]
+
+    # Crawl Depth (pages are streamed one at a time, so memory doesn't grow with depth)
+    CRAWL_MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", "5"))    # ML lightning offers
+    SEARCH_MAX_PAGES = int(os.getenv("SEARCH_MAX_PAGES", "2"))  # ML listing per keyword
+
+    # Streaming Pipeline
+    PIPELINE_BUFFER_SIZE = 20   # Deals scraped ahead of link generation/dispatch
+
+    # Shopee Affiliate API (GraphQL, no browser)
+    SHOPEE_APP_ID = os.getenv("SHOPEE_APP_ID", "")
+    SHOPEE_SECRET = os.getenv("SHOPEE_SECRET", "")
+    SHOPEE_MAX_PAGES = int(os.getenv("SHOPEE_MAX_PAGES", "2"))  # Per keyword
+    SHOPEE_PAGE_LIMIT = 20          # Products per page
+    SHOPEE_WORKERS = 3              # Keyword queries in flight at once
+    SHOPEE_REQUESTS_PER_SECOND = 2  # Shared by all workers
+    SHOPEE_SHORTLINK_BATCH = 20     # Links per generateShortLink request
+    SHOPEE_SUB_ID = "alfaofertas"
+    SHOPEE_CACHE_TTL = int(os.getenv("SHOPEE_CACHE_TTL", "900"))  # Capped by each offer's periodEndTime
+
+    # Coupons (read from offer/search card badges, no separate crawl)
+    COUPON_TTL_HOURS = 24       # Cards don't show expiry; assume a badge holds for a day
+    COUPON_CACHE_SIZE = 5000
+
+    # Scraper Backend: "live" (marketplaces) or "synthetic" (seeded load-test stream)
+    SCRAPER_BACKEND = os.getenv("SCRAPER_BACKEND", "live")
+    SYNTHETIC_SEED = int(os.getenv("SYNTHETIC_SEED", "42"))
+    SYNTHETIC_VOLUME = int(os.getenv("SYNTHETIC_VOLUME", "1000"))  # Deals per job, 10^3-10^6
+    SYNTHETIC_DUPLICATE_RATIO = float(os.getenv("SYNTHETIC_DUPLICATE_RATIO", "0.2"))
+    SYNTHETIC_NEGATIVE_RATIO = 0.05   # Titles with a negative keyword
+    SYNTHETIC_DISCOUNT_RATIO = 0.4    # Deals at or above MIN_DISCOUNT
+
+    # Profiling (see src/profiling.py; also armed at runtime via /admin/profile)
+    PROFILE_MODE = os.getenv("PROFILE_MODE", "")        # "cprofile" or "sample"
+    PROFILE_RUNS = int(os.getenv("PROFILE_RUNS", "1"))  # How many upcoming jobs to profile
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+    PROFILE_SAMPLE_INTERVAL_MS = 5
+    PROFILE_KEEP = 20           # Older profile files are deleted
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")  # Admin endpoints are off while empty
+
+    # ML Affiliate Sessions (see src/services/ml_session.py)
+    ML_ACCOUNTS_DIR = os.getenv("ML_ACCOUNTS_DIR", "ml_accounts")  # <account>.json storage states
+    ML_AUTH_FILE = "ml_auth.json"       # Legacy single-account cookie list, read as "default"
+    ML_SESSION_MAX_FAILURES = 2         # Consecutive failed links before an account cools down
+    ML_SESSION_COOLDOWN = 900           # Seconds an account rests (likely rate limited)
+    ML_SESSION_SAVE_INTERVAL = 600      # Refreshed cookies are written back at most this often
+
+    # Deal Scoring (see src/scoring.py): candidates wait in a bounded heap and
+    # the best of each window get the daily budget, spread over the rest of the day
+    SCORE_WINDOW_MINUTES = int(os.getenv("SCORE_WINDOW_MINUTES", "60"))  # 0 = release at the end of every job
+    SCORE_HEAP_SIZE = 200       # Candidates held per window; the lowest scores are evicted
+    SCORE_BATCH_SIZE = 50       # Deals scored (and price-history looked up) together
+    SCORE_WEIGHTS = {"discount": 0.4, "rating": 0.2, "brand": 0.15, "price_drop": 0.15, "category": 0.1}
+    BRAND_TIER_SCORES = [1.0, 0.6]  # Per BRAND_TIERS entry; other brands score 0
+    CATEGORY_WEIGHTS = {"tools": 1.0, "automotive": 0.9, "tactical": 0.8, "tech": 0.7, "lifestyle": 0.6}
+    CATEGORY_DEFAULT_WEIGHT = 0.5   # Titles matching no keyword
+    SCORE_MAX_DISCOUNT = 70     # Discounts at or above this score 1
+    SCORE_MAX_PRICE_DROP = 0.3  # Price 30% below the last sent price scores 1
+
+    # Dedup Policy (see src/dedup.py): cooldowns run from the send time, not the calendar day
+    DEDUP_COOLDOWN_HOURS = {
+        "Mercado Livre": 72,
+        "Mercado Livre Cupom": 24,  # Coupons rotate daily
+        "Amazon": 168,
+        "Shopee": 72,
+    }
+    DEDUP_DEFAULT_COOLDOWN_HOURS = 72
+    DEDUP_PRICE_DROP = 0.10     # Resend inside the cooldown only if 10%+ cheaper than last sent
+    DEDUP_BATCH_SIZE = 50       # Deals checked against history per query
+
+    # Sent-deal writes (see src/writer.py): group-committed instead of one transaction per send
+    WRITE_BATCH_SIZE = 20       # Pending rows that force a flush
+    WRITE_FLUSH_SECONDS = float(os.getenv("WRITE_FLUSH_SECONDS", "5"))  # Longest a send waits to be written
+
+    # DB Maintenance (see src/maintenance.py)
+    RETENTION_DAYS = int(os.getenv("RETENTION_DAYS", "90"))  # Older sends move to the archive (never below the longest dedup cooldown)
+    ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "archive")
+    MAINTENANCE_TIME = os.getenv("MAINTENANCE_TIME", "04:00")  # Daily, local time
+
+    # Analytics Export (see src/analytics.py); /api/stats serves the rollups
+    ANALYTICS_DIR = os.getenv("ANALYTICS_DIR", "analytics")
+    ANALYTICS_EXPORT_MINUTES = int(os.getenv("ANALYTICS_EXPORT_MINUTES", "60"))
+    ANALYTICS_OBSERVATION_LIMIT = 100000  # Scraped deals buffered between exports
+
+    # Dedup Pre-check (see src/bloom.py): ids never sent skip the SQLite lookup
+    BLOOM_CAPACITY = int(os.getenv("BLOOM_CAPACITY", "500000"))  # Doubled automatically when exceeded
+    BLOOM_ERROR_RATE = 0.01         # ~600 KB at full capacity
+
+    # Cross-source Product Matching (see src/matching.py)
+    MATCH_THRESHOLD = 0.5   # Estimated title-token Jaccard for listings without comparable model numbers
+    MATCH_LSH_BANDS = 20    # 20 bands x 3 rows: ~93% recall at 0.5 similarity, ~15% candidates at 0.2
+    MATCH_LSH_ROWS = 3
+
+    # Message Templates
+    TEMPLATE_CACHE_SIZE = 256   # Rendered messages kept per (deal, channel)
+
     # Feature Flags
     ENABLE_COUPONS = False  # Paused per Phase 1 directive
+    ENABLE_SHOPEE = os.getenv("ENABLE_SHOPEE", "1") == "1" and bool(SHOPEE_APP_ID and SHOPEE_SECRET)
 
     # Search Settings
     # ...
@@ -0,0 +1,98 @@
+"""
+Coupon Cache - Coupon metadata keyed by item id.
+Coupon badges are read from the same offer/search cards the scrapers already
+fetch; remembering them here makes the effective discount a lookup instead
+of another crawl of the coupon pages. Only used while Config.ENABLE_COUPONS
+is on.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import replace
+from typing import NamedTuple, Optional
+from src.config import Config
+from src.models import Deal
+from src.pricing import parse_cents, to_reais
+
+_PERCENT_RE = re.compile(r'(\d{1,2})\s*%')
+_AMOUNT_RE = re.compile(r'R\$\s*(\d[\d.,]*)')
+
+
+class Coupon(NamedTuple):
+    code: str          # Badge text as shown on the card ("Cupom 10% OFF")
+    percent: int       # Percent off, 0 for fixed-amount coupons
+    amount: float      # Fixed R$ off, 0 for percent coupons
+    expires_at: float  # Unix time
+
+
+def parse_coupon(text: str, ttl: Optional[float] = None) -> Optional[Coupon]:
+    """Badge text -> Coupon, or None when it carries no usable discount."""
+    text = (text or "").strip()
+    if not text:
+        return None
+    expires_at = time.time() + (ttl if ttl is not None else Config.COUPON_TTL_HOURS * 3600)
+
+    match = _PERCENT_RE.search(text)
+    if match:
+        return Coupon(text, int(match.group(1)), 0.0, expires_at)
+    match = _AMOUNT_RE.search(text)
+    if match:
+        amount = to_reais(parse_cents(match.group(1)))
+        return Coupon(text, 0, amount, expires_at)
+    return None
+
+
+def effective_discount(deal: Deal, coupon: Coupon) -> int:
+    """Discount against the original price once the coupon is applied on top of the current price."""
+    price = deal.price * (1 - coupon.percent / 100) - coupon.amount
+    if price <= 0 or deal.original_price <= 0:
+        return deal.discount
+    return max(deal.discount, min(round((1 - price / deal.original_price) * 100), 100))
+
+
+class CouponCache:
+    """Thread-safe item id -> Coupon map with expiry and a size bound (oldest evicted first)."""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or Config.COUPON_CACHE_SIZE
+        self._coupons: "OrderedDict[str, Coupon]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._coupons)
+
+    def put(self, item_id: str, coupon: Coupon):
+        with self._lock:
+            self._coupons[item_id] = coupon
+            self._coupons.move_to_end(item_id)
+            while len(self._coupons) > self.max_entries:
+                self._coupons.popitem(last=False)
+
+    def get(self, item_id: str) -> Optional[Coupon]:
+        with self._lock:
+            coupon = self._coupons.get(item_id)
+            if coupon and coupon.expires_at <= time.time():
+                del self._coupons[item_id]
+                return None
+            return coupon
+
+    def apply(self, deal: Deal) -> Deal:
+        """
+        Remember the deal's coupon badge (if any), or fill in a cached one.
+        The card's own discount is left as is, so the message's price and
+        discount still match; the coupon is shown on its own line.
+        """
+        coupon = parse_coupon(deal.coupon) if deal.coupon else None
+        if coupon:
+            self.put(deal.id, coupon)
+        else:
+            coupon = self.get(deal.id)
+        if coupon is None or coupon.code == deal.coupon:
+            return deal
+        return replace(deal, coupon=coupon.code)
+
+    def discount(self, deal: Deal) -> int:
+        """Effective discount with the deal's coupon applied, for the MIN_DISCOUNT gate."""
+        coupon = parse_coupon(deal.coupon) if deal.coupon else None
+        return effective_discount(deal, coupon) if coupon else deal.discount
@@ -1,62 +1,59 @@
 import sqlite3
 import datetime
-import os
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from src.bloom import BloomFilter
+from src.config import Config
+from src.migrations import migrate
+from src.models import Deal
+from src.writer import WriteBuffer
 
 class Database:
+    # Column order shared with Deal.to_row()
+    ROW_COLUMNS = ("id", "title", "source", "price", "original_price", "discount",
+                   "rating", "seller", "link", "image", "sent_at", "sent_ts")
+
+    # Upsert; a resend records its new price, which the next price-drop check compares against
+    UPSERT_SQL = '''
+        INSERT INTO sent_deals (id, title, source, price, original_price, discount, rating, seller, link, image, sent_at, sent_ts)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            sent_at = excluded.sent_at, sent_ts = excluded.sent_ts, price = excluded.price,
+            original_price = excluded.original_price, discount = excluded.discount, link = excluded.link
+    '''
+    _PRICE, _SENT_AT, _SENT_TS = ROW_COLUMNS.index("price"), ROW_COLUMNS.index("sent_at"), ROW_COLUMNS.index("sent_ts")
+
     def __init__(self, db_path="deals.db"):
         self.db_path = db_path
         self._init_db()
+        self.bloom = self._load_bloom()
+        # Sent-deal upserts are group-committed (see src/writer.py)
+        self.writes = WriteBuffer(db_path, self.UPSERT_SQL)
+
+    def _load_bloom(self, capacity: Optional[int] = None) -> BloomFilter:
+        """Every id in sent_deals, so never-sent ids are answered from memory."""
+        with sqlite3.connect(self.db_path) as conn:
+            ids = [row[0] for row in conn.execute('SELECT id FROM sent_deals')]
+        bloom = BloomFilter(max(capacity or Config.BLOOM_CAPACITY, len(ids) * 2))
+        bloom.update(ids)
+        stats = bloom.stats()
+        print(f"🌸 Dedup filter: {stats['ids']} ids, {stats['memory_kb']} KB, ~{stats['false_positive_rate']:.2%} false positives")
+        return bloom
 
     def _init_db(self):
+        # Versioned, additive schema changes (see src/migrations.py); existing rows are kept
+        migrate(self.db_path)
         with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            # Table to track sent deals
-            # Dropping table to apply schema changes (Dev only)
-            # cursor.execute('DROP TABLE IF EXISTS sent_deals') 
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS sent_deals (
-                    id TEXT PRIMARY KEY,
-                    title TEXT,
-                    source TEXT,
-                    price REAL,
-                    original_price REAL,
-                    discount INTEGER,
-                    rating REAL,
-                    seller TEXT,
-                    link TEXT,
-                    image TEXT,
-                    sent_at DATE
-                )
-            ''')
-            
-            # Check if new columns exist, if not, we might need to migrate or drop
-            # For simplicity in this session, we'll catch the error on insert or user can delete db
-            try:
-                cursor.execute('SELECT source FROM sent_deals LIMIT 1')
-            except sqlite3.OperationalError:
-                print("Migrating DB: Dropping old table to update schema...")
-                cursor.execute('DROP TABLE sent_deals')
-                cursor.execute('''
-                    CREATE TABLE sent_deals (
-                        id TEXT PRIMARY KEY,
-                        title TEXT,
-                        source TEXT,
-                        price REAL,
-                        original_price REAL,
-                        discount INTEGER,
-                        rating REAL,
-                        seller TEXT,
-                        link TEXT,
-                        image TEXT,
-                        sent_at DATE
-                    )
-                ''')
-            
-            conn.commit()
+            # Readers (dashboard, analytics export) no longer block the sends' commits
+            conn.execute('PRAGMA journal_mode=WAL')
 
     def is_deal_sent_today(self, deal_id: str) -> bool:
+        if deal_id not in self.bloom:
+            return False  # Never sent: no lookup needed
         today = datetime.date.today().isoformat()
+        pending = self.writes.pending().get(deal_id)
+        if pending:
+            return pending[self._SENT_AT] == today
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute('SELECT sent_at FROM sent_deals WHERE id = ?', (deal_id,))
@@ -70,33 +67,86 @@ class Database:
                     return False 
             return False
 
-    def mark_deal_as_sent(self, deal: dict):
+    def mark_deal_as_sent(self, deal: Deal, sync: bool = False):
+        """
+        Record a send. The row is buffered and group-committed; sync=True writes
+        it (with anything pending) before returning, for sends that must not be
+        lost, like the one that reaches the daily limit.
+        """
         today = datetime.date.today().isoformat()
+        deal = Deal.coerce(deal)
+        self.writes.add(deal.id, deal.to_row(today, time.time()), sync=sync)
+        self.bloom.add(deal.id)
+        if self.bloom.full:
+            self.flush()  # The rebuild reads ids from the table
+            self.bloom = self._load_bloom(self.bloom.capacity * 2)
+
+    def flush(self) -> int:
+        """Write buffered sends now."""
+        return self.writes.flush()
+
+    def get_history(self, deal_ids: Iterable[str]) -> Dict[str, Tuple[Optional[float], Optional[float]]]:
+        """Deal id -> (last sent unix time, last sent price), for ids sent before; one indexed query."""
+        ids = list(deal_ids)
+        if ids:
+            ids = [deal_id for deal_id, maybe in zip(ids, self.bloom.contains_many(ids)) if maybe]
+        if not ids:
+            return {}
+        pending = self.writes.pending()
+        history = {deal_id: (pending[deal_id][self._SENT_TS], pending[deal_id][self._PRICE])
+                   for deal_id in ids if deal_id in pending}
+        ids = [deal_id for deal_id in ids if deal_id not in history]
+        if not ids:
+            return history
+        placeholders = ",".join("?" * len(ids))
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
-            # Upsert
-            cursor.execute('''
-                INSERT INTO sent_deals (id, title, source, price, original_price, discount, rating, seller, link, image, sent_at) 
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(id) DO UPDATE SET sent_at = ?
-            ''', (
-                deal['id'], deal['title'], deal.get('source', ''), deal['price'], deal.get('original_price', 0),
-                deal['discount'], deal.get('rating', 0), deal.get('seller', ''), deal['link'], deal.get('image', ''),
-                today, today
-            ))
-            conn.commit()
+            cursor.execute(f'SELECT id, sent_ts, price FROM sent_deals WHERE id IN ({placeholders})', ids)
+            history.update((deal_id, (sent_ts, price)) for deal_id, sent_ts, price in cursor.fetchall())
+        return history
+
+    def get_last_prices(self, deal_ids: Iterable[str]) -> Dict[str, float]:
+        """Price each deal was last sent at; deals never sent are left out."""
+        return {deal_id: price for deal_id, (_, price) in self.get_history(deal_ids).items() if price}
 
     def get_today_deals_count(self) -> int:
+        """Includes buffered sends, so the daily limit holds before they are written."""
+        today = datetime.date.today().isoformat()
+        pending = [deal_id for deal_id, row in self.writes.pending().items() if row[self._SENT_AT] == today]
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            # Pending ids already in the table (a resend) are counted once
+            placeholders = ",".join("?" * len(pending))
+            cursor.execute(f'SELECT COUNT(*) FROM sent_deals WHERE sent_at = ? AND id NOT IN ({placeholders})',
+                           (today, *pending))
+            return cursor.fetchone()[0] + len(pending)
+
+    def get_today_deals(self) -> List[Deal]:
+        self.flush()
         today = datetime.date.today().isoformat()
         with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
-            cursor.execute('SELECT COUNT(*) FROM sent_deals WHERE sent_at = ?', (today,))
-            return cursor.fetchone()[0]
+            cursor.execute('SELECT * FROM sent_deals WHERE sent_at = ?', (today,))
+            deals = []
+            for row in cursor.fetchall():
+                try:
+                    deals.append(Deal.from_dict(dict(row)))
+                except (TypeError, ValueError):
+                    continue  # Legacy rows missing required fields
+            return deals
 
-    def get_recent_deals(self, limit=50):
+    def get_recent_deals(self, limit=50) -> List[Deal]:
+        self.flush()
         with sqlite3.connect(self.db_path) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             cursor.execute('SELECT * FROM sent_deals ORDER BY sent_at DESC, rowid DESC LIMIT ?', (limit,))
             rows = cursor.fetchall()
-            return [dict(row) for row in rows]
+            deals = []
+            for row in rows:
+                try:
+                    deals.append(Deal.from_dict(dict(row)))
+                except (TypeError, ValueError):
+                    continue  # Legacy rows missing required fields
+            return deals
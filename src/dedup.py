@@ -0,0 +1,55 @@
+"""
+Dedup Policy - When may an item that was already sent go out again?
+Each source has a cooldown (Config.DEDUP_COOLDOWN_HOURS) counted from the
+exact send time, not the calendar day, so 23:59 -> 00:01 is no longer a
+fresh start. Inside the cooldown an item is resent only if its price fell by
+at least Config.DEDUP_PRICE_DROP against the price it was last sent at.
+
+Decisions are made for a whole batch at once from one history lookup
+(Database.get_history) and NumPy masks.
+"""
+import time
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from src.config import Config
+from src.models import Deal
+
+
+class DedupPolicy:
+    def __init__(self, cooldown_hours: Optional[Dict[str, float]] = None,
+                 default_hours: Optional[float] = None, price_drop: Optional[float] = None):
+        """
+        Args:
+            cooldown_hours: Source -> hours before an item may repeat (Config.DEDUP_COOLDOWN_HOURS)
+            default_hours: Cooldown for sources not listed (Config.DEDUP_DEFAULT_COOLDOWN_HOURS)
+            price_drop: Fractional drop that allows a resend inside the cooldown (Config.DEDUP_PRICE_DROP)
+        """
+        self.cooldown_hours = Config.DEDUP_COOLDOWN_HOURS if cooldown_hours is None else cooldown_hours
+        self.default_hours = Config.DEDUP_DEFAULT_COOLDOWN_HOURS if default_hours is None else default_hours
+        self.price_drop = Config.DEDUP_PRICE_DROP if price_drop is None else price_drop
+
+    def cooldown(self, source: str) -> float:
+        """Seconds."""
+        return self.cooldown_hours.get(source, self.default_hours) * 3600
+
+    def evaluate(self, deals: List[Deal], history: Dict[str, Tuple[Optional[float], Optional[float]]],
+                 now: Optional[float] = None) -> np.ndarray:
+        """
+        Bool per deal: may it be sent?
+
+        Args:
+            history: Deal id -> (last sent unix time, last sent price) for items sent before
+        """
+        if not deals:
+            return np.zeros(0, dtype=bool)
+        now = now or time.time()
+        never_sent = np.array([deal.id not in history for deal in deals])
+        # Rows from before send times were recorded count as long ago
+        sent_ts = np.array([(history.get(deal.id, (0, 0))[0] or 0.0) for deal in deals], dtype=float)
+        last_price = np.array([(history.get(deal.id, (0, 0))[1] or 0.0) for deal in deals], dtype=float)
+        price = np.array([deal.price for deal in deals], dtype=float)
+        cooldown = np.array([self.cooldown(deal.source) for deal in deals], dtype=float)
+
+        cooled_down = now - sent_ts >= cooldown
+        price_dropped = (last_price > 0) & (price <= last_price * (1 - self.price_drop))
+        return never_sent | cooled_down | price_dropped
@@ -0,0 +1,119 @@
+"""
+Batch Filtering - Config thresholds applied to a page of cards at once
+A page of cards becomes columnar arrays (price, original price, discount,
+rating, and keyword/brand/negative flags from one regex pass over the page's
+titles). Every rule is then a NumPy mask. Each rejected card is charged to
+the first rule it fails, so the counts add up to the cards dropped.
+"""
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+from src.config import Config
+from src.models import Deal
+
+# Checked in this order; a card is counted against the first one it fails
+RULES = ("price", "discount", "rating", "unrated", "negative_keyword", "brand", "keyword")
+
+
+def any_of(words: Iterable[str]) -> re.Pattern:
+    """One alternation matching any of `words` inside lowercased text (longest first)."""
+    escaped = sorted((re.escape(word.lower()) for word in words if word), key=len, reverse=True)
+    return re.compile("|".join(escaped) or r"(?!x)x")
+
+
+def title_flags(titles: Sequence[str], pattern: re.Pattern) -> np.ndarray:
+    """Bool per title: does `pattern` occur in it? Scans the whole page in a single pass."""
+    flags = np.zeros(len(titles), dtype=bool)
+    if not titles:
+        return flags
+    cleaned = [title.lower().replace("\n", " ") for title in titles]
+    starts = np.cumsum([0] + [len(title) + 1 for title in cleaned[:-1]])
+    positions = [match.start() for match in pattern.finditer("\n".join(cleaned))]
+    if positions:
+        flags[np.searchsorted(starts, positions, side="right") - 1] = True
+    return flags
+
+
+class FilterResult(NamedTuple):
+    accepted: np.ndarray        # Indices into the batch, in input order
+    rejected: Dict[str, int]    # Rule -> cards it dropped
+    has_discounts: bool         # Any card at or above MIN_DISCOUNT, before the other rules
+
+
+class BatchFilter:
+    """Vectorized quality gates; keeps running totals per rule across batches."""
+
+    def __init__(self):
+        self.negative = any_of(Config.NEGATIVE_KEYWORDS)
+        self.brands = any_of(Config.PREFERRED_BRANDS)
+        self.keywords = any_of(Config.KEYWORDS)
+        self.totals: Counter = Counter()
+        self.seen = 0
+        self._lock = threading.Lock()  # Shopee filters keywords from worker threads
+
+    def apply(self, price: Sequence[float], original_price: Sequence[float], discount: Sequence[float],
+              rating: Sequence[float], titles: Sequence[str], check_rating: bool = True,
+              require_rating: bool = False, brand_gate: bool = False, match_keywords: bool = False) -> FilterResult:
+        """
+        Args:
+            check_rating: Drop rated cards below Config.MIN_RATING
+            require_rating: Also drop unrated cards (usually new sellers)
+            brand_gate: Keep only titles with one of Config.PREFERRED_BRANDS
+            match_keywords: Keep only titles with one of Config.KEYWORDS
+        """
+        price = np.asarray(price, dtype=float)
+        original_price = np.asarray(original_price, dtype=float)
+        discount = np.asarray(discount, dtype=float)
+        rating = np.asarray(rating, dtype=float)
+        off = np.zeros(len(price), dtype=bool)
+
+        has_discount = discount >= Config.MIN_DISCOUNT
+        failed = np.column_stack([
+            ~(price > 0) | (original_price < price),
+            ~has_discount,
+            (rating > 0) & (rating < Config.MIN_RATING) if check_rating else off,
+            (rating == 0) if require_rating else off,
+            title_flags(titles, self.negative),
+            ~title_flags(titles, self.brands) if brand_gate else off,
+            ~title_flags(titles, self.keywords) if match_keywords else off,
+        ]) if len(price) else np.zeros((0, len(RULES)), dtype=bool)
+
+        rejected_mask = failed.any(axis=1)
+        first_failed = failed.argmax(axis=1)[rejected_mask]
+        counts = np.bincount(first_failed, minlength=len(RULES))
+        rejected = {rule: int(count) for rule, count in zip(RULES, counts) if count}
+
+        with self._lock:
+            self.seen += len(price)
+            self.totals.update(rejected)
+        return FilterResult(np.flatnonzero(~rejected_mask), rejected, bool(has_discount.any()))
+
+    def apply_deals(self, deals: List[Deal], discounts: Optional[Sequence[float]] = None,
+                    **rules) -> Tuple[List[Deal], FilterResult]:
+        """
+        apply() over Deal records; returns the kept deals and the result.
+        `discounts` replaces each deal's own discount for the gate (e.g. with its coupon applied).
+        """
+        result = self.apply(
+            [deal.price for deal in deals],
+            [deal.original_price for deal in deals],
+            [deal.discount for deal in deals] if discounts is None else discounts,
+            [deal.rating for deal in deals],
+            [deal.title for deal in deals],
+            **rules,
+        )
+        return [deals[i] for i in result.accepted], result
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"seen": self.seen, "rejected": dict(self.totals)}
+
+
+def describe(result: FilterResult) -> str:
+    """'12/48 kept (discount 30, rating 6)' for the per-page log line."""
+    kept = len(result.accepted)
+    total = kept + sum(result.rejected.values())
+    reasons = ", ".join(f"{rule} {count}" for rule, count in result.rejected.items())
+    return f"{kept}/{total} kept" + (f" ({reasons})" if reasons else "")
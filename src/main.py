@@ -1,38 +1,112 @@
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, request, jsonify, render_template, send_from_directory, abort
+import os
 import threading
 import time
 import schedule
+from src import pipeline
+from src.analytics import Exporter, ObservationLog
+from src.profiling import profiled, profiler
 from src.config import Config
-from src.scrapers.playwright_scraper import PlaywrightScraper
-from src.services.whatsapp import WhatsAppService
+from src.database import Database
+from src.maintenance import run_maintenance
+from src.matching import SentProducts
+from src.scoring import DealRanker
+from src.writer import flush_on_sigterm
+from src.services.templates import render_deal
+
+# Heavy modules (Playwright, the link generator, BeautifulSoup) are imported on
+# first use through the lazy singletons below, so the web tier is up right away
+# and the worker thread pays the warm-up cost instead.
+
+class Lazy:
+    """Build a singleton on first .get() (thread-safe); .ready tells whether it has been built."""
+
+    def __init__(self, factory):
+        self.factory = factory
+        self._value = None
+        self._built = False
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._built
+
+    def get(self):
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    self._value = self.factory()
+                    self._built = True
+        return self._value
+
+def _build_scraper():
+    from src.scrapers.playwright_scraper import PlaywrightScraper
+    return PlaywrightScraper()
+
+def _build_shopee():
+    if not Config.ENABLE_SHOPEE:
+        return None
+    from src.scrapers.shopee import ShopeeScraper
+    return ShopeeScraper()
+
+def _build_synthetic():
+    if Config.SCRAPER_BACKEND != "synthetic":
+        return None
+    from src.scrapers.synthetic import SyntheticScraper
+    return SyntheticScraper()
+
+def _build_whatsapp():
+    from src.services.whatsapp import WhatsAppService
+    return WhatsAppService()
 
 # ML Affiliate Link Generation (STRICT MODE)
 # Phase 2: Affiliate Link Integrity Protocol
 # Deals MUST have a generated affiliate link or be discarded.
 ENABLE_ML_AFFILIATE_LINKS = True
-try:
-    from src.services.ml_link_generator import get_ml_affiliate_link
-    print("✅ ML Link Generator loaded (Strict UI Automation)")
-except ImportError:
-    ENABLE_ML_AFFILIATE_LINKS = False
-    print("⚠️ ML Link Generator not available")
 
-app = Flask(__name__)
-whatsapp = WhatsAppService()
-scraper = PlaywrightScraper()
+def _build_link_generator():
+    try:
+        from src.services.ml_link_generator import get_ml_affiliate_link
+        print("✅ ML Link Generator loaded (Strict UI Automation)")
+        return get_ml_affiliate_link
+    except ImportError:
+        print("⚠️ ML Link Generator not available")
+        return None
 
-from src.database import Database
+scraper = Lazy(_build_scraper)
+shopee = Lazy(_build_shopee)
+synthetic = Lazy(_build_synthetic)
+whatsapp = Lazy(_build_whatsapp)
+link_generator = Lazy(_build_link_generator)
 
 app = Flask(__name__)
-whatsapp = WhatsAppService()
-scraper = PlaywrightScraper()
-db = Database()
+db = Database(Config.DB_PATH)
+# Candidates wait here across job runs until their scoring window closes
+ranker = DealRanker()
+# Items sent today, matched across sources by title/brand/model
+products = SentProducts()
+# Every scraped deal, drained into columnar files by the periodic analytics export
+observations = ObservationLog()
+exporter = Exporter(Config.DB_PATH, observations=observations)
+
+# In-memory list for dashboard (still transient, but filtered by DB),
+# loaded from the DB the first time it is needed
+_all_deals = None
+_all_deals_lock = threading.Lock()
 
-# In-memory list for dashboard (still transient, but filtered by DB)
-# Load recent deals from DB on startup
-all_deals = db.get_recent_deals()
-print(f"Loaded {len(all_deals)} deals from database.")
+def recent_deals():
+    global _all_deals
+    with _all_deals_lock:
+        if _all_deals is None:
+            _all_deals = db.get_recent_deals()
+            print(f"Loaded {len(_all_deals)} deals from database.")
+        return _all_deals
 
+# Readiness for /healthz
+STARTED_AT = time.time()
+worker_state = {"status": "disabled", "warmed_at": None, "last_job_at": None, "last_job_sent": None}
+
+@profiled
 def job():
     print("🔍 Entering job function...")
     # Check daily limit via DB
@@ -49,133 +123,129 @@ def job():
 
     print("Running scheduled job...", flush=True)
     
-    # 1. Scrape Mercado Livre Offers (Once)
-    print("Fetching Mercado Livre Lightning Deals...", flush=True)
-    try:
-        ml_deals = scraper.scrape_ml_offers()
-        print(f"✅ Scraper returned {len(ml_deals)} deals", flush=True)
-    except Exception as e:
-        print(f"❌ Scraper Error: {e}")
-        ml_deals = []
-    
-    # Filter ML deals by keywords and negative keywords
-    filtered_ml_deals = []
-    for deal in ml_deals:
-        title_lower = deal['title'].lower()
-        
-        # Check negative keywords first
-        if any(neg in title_lower for neg in Config.NEGATIVE_KEYWORDS):
-            # print(f"Skipped ML deal (Negative keyword): {deal['title']}")
-            continue
-
-        # Check if any keyword is in the title (case insensitive)
-        if any(keyword.lower() in title_lower for keyword in Config.KEYWORDS):
-            filtered_ml_deals.append(deal)
-        else:
-            # print(f"Skipped ML deal (No keyword match): {deal['title']}")
-            pass
-            
-    print(f"Found {len(ml_deals)} total ML deals, {len(filtered_ml_deals)} matched keywords.")
-    
-    # Process ML Deals
-    process_deals(filtered_ml_deals)
-
-    # 2. Scrape Amazon (Per Keyword)
-    # Randomize keywords
+    # 1. Mercado Livre Lightning Deals (keyword-matched), then
+    # 2. ML + Amazon search for a few random keywords, then
+    # 3. Shopee API for the same keywords (if credentials are set).
+    # Sources are lazy and run ahead in a background thread, so the first
+    # matching deal is sent while later pages are still being scraped.
     import random
     selected_keywords = random.sample(Config.KEYWORDS, min(3, len(Config.KEYWORDS)))
     
-    for keyword in selected_keywords:
-        # Check limit again inside loop
-        if db.get_today_deals_count() >= Config.MAX_DAILY_DEALS:
-            break
-            
-        print(f"Searching Amazon for {keyword}...")
-        deals = scraper.search(keyword) 
-        process_deals(deals)
-
-def process_deals(deals):
-    if not deals:
+    if synthetic.get():
+        # Load test: one seeded stream in place of every marketplace
+        sources = synthetic.get().iter_filtered()
+    else:
+        shopee_scraper = shopee.get()
+        sources = pipeline.chain(
+            scraper.get().iter_ml_offers(match_keywords=True),
+            keyword_searches(selected_keywords),
+            shopee_scraper.iter_search(selected_keywords) if shopee_scraper else (),
+        )
+    sent = process_deals(pipeline.prefetch(sources))
+    worker_state.update(last_job_at=time.time(), last_job_sent=sent)
+    print(f"Job finished: {sent} deals sent.", flush=True)
+
+def keyword_searches(keywords):
+    for keyword in keywords:
+        print(f"Searching ML and Amazon for {keyword}...")
+        yield from scraper.get().iter_ml_search(keyword)
+        yield from scraper.get().iter_amazon_search(keyword)
+
+def process_deals(deals) -> int:
+    """Stream deals through filter -> dedup -> same product -> rank -> budget -> link -> dispatch."""
+    # Synthetic deals point at example.com, there is nothing to affiliate
+    generate = link_generator.get() if ENABLE_ML_AFFILIATE_LINKS and not synthetic.get() else None
+    
+    stream = pipeline.normalize(deals)
+    stream = pipeline.observe(stream, observations)
+    stream = pipeline.exclude_negative(stream)
+    stream = pipeline.dedup(stream, db)
+    stream = pipeline.same_product(stream, products, db)
+    stream = pipeline.rank(stream, ranker, db)
+    stream = pipeline.within_budget(stream, db)
+    stream = pipeline.affiliate_links(stream, generate)
+    stream = pipeline.dispatch(stream, send_deal)
+    
+    sent = pipeline.run(stream)
+    if not sent:
         print("   ⚠️ No deals to process (all filtered out or none found).", flush=True)
-        return
+    return sent
 
-    for deal in deals:
-        if db.get_today_deals_count() >= Config.MAX_DAILY_DEALS:
-            return
-
-        # Check negative keywords (Double check for Amazon/Scraped items)
-        if any(neg in deal['title'].lower() for neg in Config.NEGATIVE_KEYWORDS):
-            # print(f"Skipped deal (Negative keyword): {deal['title']}")
-            continue
-
-        # Generate ML affiliate link if enabled and this is a Mercado Livre deal
-        final_link = deal['link'] # Initialize final_link with original deal link
-        # 3. Generate Affiliate Link (Strict Mode)
-        if deal.get('source') == "Mercado Livre" and ENABLE_ML_AFFILIATE_LINKS:
-            try:
-                affiliate_link = get_ml_affiliate_link(deal['link'], deal['title'])
-                if affiliate_link:
-                    final_link = affiliate_link
-                    deal['link'] = affiliate_link # Update the deal object so WhatsApp gets the new link
-                    print(f"   🔗 Affiliate link generated")
-                else:
-                    print(f"   ⚠️ Affiliate link generation failed for {deal.get('id', 'N/A')}. DISCARDING deal.")
-                    continue  # Skip this deal entirely per Phase 2 directive
-            except Exception as e:
-                print(f"   ⚠️ ML link generation skipped due to error: {str(e)[:50]}. DISCARDING deal.")
-                continue # Discard on error as well in strict mode
-        
-        # Check DB for duplicates
-        print(f"Processing Deal ID: {deal['id']} | Title: {deal['title'][:20]}...")
-        if not db.is_deal_sent_today(deal['id']):
-            # Add to global list for dashboard
-            all_deals.insert(0, deal)
-            if len(all_deals) > 100:
-                all_deals.pop()
-
-            # Format message
-            rating_str = f"⭐ {deal.get('rating', 'N/A')}" if deal.get('rating') else ""
-            
-            msg = f"*OFERTA ENCONTRADA!* 🚀\n\n" \
-                  f"*{deal['title']}*\n" \
-                  f"💰 De: ~R$ {deal['original_price']}~\n" \
-                  f"🔥 *Por: R$ {deal['price']}*\n" \
-                  f"📉 Desconto: {deal['discount']}%\n" \
-                  f"{rating_str}\n\n" \
-                  f"🔗 *Link:* {final_link}"
-            
-            print(f"Would send to WhatsApp: \n{msg}\n")
-            
-            # Send to WhatsApp Service (Node.js)
-            try:
-                import requests
-                response = requests.post('http://localhost:3001/send-deal', json={'deal': deal})
-                if response.status_code == 200:
-                    print("✅ Sent to WhatsApp Service!")
-                else:
-                    print(f"❌ WhatsApp Service Error: {response.text}")
-            except Exception as e:
-                print(f"❌ Could not connect to WhatsApp Service: {e}")
-            
-            # Mark as sent in DB (Pass full deal object now)
-            db.mark_deal_as_sent(deal)
-            
-            count = db.get_today_deals_count()
-            print(f"Deals sent today: {count}/{Config.MAX_DAILY_DEALS}")
-        else:
-            # print(f"Duplicate deal skipped: {deal['title']}")
-            pass
+def send_deal(deal):
+    print(f"Processing Deal ID: {deal.id} | Title: {deal.title[:20]}...")
+    
+    # Add to global list for dashboard
+    all_deals = recent_deals()
+    with _all_deals_lock:
+        all_deals.insert(0, deal)
+        if len(all_deals) > 100:
+            all_deals.pop()
+
+    # Format message (rendered once, cached per deal version)
+    msg = render_deal(deal, "whatsapp")
+    
+    print(f"Would send to WhatsApp: \n{msg}\n")
+    
+    # Send to WhatsApp Service (Node.js)
+    whatsapp.get().send_deal(deal, msg)
+    
+    # Mark as sent in DB (Pass full deal object now); the send that fills the
+    # daily limit is written immediately so a restart can't exceed it
+    db.mark_deal_as_sent(deal, sync=db.get_today_deals_count() + 1 >= Config.MAX_DAILY_DEALS)
+    products.add(deal)
+    
+    count = db.get_today_deals_count()
+    print(f"Deals sent today: {count}/{Config.MAX_DAILY_DEALS}")
+
+def warm_up():
+    """Build the worker's singletons (imports Playwright/link generator) off the web thread."""
+    worker_state["status"] = "warming"
+    start = time.perf_counter()
+    for singleton in (synthetic, scraper, shopee, whatsapp, link_generator):
+        try:
+            singleton.get()
+        except Exception as e:
+            print(f"⚠️ Warm-up failed for {singleton.factory.__name__}: {e}")
+    recent_deals()
+    worker_state.update(status="warmed", warmed_at=time.time())
+    print(f"🔥 Worker warmed in {time.perf_counter() - start:.2f}s")
+
+def filter_stats():
+    """Cards seen by the active backend's quality gates and how many each rejected."""
+    backend = synthetic.get() or (scraper.get() if scraper.ready else None)
+    return backend.filter.stats() if backend else None
+
+def maintenance_job():
+    try:
+        run_maintenance(db)
+    except Exception as e:
+        print(f"❌ DB maintenance failed: {e}")
+
+def analytics_job():
+    """Export in a thread of its own so a slow export never delays the next scrape."""
+    def export():
+        try:
+            exporter.export({"filter": filter_stats()})
+        except Exception as e:
+            print(f"❌ Analytics export failed: {e}")
+    threading.Thread(target=export, name="analytics-export", daemon=True).start()
 
 def run_scheduler():
     print("⏰ Scheduler function started...")
+    warm_up()
     
-    # Run job immediately on startup
-    print("🚀 Running first job immediately...")
-    job()
+    # First job right after warm-up (RUN_ON_START=0 waits for the schedule)
+    if Config.RUN_ON_START:
+        print("🚀 Running first job...")
+        job()
     
     # Schedule to run every 1 minute
     schedule.every(1).minutes.do(job)
     print("📅 Job scheduled to run every 1 minute")
+    schedule.every().day.at(Config.MAINTENANCE_TIME).do(maintenance_job)
+    print(f"📅 DB maintenance scheduled daily at {Config.MAINTENANCE_TIME}")
+    schedule.every(Config.ANALYTICS_EXPORT_MINUTES).minutes.do(analytics_job)
+    print(f"📅 Analytics export scheduled every {Config.ANALYTICS_EXPORT_MINUTES} minutes")
     
     # Keep checking and running pending jobs
     while True:
@@ -188,7 +258,60 @@ def index():
 
 @app.route('/api/deals')
 def get_deals():
-    return jsonify(all_deals)
+    return jsonify([deal.to_json() for deal in recent_deals()])
+
+@app.route('/api/stats')
+def get_stats():
+    """Precomputed rollups from the last analytics export (never queries deals.db). ?group=by_source etc."""
+    stats = exporter.stats()
+    if stats is None:
+        return jsonify({"error": "No analytics export yet"}), 503
+    group = request.args.get('group')
+    if group:
+        if group not in stats["sent"]:
+            abort(404)
+        return jsonify({"generated_at": stats["generated_at"], group: stats["sent"][group]})
+    return jsonify(stats)
+
+@app.route('/healthz')
+def healthz():
+    """Web is ready once this answers; the worker is 'warmed' once its scrapers/link generator are built."""
+    return jsonify({
+        "web": "ready",
+        "worker": worker_state["status"],
+        "uptime": round(time.time() - STARTED_AT, 1),
+        "warmed_at": worker_state["warmed_at"],
+        "last_job_at": worker_state["last_job_at"],
+        "last_job_sent": worker_state["last_job_sent"],
+        "filter": filter_stats(),
+        "dedup_filter": db.bloom.stats(),
+        "db_writes": db.writes.stats(),
+    })
+
+def require_admin():
+    # Admin endpoints are disabled unless ADMIN_TOKEN is set
+    token = request.headers.get('X-Admin-Token') or request.args.get('token')
+    if not Config.ADMIN_TOKEN or token != Config.ADMIN_TOKEN:
+        abort(403)
+
+@app.route('/admin/profile', methods=['GET', 'POST', 'DELETE'])
+def admin_profile():
+    """GET: status + saved profiles. POST {"mode": "cprofile"|"sample", "runs": N}: arm. DELETE: disarm."""
+    require_admin()
+    if request.method == 'POST':
+        body = request.get_json(silent=True) or {}
+        try:
+            profiler.arm(body.get('mode', 'sample'), int(body.get('runs', 1)))
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': str(e)}), 400
+    elif request.method == 'DELETE':
+        profiler.disarm()
+    return jsonify(dict(profiler.status(), files=profiler.list_files()))
+
+@app.route('/admin/profile/<path:name>')
+def admin_profile_download(name):
+    require_admin()
+    return send_from_directory(os.path.abspath(profiler.directory), name, as_attachment=True)
 
 @app.route('/webhook', methods=['GET', 'POST'])
 def webhook():
@@ -208,13 +331,18 @@ def webhook():
         print(f"Received webhook: {data}")
         return "OK", 200
 
-# Start scheduler thread (runs regardless of how module is executed)
-print("🚀 Starting scheduler thread...")
-scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
-scheduler_thread.start()
-print("✅ Scheduler thread started - will run job every 1 minute")
+# Start scheduler thread (runs regardless of how module is executed,
+# unless START_SCHEDULER=0, e.g. for benchmarks that drive job() themselves)
+if Config.START_SCHEDULER:
+    print("🚀 Starting scheduler thread...")
+    worker_state["status"] = "starting"
+    scheduler_thread = threading.Thread(target=run_scheduler, name="scheduler", daemon=True)
+    scheduler_thread.start()
+    print("✅ Scheduler thread started - will run job every 1 minute")
 
 if __name__ == "__main__":
+    # stop_all.sh sends SIGTERM first: buffered sends are written before exit
+    flush_on_sigterm()
     # Start Flask server
     print("Starting server on port 3000...")
     app.run(port=3000, host='0.0.0.0')
@@ -0,0 +1,149 @@
+"""
+DB Maintenance - Retention, archiving and compaction for deals.db
+Run daily by the scheduler (Config.MAINTENANCE_TIME):
+
+1. Rows sent more than Config.RETENTION_DAYS ago are appended to monthly
+   archive files (archive/sent_deals-YYYY-MM.jsonl.zst, or .jsonl.gz when the
+   optional zstandard package is missing) and then deleted from the live
+   table. Retention never goes below the longest dedup cooldown, so the dedup
+   rules can still see every row they need.
+2. Freed pages go back to the filesystem with PRAGMA incremental_vacuum (the
+   first run switches the DB to incremental auto-vacuum with one full VACUUM).
+3. ANALYZE refreshes the planner statistics for the indexes.
+
+The archive is written and fsynced before anything is deleted, so a crash
+in between can leave a row in both places but never in neither.
+"""
+import datetime
+import gzip
+import io
+import json
+import os
+import sqlite3
+import time
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional
+from src.config import Config
+
+ARCHIVE_PREFIX = "sent_deals-"
+
+
+def _open_archive(archive_dir: str, month: str):
+    """Append handle for a month's archive; zstd frames and gzip members both concatenate."""
+    try:
+        import zstandard
+        path = os.path.join(archive_dir, f"{ARCHIVE_PREFIX}{month}.jsonl.zst")
+        raw = open(path, "ab")
+        return path, raw, zstandard.ZstdCompressor(level=10).stream_writer(raw, closefd=False)
+    except ImportError:
+        path = os.path.join(archive_dir, f"{ARCHIVE_PREFIX}{month}.jsonl.gz")
+        raw = open(path, "ab")
+        return path, raw, gzip.GzipFile(fileobj=raw, mode="ab")
+
+
+def retention_cutoff(now: Optional[float] = None, days: Optional[int] = None) -> float:
+    """Unix time before which rows are archived."""
+    days = Config.RETENTION_DAYS if days is None else days
+    longest_cooldown = max([Config.DEDUP_DEFAULT_COOLDOWN_HOURS, *Config.DEDUP_COOLDOWN_HOURS.values()]) / 24
+    return (now or time.time()) - max(days, longest_cooldown) * 86400
+
+
+def archive_old_deals(db_path: str, archive_dir: Optional[str] = None, cutoff: Optional[float] = None) -> Dict[str, int]:
+    """Move rows older than cutoff into monthly archive files. Returns rows archived per file."""
+    archive_dir = archive_dir or Config.ARCHIVE_DIR
+    cutoff = retention_cutoff() if cutoff is None else cutoff
+    with sqlite3.connect(db_path) as conn:
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute('SELECT rowid, * FROM sent_deals WHERE sent_ts < ?', (cutoff,)).fetchall()
+    if not rows:
+        return {}
+
+    by_month = defaultdict(list)
+    for row in rows:
+        record = dict(row)
+        rowid = record.pop("rowid")
+        month = datetime.datetime.fromtimestamp(record["sent_ts"]).strftime("%Y-%m")
+        by_month[month].append((rowid, record))
+
+    os.makedirs(archive_dir, exist_ok=True)
+    archived = {}
+    for month, records in sorted(by_month.items()):
+        path, raw, writer = _open_archive(archive_dir, month)
+        with raw:
+            with writer:
+                for _, record in records:
+                    writer.write((json.dumps(record, ensure_ascii=False) + "\n").encode())
+            raw.flush()
+            os.fsync(raw.fileno())
+        archived[os.path.basename(path)] = len(records)
+
+    rowids: List[int] = [rowid for records in by_month.values() for rowid, _ in records]
+    with sqlite3.connect(db_path) as conn:
+        # A resend meanwhile upserts the row to a new sent_ts: it is no longer the archived copy, keep it
+        conn.executemany('DELETE FROM sent_deals WHERE rowid = ? AND sent_ts < ?', ((rowid, cutoff) for rowid in rowids))
+    return archived
+
+
+def iter_archive(archive_dir: Optional[str] = None, since_month: Optional[str] = None) -> Iterator[Dict]:
+    """Every archived row, oldest month first (only months from since_month, YYYY-MM, on if given)."""
+    archive_dir = archive_dir or Config.ARCHIVE_DIR
+    if not os.path.isdir(archive_dir):
+        return
+    for name in sorted(os.listdir(archive_dir)):
+        if not name.startswith(ARCHIVE_PREFIX):
+            continue
+        if since_month and name[len(ARCHIVE_PREFIX):len(ARCHIVE_PREFIX) + 7] < since_month:
+            continue
+        path = os.path.join(archive_dir, name)
+        if name.endswith(".gz"):
+            handle = gzip.open(path, "rt", encoding="utf-8")
+        elif name.endswith(".zst"):
+            try:
+                import zstandard
+            except ImportError:
+                print(f"⚠️ Skipping {name}: zstandard not installed")
+                continue
+            reader = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), read_across_frames=True, closefd=True)
+            handle = io.TextIOWrapper(reader, encoding="utf-8")
+        else:
+            continue
+        with handle:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def compact(db_path: str) -> int:
+    """Return free pages to the filesystem and refresh planner stats. Returns pages freed."""
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        free_before = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+            # Only takes effect after a full VACUUM; every later run is incremental
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            conn.execute('VACUUM')
+        # execute() would step the pragma once (one page); executescript runs it to completion
+        conn.executescript('PRAGMA incremental_vacuum;')
+        free_after = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        conn.execute('ANALYZE')
+        return free_before - free_after
+    finally:
+        conn.close()
+
+
+def run_maintenance(db, archive_dir: Optional[str] = None) -> Dict:
+    """Archive, compact, analyze. Takes the Database so buffered sends are written first."""
+    start = time.perf_counter()
+    db.flush()
+    archived = archive_old_deals(db.db_path, archive_dir)
+    pages_freed = compact(db.db_path)
+    report = {
+        "archived": sum(archived.values()),
+        "files": archived,
+        "pages_freed": pages_freed,
+        "db_kb": round(os.path.getsize(db.db_path) / 1024, 1),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+    print(f"🧹 DB maintenance: archived {report['archived']} rows, freed {pages_freed} pages, "
+          f"{report['db_kb']} KB live ({report['seconds']}s)")
+    return report
@@ -0,0 +1,170 @@
+"""
+Product Matching - Spot the same item listed on ML, Amazon and Shopee
+Dedup by id can't tell that ML's MLB123 and Amazon's B0XYZ are the same
+DeWalt drill. Titles are reduced to a fingerprint (normalized tokens, brand
+from Config.PREFERRED_BRANDS, model numbers like "DCD7781") and indexed two
+ways: an exact model-number bucket, and MinHash signatures split into LSH
+bands for near-duplicate titles. A lookup only compares against items that
+share a bucket, so it stays cheap as the index grows.
+
+Two titles are the same product when their brands don't disagree and their
+estimated token Jaccard similarity reaches Config.MATCH_THRESHOLD, or only
+MODEL_MATCH_THRESHOLD when both name the same model number. Listings naming
+different model numbers never match.
+"""
+import datetime
+import re
+import unicodedata
+import zlib
+from collections import defaultdict
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Set, Tuple
+import numpy as np
+from src.config import Config
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+(?:[-/][a-z0-9]+)*')
+# Sizes, voltages and counts are not model numbers
+_UNIT_RE = re.compile(r'^\d+(?:v|w|mm|cm|m|ml|l|kg|g|gb|tb|mah|ah|pcs|pecas|pol|x\d*)$')
+STOPWORDS = frozenset("a o e de da do das dos com para por em no na sem ate kit original novo".split())
+_PRIME = (1 << 31) - 1
+MODEL_MATCH_THRESHOLD = 0.25  # Same model number: titles only need to loosely agree
+
+
+class Fingerprint(NamedTuple):
+    tokens: FrozenSet[str]
+    brand: Optional[str]
+    models: FrozenSet[str]
+
+
+def _fold(text: str) -> str:
+    """Lowercase, accents stripped ('Nível' -> 'nivel')."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+_BRANDS = {_fold(brand): brand for brand in Config.PREFERRED_BRANDS}
+_BRAND_RE = re.compile(r'(?<![a-z0-9])(' + '|'.join(map(re.escape, sorted(_BRANDS, key=len, reverse=True))) + r')(?![a-z0-9])')
+
+
+def fingerprint(title: str) -> Fingerprint:
+    folded = _fold(title or "")
+    tokens = [token for token in _TOKEN_RE.findall(folded) if token not in STOPWORDS]
+    brand_match = _BRAND_RE.search(folded)
+    brand = _BRANDS[brand_match.group(1)] if brand_match else None
+    models = frozenset(
+        token.replace("-", "").replace("/", "") for token in tokens
+        if len(token) >= 3 and any(c.isdigit() for c in token) and any(c.isalpha() for c in token)
+        and not _UNIT_RE.match(token)
+    )
+    return Fingerprint(frozenset(t for t in tokens if len(t) > 1), brand, models)
+
+
+class MinHasher:
+    """Signatures of `num_perm` universal-hash minimums over a token set, computed in one NumPy op."""
+
+    def __init__(self, num_perm: int, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, _PRIME, size=num_perm, dtype=np.int64)
+        self.b = rng.integers(0, _PRIME, size=num_perm, dtype=np.int64)
+
+    def signature(self, tokens: FrozenSet[str]) -> Optional[np.ndarray]:
+        if not tokens:
+            return None
+        hashes = np.array([zlib.crc32(token.encode()) % _PRIME for token in tokens], dtype=np.int64)
+        return ((self.a[:, None] * hashes[None, :] + self.b[:, None]) % _PRIME).min(axis=1)
+
+
+def brands_agree(a: Fingerprint, b: Fingerprint) -> bool:
+    return a.brand is None or b.brand is None or a.brand == b.brand
+
+
+class ProductIndex:
+    """Key (deal id) -> fingerprint, bucketed by model number and by MinHash LSH band."""
+
+    def __init__(self, threshold: Optional[float] = None, bands: Optional[int] = None, rows: Optional[int] = None):
+        self.threshold = Config.MATCH_THRESHOLD if threshold is None else threshold
+        self.bands = bands or Config.MATCH_LSH_BANDS
+        self.rows = rows or Config.MATCH_LSH_ROWS
+        self.hasher = MinHasher(self.bands * self.rows)
+        self._items: Dict[str, Tuple[Fingerprint, Optional[np.ndarray], List[Tuple]]] = {}
+        self._buckets: Dict[Tuple, Set[str]] = defaultdict(set)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key: str):
+        return key in self._items
+
+    def _bucket_keys(self, fp: Fingerprint, signature: Optional[np.ndarray]) -> List[Tuple]:
+        keys = [("model", model) for model in fp.models]
+        if signature is not None:
+            bands = signature.reshape(self.bands, self.rows)
+            keys.extend(("lsh", band, row.tobytes()) for band, row in enumerate(bands))
+        return keys
+
+    def add(self, key: str, title: str):
+        self.remove(key)
+        fp = fingerprint(title)
+        signature = self.hasher.signature(fp.tokens)
+        bucket_keys = self._bucket_keys(fp, signature)
+        for bucket in bucket_keys:
+            self._buckets[bucket].add(key)
+        self._items[key] = (fp, signature, bucket_keys)
+
+    def remove(self, key: str):
+        item = self._items.pop(key, None)
+        if item is None:
+            return
+        for bucket in item[2]:
+            members = self._buckets.get(bucket)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del self._buckets[bucket]
+
+    def match(self, title: str, exclude: Optional[str] = None) -> Optional[str]:
+        """Key of the most similar indexed product that counts as the same item, if any."""
+        fp = fingerprint(title)
+        signature = self.hasher.signature(fp.tokens)
+        candidates: Set[str] = set()
+        for bucket in self._bucket_keys(fp, signature):
+            candidates |= self._buckets.get(bucket, set())
+        candidates.discard(exclude)
+
+        best, best_similarity = None, 0.0
+        for key in candidates:
+            other, other_signature, _ = self._items[key]
+            if not brands_agree(fp, other) or signature is None or other_signature is None:
+                continue
+            threshold = self.threshold
+            if fp.models and other.models:
+                if not fp.models & other.models:
+                    continue  # Both name a model, and they differ
+                threshold = MODEL_MATCH_THRESHOLD
+            similarity = float(np.mean(signature == other_signature))
+            if similarity >= threshold and similarity > best_similarity:
+                best, best_similarity = key, similarity
+        return best
+
+
+class SentProducts:
+    """Products sent today, so another listing of the same item isn't sent again."""
+
+    def __init__(self):
+        self.index = ProductIndex()
+        self.day: Optional[datetime.date] = None
+
+    def refresh(self, db):
+        """Rebuild from today's sent deals on first use and after midnight."""
+        today = datetime.date.today()
+        if self.day == today:
+            return
+        self.index = ProductIndex()
+        self.day = today
+        for deal in db.get_today_deals():
+            self.index.add(deal.id, deal.title)
+
+    def match(self, deal) -> Optional[str]:
+        return self.index.match(deal.title, exclude=deal.id)
+
+    def add(self, deal):
+        self.index.add(deal.id, deal.title)
@@ -0,0 +1,102 @@
+"""
+Schema Migrations - Versioned, additive changes to deals.db
+The schema version lives in PRAGMA user_version. On open, every migration
+above it runs in order, each in its own transaction together with the version
+bump, so a crash mid-way leaves the DB at the last complete version. Migrations
+only add (columns, indexes, backfills) and never drop sent_deals, so dedup
+history survives restarts and upgrades.
+
+Databases created before versioning report version 0; the early steps check
+what already exists, so they are adopted in place.
+To change the schema, append a step - never edit one that has shipped.
+"""
+import sqlite3
+from typing import Callable, List, Tuple
+
+# Columns of the original table; pre-"source" databases are missing some of them
+BASE_COLUMNS = (
+    ("title", "TEXT"), ("source", "TEXT"), ("price", "REAL"), ("original_price", "REAL"),
+    ("discount", "INTEGER"), ("rating", "REAL"), ("seller", "TEXT"), ("link", "TEXT"),
+    ("image", "TEXT"), ("sent_at", "DATE"),
+)
+
+
+def _columns(cursor: sqlite3.Cursor, table: str) -> set:
+    return {row[1] for row in cursor.execute(f'PRAGMA table_info({table})')}
+
+
+def _create_sent_deals(cursor: sqlite3.Cursor):
+    columns = ",\n".join(f"{name} {kind}" for name, kind in BASE_COLUMNS)
+    cursor.execute(f'CREATE TABLE IF NOT EXISTS sent_deals (id TEXT PRIMARY KEY,\n{columns})')
+
+
+def _add_missing_columns(cursor: sqlite3.Cursor):
+    # Used to be "drop the table and start over"
+    existing = _columns(cursor, "sent_deals")
+    for name, kind in BASE_COLUMNS:
+        if name not in existing:
+            cursor.execute(f'ALTER TABLE sent_deals ADD COLUMN {name} {kind}')
+
+
+def _add_sent_ts(cursor: sqlite3.Cursor):
+    # Exact send time for per-source cooldowns (sent_at stays the day)
+    if "sent_ts" not in _columns(cursor, "sent_deals"):
+        cursor.execute('ALTER TABLE sent_deals ADD COLUMN sent_ts REAL')
+    cursor.execute("UPDATE sent_deals SET sent_ts = CAST(strftime('%s', sent_at) AS REAL) "
+                   "WHERE sent_ts IS NULL AND sent_at IS NOT NULL")
+
+
+def _index_history(cursor: sqlite3.Cursor):
+    # Covers the dedup history lookup (id -> last send time and price)
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_sent_deals_history ON sent_deals(id, sent_ts, price)')
+
+
+def _index_sent_at(cursor: sqlite3.Cursor):
+    # Today's count/deals (budget check on every deal); also walked backwards by get_recent_deals
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_sent_deals_sent_at ON sent_deals(sent_at)')
+
+
+def _index_sent_ts(cursor: sqlite3.Cursor):
+    # Retention range scan (see src/maintenance.py)
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_sent_deals_sent_ts ON sent_deals(sent_ts)')
+
+
+# (version, description, step)
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Cursor], None]]] = [
+    (1, "create sent_deals", _create_sent_deals),
+    (2, "add columns missing from older tables", _add_missing_columns),
+    (3, "add sent_ts (send time) and backfill it", _add_sent_ts),
+    (4, "index dedup history lookups", _index_history),
+    (5, "index sent_at for daily counts", _index_sent_at),
+    (6, "index sent_ts for retention", _index_sent_ts),
+]
+
+LATEST = MIGRATIONS[-1][0]
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(db_path: str) -> int:
+    """Bring the DB at db_path up to LATEST. Returns the version it ended at."""
+    conn = sqlite3.connect(db_path, isolation_level=None)  # Transactions managed here
+    try:
+        version = current_version(conn)
+        for target, description, step in MIGRATIONS:
+            if target <= version:
+                continue
+            print(f"🗄️  Migrating DB to v{target}: {description}")
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            try:
+                step(cursor)
+                cursor.execute(f'PRAGMA user_version = {target}')
+                cursor.execute('COMMIT')
+            except Exception:
+                cursor.execute('ROLLBACK')
+                raise
+            version = target
+        return version
+    finally:
+        conn.close()
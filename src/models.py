@@ -0,0 +1,162 @@
+"""
+Deal Model
+One compact, immutable record shared by scrapers, pipeline, database, API and WhatsApp.
+"""
+import re
+from dataclasses import dataclass, fields, replace
+from typing import Dict, Optional, Tuple
+from src.pricing import discount_percent, to_cents
+
+_MLB_RE = re.compile(r'(MLB-?\d+)')
+
+SOURCE_ML = "Mercado Livre"
+SOURCE_ML_COUPON = "Mercado Livre Cupom"
+SOURCE_AMAZON = "Amazon"
+SOURCE_SHOPEE = "Shopee"
+
+
+def normalize_item_id(value: str) -> str:
+    """MLB-12345 / .../p/MLB12345 -> MLB12345 (falls back to the input)."""
+    match = _MLB_RE.search(value or "")
+    return match.group(1).replace('-', '') if match else value
+
+
+def _derive_pricing(price: float, original_price: Optional[float], discount: int) -> Tuple[float, int]:
+    """Fill whichever of original price / discount the page didn't give us."""
+    if not discount and original_price and original_price > price:
+        discount = discount_percent(to_cents(price), to_cents(original_price))
+    if not original_price:
+        original_price = price / (1 - discount / 100) if 0 < discount < 100 else price
+    return round(float(original_price), 2), int(discount)
+
+
+@dataclass(frozen=True, slots=True)
+class Deal:
+    source: str
+    id: str
+    title: str
+    price: float
+    original_price: float
+    discount: int
+    link: str
+    rating: float = 0.0
+    seller: str = ""
+    image: str = ""
+    coupon: str = ""
+
+    def __post_init__(self):
+        if not self.id:
+            raise ValueError("Deal needs an id")
+        if not self.title:
+            raise ValueError(f"Deal {self.id} has no title")
+        if not self.link:
+            raise ValueError(f"Deal {self.id} has no link")
+        if not self.price or self.price <= 0:
+            raise ValueError(f"Deal {self.id} has invalid price {self.price!r}")
+        if not 0 <= self.discount <= 100:
+            raise ValueError(f"Deal {self.id} has invalid discount {self.discount!r}")
+
+    # --- Constructors (one per source) ---
+
+    @classmethod
+    def from_ml(cls, item_id: str, title: str, link: str, price: float,
+                original_price: Optional[float] = None, discount: int = 0,
+                rating: float = 0.0, seller: str = "", image: str = "",
+                coupon: str = "", source: str = SOURCE_ML) -> "Deal":
+        price = float(price)
+        original_price, discount = _derive_pricing(price, float(original_price or 0), int(discount or 0))
+        if link and not link.startswith('http'):
+            link = f"https://{link.lstrip('/')}"
+        return cls(
+            source=source,
+            id=normalize_item_id(item_id or link),
+            title=(title or "").strip(),
+            price=price,
+            original_price=original_price,
+            discount=discount,
+            link=link,
+            rating=float(rating or 0.0),
+            seller=seller or "",
+            image=image or "",
+            coupon=coupon or "",
+        )
+
+    @classmethod
+    def from_amazon(cls, asin: str, title: str, link: str, price: float,
+                    original_price: Optional[float] = None, rating: float = 0.0,
+                    image: str = "") -> "Deal":
+        price = float(price)
+        original_price, discount = _derive_pricing(price, float(original_price or 0), 0)
+        return cls(
+            source=SOURCE_AMAZON,
+            id=asin,
+            title=(title or "").strip(),
+            price=price,
+            original_price=original_price,
+            discount=discount,
+            link=link,
+            rating=float(rating or 0.0),
+            image=image or "",
+        )
+
+    @classmethod
+    def from_shopee(cls, item_id, title: str, link: str, price: float,
+                    discount: int = 0, rating: float = 0.0, seller: str = "",
+                    image: str = "") -> "Deal":
+        price = float(price)
+        original_price, discount = _derive_pricing(price, 0, int(discount or 0))
+        return cls(
+            source=SOURCE_SHOPEE,
+            id=f"SHP{item_id}" if item_id not in (None, "") else "",  # 0 is a valid id
+            title=(title or "").strip(),
+            price=price,
+            original_price=original_price,
+            discount=discount,
+            link=link,
+            rating=float(rating or 0.0),
+            seller=seller or "",
+            image=image or "",
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Deal":
+        """Build from a loosely-shaped dict (DB rows, JSON payloads, legacy callers)."""
+        price = float(data['price'])
+        original_price, discount = _derive_pricing(
+            price, float(data.get('original_price') or 0), int(data.get('discount') or 0)
+        )
+        return cls(
+            source=data.get('source') or "",
+            id=str(data['id']),
+            title=(data.get('title') or "").strip(),
+            price=price,
+            original_price=original_price,
+            discount=discount,
+            link=data.get('link') or "",
+            rating=float(data.get('rating') or 0.0),
+            seller=data.get('seller') or "",
+            image=data.get('image') or "",
+            coupon=data.get('coupon') or "",
+        )
+
+    @classmethod
+    def coerce(cls, deal) -> "Deal":
+        return deal if isinstance(deal, cls) else cls.from_dict(deal)
+
+    # --- Converters ---
+
+    def with_link(self, link: str) -> "Deal":
+        return replace(self, link=link)
+
+    def to_row(self, sent_at: str, sent_ts: Optional[float] = None) -> Tuple:
+        """Column order of Database.ROW_COLUMNS."""
+        return (
+            self.id, self.title, self.source, self.price, self.original_price,
+            self.discount, self.rating, self.seller, self.link, self.image, sent_at, sent_ts
+        )
+
+    def to_json(self) -> Dict:
+        return {f: getattr(self, f) for f in _FIELD_NAMES}
+
+
+_FIELD_NAMES = tuple(f.name for f in fields(Deal))
@@ -0,0 +1,217 @@
+"""
+Deal Pipeline - Streaming stages from scrape to send.
+
+    source -> normalize -> observe -> filter -> dedup -> same product -> rank -> budget -> link -> dispatch
+
+Every stage is a generator that takes deals and yields deals, so a hot deal
+is sent as soon as its card is parsed instead of after the whole job.
+`prefetch` runs the sources in a background thread behind a bounded queue:
+scraping keeps going while links are generated, and blocks (backpressure)
+when the consumer falls behind.
+"""
+import queue
+import threading
+from typing import Callable, Iterable, Iterator, Optional
+from src.config import Config
+from src.dedup import DedupPolicy
+from src.models import Deal, SOURCE_ML, SOURCE_ML_COUPON
+from src.matching import SentProducts
+from src.scoring import DealRanker
+
+_END = object()
+
+
+def prefetch(source: Iterable, maxsize: Optional[int] = None) -> Iterator:
+    """
+    Pull `source` in a background thread into a bounded buffer.
+
+    The producer blocks when the buffer is full, and stops (closing the
+    source, so its cleanup runs in the producer thread) once the consumer
+    stops iterating.
+    """
+    buffer = queue.Queue(maxsize=maxsize or Config.PIPELINE_BUFFER_SIZE)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        iterator = iter(source)
+        try:
+            for item in iterator:
+                if not put(item):
+                    break
+        except Exception as e:
+            print(f"❌ Source Error: {e}")
+        finally:
+            if hasattr(iterator, 'close'):
+                iterator.close()
+            put(_END)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _END:
+                return
+            yield item
+    finally:
+        stop.set()
+
+
+def chain(*sources: Iterable) -> Iterator:
+    """
+    itertools.chain that can be closed: closing it closes every source
+    (the running one and any not reached yet), so their cleanup - e.g.
+    releasing a browser - runs on the thread that was iterating them.
+    """
+    try:
+        for source in sources:
+            yield from source
+    finally:
+        for source in sources:
+            if hasattr(source, 'close'):
+                source.close()
+
+
+def normalize(deals: Iterable) -> Iterator[Deal]:
+    """Coerce legacy dicts into Deal records, dropping ones that fail validation."""
+    for deal in deals:
+        try:
+            yield Deal.coerce(deal)
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"   ⚠️ Dropping malformed deal: {e}")
+
+
+def observe(deals: Iterable[Deal], log) -> Iterator[Deal]:
+    """Record every scraped deal, sent or not, for the analytics export (src/analytics.py)."""
+    for deal in deals:
+        log.record(deal)
+        yield deal
+
+
+def exclude_negative(deals: Iterable[Deal]) -> Iterator[Deal]:
+    """Drop deals whose titles hit Config.NEGATIVE_KEYWORDS."""
+    for deal in deals:
+        title_lower = deal.title.lower()
+        if any(neg in title_lower for neg in Config.NEGATIVE_KEYWORDS):
+            # print(f"Skipped deal (Negative keyword): {deal.title}")
+            continue
+        yield deal
+
+
+def dedup(deals: Iterable[Deal], db, policy: Optional[DedupPolicy] = None,
+          batch_size: Optional[int] = None) -> Iterator[Deal]:
+    """
+    Skip repeats within this run, and items the dedup policy says were sent
+    too recently at too similar a price. History is looked up a batch at a time.
+    """
+    policy = policy or DedupPolicy()
+    batch_size = batch_size or Config.DEDUP_BATCH_SIZE
+    seen = set()
+    batch = []
+
+    def flush():
+        history = db.get_history([deal.id for deal in batch])
+        allowed = [deal for deal, ok in zip(batch, policy.evaluate(batch, history)) if ok]
+        batch.clear()
+        return allowed
+
+    for deal in deals:
+        if deal.id in seen:
+            continue
+        seen.add(deal.id)
+        batch.append(deal)
+        if len(batch) >= batch_size:
+            yield from flush()
+    yield from flush()
+
+
+def same_product(deals: Iterable[Deal], products: SentProducts, db) -> Iterator[Deal]:
+    """Skip listings of an item already sent today from another source (or under another id)."""
+    products.refresh(db)
+    for deal in deals:
+        twin = products.match(deal)
+        if twin is not None:
+            print(f"   🔁 {deal.id} is the same product as {twin}, already sent today")
+            continue
+        yield deal
+
+
+def rank(deals: Iterable[Deal], ranker: DealRanker, db, batch_size: Optional[int] = None) -> Iterator[Deal]:
+    """
+    Hold deals in `ranker` (scored a batch at a time) and yield the window's
+    best, highest score first, once it closes. With a zero window the best of
+    this run are released when the source is exhausted.
+    """
+    batch_size = batch_size or Config.SCORE_BATCH_SIZE
+    batch = []
+
+    def flush(final: bool):
+        ranker.offer(batch, db)
+        batch.clear()
+        if not ranker.due() or (not ranker.window and not final):
+            return []
+        released = ranker.release(ranker.quota(Config.MAX_DAILY_DEALS - db.get_today_deals_count()))
+        if released:
+            print(f"🏆 Releasing top {len(released)} deal(s), best score {released[0][0]:.2f}", flush=True)
+        return released
+
+    for deal in deals:
+        batch.append(deal)
+        if len(batch) >= batch_size:
+            for _, best in flush(final=False):
+                yield best
+    for _, best in flush(final=True):
+        yield best
+
+
+def within_budget(deals: Iterable[Deal], db) -> Iterator[Deal]:
+    """Stop pulling deals (and, through prefetch, scraping) once the daily limit is hit."""
+    for deal in deals:
+        if db.get_today_deals_count() >= Config.MAX_DAILY_DEALS:
+            print(f"Daily limit reached ({Config.MAX_DAILY_DEALS}). Stopping pipeline.", flush=True)
+            return
+        yield deal
+
+
+def affiliate_links(deals: Iterable[Deal], generate: Optional[Callable[[str, str], Optional[str]]]) -> Iterator[Deal]:
+    """
+    Swap Mercado Livre links for generated affiliate links (Strict Mode).
+    Deals whose link cannot be generated are discarded per the Phase 2 directive.
+    """
+    for deal in deals:
+        if deal.source in (SOURCE_ML, SOURCE_ML_COUPON) and generate is not None:
+            try:
+                affiliate_link = generate(deal.link, deal.title)
+            except Exception as e:
+                print(f"   ⚠️ ML link generation skipped due to error: {str(e)[:50]}. DISCARDING deal.")
+                continue
+            if not affiliate_link:
+                print(f"   ⚠️ Affiliate link generation failed for {deal.id}. DISCARDING deal.")
+                continue
+            deal = deal.with_link(affiliate_link)
+            print(f"   🔗 Affiliate link generated")
+        yield deal
+
+
+def dispatch(deals: Iterable[Deal], send: Callable[[Deal], None]) -> Iterator[Deal]:
+    """Send each deal and yield it once sent."""
+    for deal in deals:
+        send(deal)
+        yield deal
+
+
+def run(stream: Iterable[Deal]) -> int:
+    """Drain a composed pipeline; returns how many deals came out the end."""
+    count = 0
+    for _ in stream:
+        count += 1
+    return count
@@ -0,0 +1,81 @@
+"""
+Price Parsing - BRL strings to integer cents
+One set of precompiled patterns for every scraper: "R$ 1.299,90", "1.299"
+(thousands, not 1.299 reais), Amazon's "1.299," whole span + "90" fraction
+span, ML's fraction + cents spans. Prices are parsed and compared as integer
+cents so the discount math that feeds every filter is exact; they become
+reais only at the Deal boundary.
+"""
+import re
+from typing import List, Optional, Sequence
+import numpy as np
+
+# Reais with optional dot/space thousands groups, then optional ",cents"
+_BRL_RE = re.compile(r'(\d{1,3}(?:[. \u00a0]\d{3})+|\d+)(?:,(\d{1,2}))?(?!\d)')
+_PERCENT_RE = re.compile(r'(\d{1,3})\s*%')
+_RATING_RE = re.compile(r'(\d)(?:[.,](\d+))?')
+_THOUSANDS = str.maketrans('', '', '. \u00a0')
+
+
+def _match_cents(match: re.Match) -> int:
+    reais = int(match.group(1).translate(_THOUSANDS))
+    cents = match.group(2) or "0"
+    return reais * 100 + int(cents.ljust(2, "0"))
+
+
+def parse_cents(text: Optional[str]) -> Optional[int]:
+    """'R$ 1.299,90' -> 129990; None when there is no amount."""
+    match = _BRL_RE.search(text or "")
+    return _match_cents(match) if match else None
+
+
+def parse_parts(whole: Optional[str], fraction: Optional[str] = None) -> Optional[int]:
+    """Price split across a reais span and a cents span (Amazon a-price-whole/fraction, ML fraction/cents)."""
+    whole = (whole or "").strip().rstrip(",")
+    fraction = (fraction or "").strip()
+    return parse_cents(f"{whole},{fraction}" if fraction else whole)
+
+
+def parse_many(texts: Sequence[Optional[str]]) -> List[Optional[int]]:
+    """parse_cents() for a whole page of price strings in a single regex pass."""
+    if not texts:
+        return []
+    cleaned = [(text or "").replace("\n", " ") for text in texts]
+    starts = np.cumsum([0] + [len(text) + 1 for text in cleaned[:-1]])
+    results: List[Optional[int]] = [None] * len(cleaned)
+    matches = list(_BRL_RE.finditer("\n".join(cleaned)))
+    if matches:
+        owners = np.searchsorted(starts, [match.start() for match in matches], side="right") - 1
+        for owner, match in zip(owners.tolist(), matches):
+            if results[owner] is None:  # First amount in each string
+                results[owner] = _match_cents(match)
+    return results
+
+
+def to_reais(cents: int) -> float:
+    return cents / 100
+
+
+def to_cents(reais: float) -> int:
+    return int(round(float(reais) * 100))
+
+
+def discount_percent(price_cents: int, original_cents: int) -> int:
+    """Whole percent off, truncated like the sites show it; exact on cents (no 28.999... -> 28)."""
+    if original_cents <= 0 or price_cents >= original_cents:
+        return 0
+    return (original_cents - price_cents) * 100 // original_cents
+
+
+def parse_percent(text: Optional[str]) -> Optional[int]:
+    """'20% OFF' -> 20."""
+    match = _PERCENT_RE.search(text or "")
+    return int(match.group(1)) if match else None
+
+
+def parse_rating(text: Optional[str]) -> float:
+    """'4,5 de 5 estrelas' / '4.8' -> 4.5 / 4.8; 0.0 when absent."""
+    match = _RATING_RE.search(text or "")
+    if not match:
+        return 0.0
+    return float(f"{match.group(1)}.{match.group(2) or 0}")
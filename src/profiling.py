@@ -0,0 +1,177 @@
+"""
+Profiling Hooks - cProfile or sampling profiles for the next N job() runs
+Arm with PROFILE_MODE=cprofile|sample (+ PROFILE_RUNS) at startup, or at
+runtime through the admin endpoints in src/main.py. Each profiled run writes
+a timestamped file to Config.PROFILE_DIR:
+
+    cprofile -> job-YYYYmmdd-HHMMSS-cprofile.pstats  (job thread + threads it starts, e.g. the
+                prefetch producer, merged; open with pstats/snakeviz)
+    sample   -> job-YYYYmmdd-HHMMSS-sample.collapsed (every thread, incl. the prefetch
+                producer; one "frame;frame;frame count" line per stack, for flamegraph.pl/speedscope)
+"""
+import cProfile
+import functools
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+from src.config import Config
+
+MODES = ("cprofile", "sample")
+
+
+class SamplingProfiler:
+    """Low-overhead wall-clock sampler: snapshots every thread's stack at a fixed interval."""
+
+    def __init__(self, interval: Optional[float] = None):
+        self.interval = interval or Config.PROFILE_SAMPLE_INTERVAL_MS / 1000
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def write_collapsed(self, path: str):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class JobProfiler:
+    """Tracks how many upcoming runs to profile and in which mode (thread-safe)."""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or Config.PROFILE_DIR
+        self.mode = ""
+        self.remaining = 0
+        self._lock = threading.Lock()
+
+    def arm(self, mode: str, runs: int = 1):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profile mode {mode!r}, expected one of {MODES}")
+        with self._lock:
+            self.mode, self.remaining = mode, max(int(runs), 0)
+        print(f"🔬 Profiling armed: next {self.remaining} job(s) with {mode}")
+
+    def disarm(self):
+        with self._lock:
+            self.mode, self.remaining = "", 0
+
+    def status(self) -> Dict:
+        with self._lock:
+            return {"mode": self.mode, "remaining": self.remaining, "directory": self.directory}
+
+    def _take(self) -> str:
+        with self._lock:
+            if self.remaining <= 0:
+                return ""
+            self.remaining -= 1
+            return self.mode
+
+    def run(self, fn: Callable, *args, **kwargs):
+        """Call fn, profiled if a run is armed."""
+        mode = self._take()
+        if not mode:
+            return fn(*args, **kwargs)
+
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        name = getattr(fn, "__name__", "run")
+        start = time.perf_counter()
+
+        if mode == "cprofile":
+            profilers = [cProfile.Profile()]
+
+            def profile_thread(*_):
+                # Called once in each thread started during the run (scraping runs in the prefetch producer)
+                thread_profiler = cProfile.Profile()
+                try:
+                    thread_profiler.enable()  # Replaces this hook for the thread
+                except ValueError:
+                    sys.setprofile(None)  # 3.12+: the first profiler already covers every thread
+                    return
+                profilers.append(thread_profiler)
+
+            threading.setprofile(profile_thread)
+            try:
+                return profilers[0].runcall(fn, *args, **kwargs)
+            finally:
+                threading.setprofile(None)
+                path = os.path.join(self.directory, f"{name}-{stamp}-cprofile.pstats")
+                pstats.Stats(*profilers).dump_stats(path)
+                self._saved(path, start, f", {len(profilers)} thread(s)")
+
+        sampler = SamplingProfiler()
+        sampler.start()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            sampler.stop()
+            path = os.path.join(self.directory, f"{name}-{stamp}-sample.collapsed")
+            sampler.write_collapsed(path)
+            self._saved(path, start, f", {sampler.samples} samples")
+
+    def _saved(self, path: str, start: float, extra: str = ""):
+        print(f"🔬 Profile saved: {path} ({time.perf_counter() - start:.1f}s{extra})")
+        self._prune()
+
+    def _prune(self):
+        """Keep only the newest Config.PROFILE_KEEP files."""
+        for entry in self.list_files()[Config.PROFILE_KEEP:]:
+            try:
+                os.remove(os.path.join(self.directory, entry["name"]))
+            except OSError:
+                pass
+
+    def list_files(self) -> List[Dict]:
+        """Profile files, newest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        files = []
+        for name in os.listdir(self.directory):
+            if not name.endswith((".pstats", ".collapsed")):
+                continue
+            stat = os.stat(os.path.join(self.directory, name))
+            files.append({"name": name, "size": stat.st_size, "modified": int(stat.st_mtime)})
+        return sorted(files, key=lambda f: (f["modified"], f["name"]), reverse=True)
+
+
+profiler = JobProfiler()
+if Config.PROFILE_MODE:
+    profiler.arm(Config.PROFILE_MODE, Config.PROFILE_RUNS)
+
+
+def profiled(fn: Callable) -> Callable:
+    """Decorator: run `fn` through the module profiler (a no-op unless armed)."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return profiler.run(fn, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,156 @@
+"""
+Deal Scoring - Rank candidates so the daily budget goes to the best deals
+Each deal gets a 0-1 score from its discount, rating, brand tier
+(Config.BRAND_TIERS), price drop against the price it was last sent at, and
+category weight (Config.KEYWORD_CATEGORIES). Scores are computed with NumPy
+for a whole batch at once.
+
+DealRanker keeps the best candidates of the current window in a bounded
+min-heap and, once the window closes, releases the top-K, where K spreads the
+remaining MAX_DAILY_DEALS over the windows left today. A deal seen early no
+longer takes a slot from a better one scraped later, and when the same item
+is held from two sources (src/matching.py) only the cheaper listing stays.
+"""
+import datetime
+import heapq
+import itertools
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from src.config import Config
+from src.matching import ProductIndex
+from src.models import Deal
+
+COMPONENTS = ("discount", "rating", "brand", "price_drop", "category")
+UNRATED_SCORE = 0.3   # New listings without reviews: below average, not zero
+MIN_RATING_SCORED = 3.5  # Ratings at or below this score 0, 5.0 scores 1
+
+
+def _brand_score(title_lower: str) -> float:
+    for tier, brands in enumerate(Config.BRAND_TIERS):
+        if any(brand.lower() in title_lower for brand in brands):
+            return Config.BRAND_TIER_SCORES[tier]
+    return 0.0
+
+
+def _category_weight(title_lower: str) -> float:
+    for category, keywords in Config.KEYWORD_CATEGORIES.items():
+        if any(keyword.lower() in title_lower for keyword in keywords):
+            return Config.CATEGORY_WEIGHTS.get(category, Config.CATEGORY_DEFAULT_WEIGHT)
+    return Config.CATEGORY_DEFAULT_WEIGHT
+
+
+def score_components(deals: List[Deal], last_prices: Optional[Dict[str, float]] = None) -> np.ndarray:
+    """(len(deals), len(COMPONENTS)) matrix of 0-1 component scores."""
+    last_prices = last_prices or {}
+    titles = [deal.title.lower() for deal in deals]
+    price = np.array([deal.price for deal in deals], dtype=float)
+    last = np.array([last_prices.get(deal.id, 0.0) for deal in deals], dtype=float)
+    discount = np.array([deal.discount for deal in deals], dtype=float)
+    rating = np.array([deal.rating for deal in deals], dtype=float)
+
+    rating_score = np.where(rating > 0, (rating - MIN_RATING_SCORED) / (5.0 - MIN_RATING_SCORED), UNRATED_SCORE)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drop = np.where(last > 0, (last - price) / last, 0.0)
+
+    return np.clip(np.column_stack([
+        discount / Config.SCORE_MAX_DISCOUNT,
+        rating_score,
+        [_brand_score(title) for title in titles],
+        drop / Config.SCORE_MAX_PRICE_DROP,
+        [_category_weight(title) for title in titles],
+    ]), 0.0, 1.0)
+
+
+def score_batch(deals: List[Deal], last_prices: Optional[Dict[str, float]] = None) -> np.ndarray:
+    """Weighted score per deal (Config.SCORE_WEIGHTS, normalized to sum to 1)."""
+    if not deals:
+        return np.zeros(0)
+    weights = np.array([Config.SCORE_WEIGHTS.get(name, 0.0) for name in COMPONENTS], dtype=float)
+    return score_components(deals, last_prices) @ (weights / weights.sum())
+
+
+class DealRanker:
+    """Best-so-far candidates of the current window; kept across job runs."""
+
+    def __init__(self, capacity: Optional[int] = None, window: Optional[float] = None):
+        """
+        Args:
+            capacity: Candidates held at once (Config.SCORE_HEAP_SIZE)
+            window: Seconds between releases (Config.SCORE_WINDOW_MINUTES); 0 releases at the end of every job
+        """
+        self.capacity = capacity or Config.SCORE_HEAP_SIZE
+        self.window = Config.SCORE_WINDOW_MINUTES * 60 if window is None else window
+        self.window_start = time.time()
+        self._heap: List[Tuple[float, int, Deal]] = []  # Min-heap: the weakest candidate is evicted first
+        self._held: Dict[str, float] = {}                # Deal id -> score currently held
+        self._deals: Dict[str, Deal] = {}
+        self.products = ProductIndex()                   # Same item from another source -> keep the cheaper
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return len(self._held)
+
+    def offer(self, deals: List[Deal], db=None):
+        """Score a batch and keep it if it beats the weakest candidate held."""
+        if not deals:
+            return
+        last_prices = db.get_last_prices([deal.id for deal in deals]) if db is not None else {}
+        for deal, score in zip(deals, score_batch(deals, last_prices).tolist()):
+            held = self._held.get(deal.id)
+            if held is not None:
+                if score <= held:
+                    continue
+                self._drop(deal.id)  # Seen again at a better price: replace the old entry
+            twin = self.products.match(deal.title, exclude=deal.id)
+            if twin is not None:
+                if deal.price >= self._deals[twin].price:
+                    continue
+                print(f"   🔁 {deal.id} is {twin} for less; keeping the cheaper listing")
+                self._drop(twin)
+
+            entry = (score, next(self._seq), deal)
+            if len(self._heap) < self.capacity:
+                heapq.heappush(self._heap, entry)
+            elif score > self._heap[0][0]:
+                evicted = heapq.heapreplace(self._heap, entry)[2].id
+                del self._held[evicted], self._deals[evicted]
+                self.products.remove(evicted)
+            else:
+                continue
+            self._held[deal.id] = score
+            self._deals[deal.id] = deal
+            self.products.add(deal.id, deal.title)
+
+    def _drop(self, deal_id: str):
+        self._heap = [entry for entry in self._heap if entry[2].id != deal_id]
+        heapq.heapify(self._heap)
+        del self._held[deal_id], self._deals[deal_id]
+        self.products.remove(deal_id)
+
+    def due(self, now: Optional[float] = None) -> bool:
+        return (now or time.time()) - self.window_start >= self.window
+
+    def quota(self, remaining: int, now: Optional[float] = None) -> int:
+        """Share of the remaining daily budget for this window."""
+        if remaining <= 0:
+            return 0
+        if not self.window:
+            return remaining
+        now = now or time.time()
+        midnight = datetime.datetime.combine(datetime.date.fromtimestamp(now) + datetime.timedelta(days=1),
+                                             datetime.time())
+        windows_left = max(1, math.ceil((midnight.timestamp() - now) / self.window))
+        return math.ceil(remaining / windows_left)
+
+    def release(self, k: int) -> List[Tuple[float, Deal]]:
+        """Top-k (score, deal), best first; the window restarts and the rest are dropped as stale."""
+        top = heapq.nlargest(k, self._heap) if k > 0 else []
+        self._heap.clear()
+        self._held.clear()
+        self._deals.clear()
+        self.products = ProductIndex()
+        self.window_start = time.time()
+        return [(score, deal) for score, _, deal in top]
+
@@ -1,14 +1,16 @@
 import requests
-from typing import List, Dict
+from typing import List
 from bs4 import BeautifulSoup
 from src.config import Config
+from src.models import Deal
+from src.pricing import discount_percent, parse_cents, parse_parts, to_cents, to_reais
 import random
 import time
 
 class AmazonScraper:
     BASE_URL = "https://www.amazon.com.br/s"
 
-    def search(self, query: str) -> List[Dict]:
+    def search(self, query: str) -> List[Deal]:
         headers = {
             "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
@@ -51,11 +53,8 @@ class AmazonScraper:
                     title = title_tag.text.strip()
                     link = "https://www.amazon.com.br" + link_tag['href']
                     
-                    # Price formatting: 1.234,56 -> 1234.56
-                    price_str = price_whole.text.replace('.', '').replace(',', '')
-                    if price_fraction:
-                        price_str += f".{price_fraction.text}"
-                    price = float(price_str)
+                    # Price formatting: "1.234," + "56" -> 1234.56
+                    price = to_reais(parse_parts(price_whole.text, price_fraction.text if price_fraction else None))
                     
                     # Check for "Limited Time Deal" or "Save X%"
                     # This is hard to parse reliably, so we might just look for strikethrough price
@@ -66,25 +65,17 @@ class AmazonScraper:
                     if original_price_tag:
                         off_text = original_price_tag.find('span', class_='a-offscreen')
                         if off_text:
-                            op_str = off_text.text.replace('R$', '').strip().replace('.', '').replace(',', '.')
-                            try:
-                                original_price = float(op_str)
-                                if original_price > price:
-                                    discount = int(((original_price - price) / original_price) * 100)
-                            except:
-                                pass
+                            original_cents = parse_cents(off_text.text)
+                            if original_cents:
+                                original_price = to_reais(original_cents)
+                                discount = discount_percent(to_cents(price), original_cents)
                     
                     if discount >= Config.MIN_DISCOUNT:
-                        deals.append({
-                            "source": "Amazon",
-                            "id": item['data-asin'],
-                            "title": title,
-                            "price": price,
-                            "original_price": original_price,
-                            "discount": discount,
-                            "link": self._append_affiliate_tag(link),
-                            "image": item.find('img', class_='s-image')['src'] if item.find('img', class_='s-image') else "",
-                        })
+                        img_tag = item.find('img', class_='s-image')
+                        deals.append(Deal.from_amazon(
+                            item['data-asin'], title, self._append_affiliate_tag(link), price,
+                            original_price, image=img_tag['src'] if img_tag else ""
+                        ))
                         
                 except Exception as e:
                     continue
@@ -0,0 +1,81 @@
+"""
+Browser Helpers - Lean page loading for Playwright scraping contexts.
+Aborts images/media/fonts/trackers and replaces fixed scroll sleeps
+with waiting for the card count to stabilize.
+"""
+from typing import Dict, List, Optional
+from src.config import Config
+
+
+def block_resources(context, resource_types: Optional[List[str]] = None,
+                    url_patterns: Optional[List[str]] = None) -> Dict[str, int]:
+    """
+    Install a route handler on a Playwright context that aborts heavy requests.
+
+    Args:
+        context: Playwright BrowserContext
+        resource_types: Resource types to abort (defaults to Config.BLOCKED_RESOURCE_TYPES)
+        url_patterns: URL substrings to abort (defaults to Config.BLOCKED_URL_PATTERNS)
+
+    Returns:
+        Live counters ({'blocked': n, 'allowed': n}) updated as requests are routed.
+    """
+    stats = {"blocked": 0, "allowed": 0}
+    if not Config.BLOCK_RESOURCES:
+        return stats
+
+    blocked_types = frozenset(resource_types if resource_types is not None else Config.BLOCKED_RESOURCE_TYPES)
+    blocked_patterns = tuple(url_patterns if url_patterns is not None else Config.BLOCKED_URL_PATTERNS)
+
+    def handle_route(route):
+        request = route.request
+        if request.resource_type in blocked_types or any(p in request.url for p in blocked_patterns):
+            stats["blocked"] += 1
+            route.abort()
+        else:
+            stats["allowed"] += 1
+            route.continue_()
+
+    context.route("**/*", handle_route)
+    return stats
+
+
+def scroll_until_stable(page, selector: str, max_rounds: int = None, settle_ms: int = None,
+                        stable_rounds: int = 2) -> int:
+    """
+    Scroll to the bottom until the number of cards matching `selector` stops growing.
+
+    Each round returns as soon as new cards appear, so fast pages finish quickly
+    and slow pages get up to `settle_ms` per scroll instead of a fixed sleep.
+
+    Returns:
+        The final card count.
+    """
+    from playwright.sync_api import TimeoutError as PlaywrightTimeout
+
+    max_rounds = max_rounds or Config.SCROLL_MAX_ROUNDS
+    settle_ms = settle_ms or Config.SCROLL_SETTLE_MS
+
+    count = page.eval_on_selector_all(selector, "els => els.length")
+    unchanged = 0
+    for _ in range(max_rounds):
+        page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+        try:
+            page.wait_for_function(
+                "([sel, n]) => document.querySelectorAll(sel).length > n",
+                arg=[selector, count],
+                timeout=settle_ms
+            )
+        except PlaywrightTimeout:
+            pass
+
+        new_count = page.eval_on_selector_all(selector, "els => els.length")
+        if new_count == count:
+            unchanged += 1
+            if unchanged >= stable_rounds:
+                break
+        else:
+            unchanged = 0
+        count = new_count
+
+    return count
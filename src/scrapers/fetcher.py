@@ -0,0 +1,211 @@
+"""
+Tiered Fetcher - HTTP first, browser only when needed.
+A pooled keep-alive HTTP client handles most pages in milliseconds; Playwright
+is launched only when the response is blocked or misses the expected markers.
+Per-source success rates decide which tier to try first.
+"""
+import time
+from collections import deque
+from typing import Dict, List, NamedTuple, Optional
+from src.config import Config
+from src.scrapers.browser import block_resources, scroll_until_stable
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+
+DEFAULT_HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
+    "Accept-Language": "pt-BR,pt;q=0.9,en-US;q=0.8,en;q=0.7",
+    "Upgrade-Insecure-Requests": "1",
+    "Sec-Fetch-Dest": "document",
+    "Sec-Fetch-Mode": "navigate",
+    "Sec-Fetch-Site": "none",
+    "Sec-Fetch-User": "?1",
+}
+
+BLOCKED_STATUSES = (403, 429, 503)
+
+TIER_HTTP = "http"
+TIER_BROWSER = "browser"
+TIERS = (TIER_HTTP, TIER_BROWSER)  # Cheapest first
+
+
+class FetchResult(NamedTuple):
+    html: str
+    tier: str
+    status: int
+    elapsed: float
+
+
+def _build_http_client():
+    """
+    Pooled keep-alive client. Uses httpx with HTTP/2 when available,
+    otherwise a requests Session with a larger connection pool.
+    """
+    encodings = "gzip, deflate"
+    try:
+        import brotli  # noqa: F401
+        encodings += ", br"
+    except ImportError:
+        pass
+    headers = dict(DEFAULT_HEADERS, **{"Accept-Encoding": encodings})
+
+    try:
+        import httpx
+        import h2  # noqa: F401
+        return httpx.Client(
+            http2=True,
+            headers=headers,
+            timeout=Config.HTTP_TIMEOUT,
+            follow_redirects=True,
+            limits=httpx.Limits(max_keepalive_connections=Config.HTTP_POOL_SIZE),
+        )
+    except ImportError:
+        pass
+
+    import requests
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=Config.HTTP_POOL_SIZE, pool_maxsize=Config.HTTP_POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(headers)
+    return session
+
+
+class TieredFetcher:
+    """Fetch pages through the cheapest tier that currently works for each source."""
+
+    def __init__(self):
+        self._http = None
+        self._playwright = None
+        self._browser = None
+        # (source, tier) -> recent outcomes (True = usable page)
+        self._outcomes: Dict[tuple, deque] = {}
+        self._attempts: Dict[tuple, int] = {}
+
+    @property
+    def http(self):
+        if self._http is None:
+            self._http = _build_http_client()
+        return self._http
+
+    def fetch(self, url: str, source: str, markers: Optional[List[str]] = None,
+              scroll_selector: Optional[str] = None) -> Optional[FetchResult]:
+        """
+        Fetch `url`, escalating from HTTP to the browser when needed.
+
+        Args:
+            url: Page URL
+            source: Stats bucket (e.g. "ml_offers", "amazon_search")
+            markers: Substrings a usable page must contain (any of them)
+            scroll_selector: Cards to wait for when the browser tier is used
+
+        Returns:
+            FetchResult, or None if every tier failed.
+        """
+        for tier in self.tier_order(source):
+            start = time.perf_counter()
+            try:
+                if tier == TIER_HTTP:
+                    html, status = self._fetch_http(url)
+                else:
+                    html, status = self._fetch_browser(url, scroll_selector)
+            except Exception as e:
+                print(f"   ⚠️ {tier} fetch failed for {source}: {str(e)[:80]}")
+                html, status = "", 0
+            elapsed = time.perf_counter() - start
+
+            ok = self._is_usable(html, status, markers)
+            self._record(source, tier, ok)
+            if ok:
+                return FetchResult(html, tier, status, elapsed)
+            print(f"   ↪️ {tier} tier unusable for {source} (status {status}), escalating...")
+
+        return None
+
+    def tier_order(self, source: str) -> List[str]:
+        """Tiers to try for `source`, cheapest working tier first."""
+        preferred, demoted = [], []
+        for tier in TIERS:
+            key = (source, tier)
+            self._attempts[key] = self._attempts.get(key, 0) + 1
+            rate = self.success_rate(source, tier)
+            if rate is None or rate >= Config.FETCH_MIN_SUCCESS_RATE:
+                preferred.append(tier)
+            elif self._attempts[key] % Config.FETCH_REPROBE_EVERY == 0:
+                # Give a demoted tier a periodic chance to prove it recovered
+                preferred.append(tier)
+            else:
+                demoted.append(tier)
+        return preferred + demoted
+
+    def success_rate(self, source: str, tier: str) -> Optional[float]:
+        outcomes = self._outcomes.get((source, tier))
+        if not outcomes or len(outcomes) < Config.FETCH_MIN_SAMPLES:
+            return None
+        return sum(outcomes) / len(outcomes)
+
+    def stats(self) -> Dict[str, Dict[str, Optional[float]]]:
+        report: Dict[str, Dict[str, Optional[float]]] = {}
+        for (source, tier) in self._outcomes:
+            report.setdefault(source, {})[tier] = self.success_rate(source, tier)
+        return report
+
+    def release_browser(self):
+        """Shut the browser tier down (it is relaunched on demand); the HTTP pool stays warm."""
+        if self._browser is not None:
+            self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            self._playwright.stop()
+            self._playwright = None
+
+    def close(self):
+        self.release_browser()
+        if self._http is not None:
+            self._http.close()
+            self._http = None
+
+    def _record(self, source: str, tier: str, ok: bool):
+        key = (source, tier)
+        if key not in self._outcomes:
+            self._outcomes[key] = deque(maxlen=Config.FETCH_STATS_WINDOW)
+        self._outcomes[key].append(ok)
+
+    def _is_usable(self, html: str, status: int, markers: Optional[List[str]]) -> bool:
+        if status in BLOCKED_STATUSES or status != 200 or not html:
+            return False
+        if markers:
+            return any(marker in html for marker in markers)
+        lowered = html.lower()
+        return not any(marker in lowered for marker in Config.BLOCK_MARKERS)
+
+    def _fetch_http(self, url: str):
+        response = self.http.get(url, timeout=Config.HTTP_TIMEOUT)
+        return response.text, response.status_code
+
+    def _fetch_browser(self, url: str, scroll_selector: Optional[str]):
+        if self._browser is None:
+            from playwright.sync_api import sync_playwright
+            print("   🕷️ Launching browser fallback tier...")
+            self._playwright = sync_playwright().start()
+            self._browser = self._playwright.chromium.launch(
+                headless=True,
+                args=["--use-gl=egl", "--enable-gpu"],
+                timeout=30000
+            )
+
+        context = self._browser.new_context(
+            user_agent=USER_AGENT,
+            viewport={'width': 1280, 'height': 720}
+        )
+        try:
+            block_resources(context)
+            page = context.new_page()
+            response = page.goto(url, timeout=60000, wait_until='domcontentloaded')
+            if scroll_selector:
+                scroll_until_stable(page, scroll_selector)
+            return page.content(), (response.status if response else 0)
+        finally:
+            context.close()
@@ -1,11 +1,14 @@
 import requests
-from typing import List, Dict, Optional
+from typing import List
 from src.config import Config
+from src.models import Deal
+from src.pricing import parse_cents, to_reais
+from src.scrapers.ml_state import extract_ml_records
 
 class MercadoLivreScraper:
     BASE_URL = "https://api.mercadolibre.com/sites/MLB/search"
 
-    def search(self, query: str) -> List[Dict]:
+    def search(self, query: str) -> List[Deal]:
         # Format query for URL: "jogo de chaves" -> "jogo-de-chaves"
         # formatted_query = query.replace(" ", "-")
         # url = f"https://lista.mercadolivre.com.br/{formatted_query}_Orden_price_asc"
@@ -30,6 +33,15 @@ class MercadoLivreScraper:
         try:
             response = requests.get(url, params=params, headers=headers)
             response.raise_for_status()
+
+            # Fast path: product data embedded as JSON, no DOM parsing needed
+            records = extract_ml_records(response.text)
+            if records is not None:
+                deals = []
+                for record in records:
+                    if record.discount >= Config.MIN_DISCOUNT:
+                        deals.append(record.with_link(self._append_affiliate_tag(record.link)))
+                return deals
             
             from bs4 import BeautifulSoup
             soup = BeautifulSoup(response.text, 'html.parser')
@@ -53,7 +65,7 @@ class MercadoLivreScraper:
 
                     title = title_tag.text.strip()
                     link = link_tag['href']
-                    price = float(price_tag.text.replace('.', '').replace(',', '.'))
+                    price = to_reais(parse_cents(price_tag.text))
                     
                     # Try to find original price for discount calc
                     # This is tricky in HTML, often in a separate 's-item__discount' or similar
@@ -73,16 +85,11 @@ class MercadoLivreScraper:
                             pass
 
                     if discount >= Config.MIN_DISCOUNT:
-                        deals.append({
-                            "source": "Mercado Livre",
-                            "id": link.split('MLB-')[1].split('-')[0] if 'MLB-' in link else link,
-                            "title": title,
-                            "price": price,
-                            "original_price": round(original_price, 2),
-                            "discount": discount,
-                            "link": self._append_affiliate_tag(link),
-                            "image": "", # Image extraction is complex, skipping for now
-                        })
+                        # Image extraction is complex, skipping for now
+                        deals.append(Deal.from_ml(
+                            link, title, self._append_affiliate_tag(link), price,
+                            original_price, discount
+                        ))
                 except Exception as e:
                     continue
             
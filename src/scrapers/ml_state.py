@@ -0,0 +1,185 @@
+"""
+Mercado Livre Embedded State Extractor
+ML listing and offers pages ship their product data as JSON (__PRELOADED_STATE__).
+Parsing it once per page is much cheaper and sturdier than walking CSS classes card by card.
+"""
+import itertools
+import json
+import re
+from typing import Dict, Iterator, List, Optional
+from src.models import Deal, normalize_item_id  # noqa: F401 (re-exported for scrapers)
+
+# <script id="__PRELOADED_STATE__" type="application/json">{...}</script>
+_STATE_TAG_RE = re.compile(
+    r'<script[^>]*\bid=["\']__PRELOADED_STATE__["\'][^>]*>(.*?)</script>',
+    re.S | re.I
+)
+# window.__PRELOADED_STATE__ = {...};
+_STATE_ASSIGN_RE = re.compile(r'__PRELOADED_STATE__\s*=\s*')
+_DISCOUNT_RE = re.compile(r'(\d+)\s*%')
+
+ML_IMAGE_URL = "https://http2.mlstatic.com/D_NQ_NP_{}-O.webp"
+
+_decoder = json.JSONDecoder()
+
+
+def extract_preloaded_state(html: str) -> Optional[Dict]:
+    """
+    Find and parse the embedded state JSON of an ML page.
+
+    Returns:
+        The parsed state, or None if the page has no embedded state.
+    """
+    if not html:
+        return None
+
+    match = _STATE_TAG_RE.search(html)
+    if match:
+        try:
+            return json.loads(match.group(1))
+        except ValueError:
+            pass
+
+    match = _STATE_ASSIGN_RE.search(html)
+    if match:
+        try:
+            state, _ = _decoder.raw_decode(html, match.end())
+            return state
+        except ValueError:
+            pass
+
+    return None
+
+
+def iter_state_records(state) -> Iterator[Deal]:
+    """
+    Walk an embedded state tree and yield one Deal per product.
+
+    Understands both the 'polycard' layout (offers pages, new listings) and
+    the classic search 'results' entries. Records are unfiltered; quality
+    gates stay in the scrapers.
+    """
+    seen = set()
+    stack = [state]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+            continue
+        if not isinstance(node, dict):
+            continue
+
+        record = None
+        if isinstance(node.get('polycard'), dict):
+            record = _from_polycard(node['polycard'])
+        elif _looks_like_result(node):
+            record = _from_result(node)
+
+        if record is not None:
+            if record.id not in seen:
+                seen.add(record.id)
+                yield record
+            continue
+
+        stack.extend(reversed(list(node.values())))
+
+
+def iter_ml_records(html: str) -> Optional[Iterator[Deal]]:
+    """
+    Lazily extract normalized records from an ML page's embedded state,
+    so the first deal can move down the pipeline before the rest are parsed.
+
+    Returns:
+        Iterator of records, or None when the page has no usable state
+        (callers should then fall back to DOM selectors).
+    """
+    state = extract_preloaded_state(html)
+    if state is None:
+        return None
+    records = iter_state_records(state)
+    first = next(records, None)
+    if first is None:
+        return None
+    return itertools.chain((first,), records)
+
+
+def extract_ml_records(html: str) -> Optional[List[Deal]]:
+    """List form of iter_ml_records()."""
+    records = iter_ml_records(html)
+    return list(records) if records is not None else None
+
+
+def _record(item_id, title, link, price, original_price=None, discount=0,
+            rating=0.0, seller="", image="", coupon="") -> Optional[Deal]:
+    if price is None:
+        return None
+    try:
+        return Deal.from_ml(item_id, title, link, price, original_price, discount,
+                            rating, seller, image, coupon)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_discount(text) -> int:
+    match = _DISCOUNT_RE.search(text or "")
+    return int(match.group(1)) if match else 0
+
+
+def _from_polycard(card: Dict) -> Optional[Deal]:
+    metadata = card.get('metadata') or {}
+    title = price = original_price = None
+    discount = 0
+    rating = 0.0
+    seller = coupon = ""
+
+    for component in card.get('components') or []:
+        kind = component.get('type')
+        body = component.get(kind) or {}
+        if kind == 'title':
+            title = body.get('text')
+        elif kind == 'price':
+            price = (body.get('current_price') or {}).get('value')
+            original_price = (body.get('previous_price') or {}).get('value')
+            discount = _parse_discount((body.get('discount_label') or {}).get('text'))
+        elif kind == 'reviews':
+            rating = body.get('rating_average') or 0.0
+        elif kind == 'seller':
+            # Seller text carries template markers like "{icon} Por Loja X"
+            seller = re.sub(r'\{[^}]*\}', '', body.get('text') or '').strip()
+        elif kind == 'coupon':
+            coupon = (body.get('text') or (body.get('label') or {}).get('text') or '').strip()
+
+    image = ""
+    pictures = (card.get('pictures') or {}).get('pictures') or []
+    if pictures and pictures[0].get('id'):
+        image = ML_IMAGE_URL.format(pictures[0]['id'])
+
+    return _record(
+        metadata.get('id'), title, metadata.get('url') or "", price,
+        original_price, discount, rating, seller, image, coupon
+    )
+
+
+def _looks_like_result(node: Dict) -> bool:
+    return (
+        isinstance(node.get('id'), str) and node['id'].startswith('MLB')
+        and 'title' in node and 'price' in node and 'permalink' in node
+    )
+
+
+def _from_result(node: Dict) -> Optional[Deal]:
+    price = node.get('price')
+    if isinstance(price, dict):
+        price = price.get('amount', price.get('value'))
+    original_price = node.get('original_price')
+    if isinstance(original_price, dict):
+        original_price = original_price.get('amount', original_price.get('value'))
+
+    seller = node.get('seller') or {}
+    reviews = node.get('reviews') or {}
+    return _record(
+        node['id'], node.get('title'), node.get('permalink') or "", price,
+        original_price, 0, reviews.get('rating_average', 0.0),
+        seller.get('nickname', '') if isinstance(seller, dict) else "",
+        node.get('thumbnail') or ""
+    )
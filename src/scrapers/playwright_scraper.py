@@ -1,332 +1,341 @@
-from playwright.sync_api import sync_playwright
-from typing import List, Dict
-import time
-import random
-import re
+from typing import List, Iterator, Optional, Tuple
+from urllib.parse import quote_plus
 from src.config import Config
+from src.coupons import CouponCache
+from src.filtering import BatchFilter, describe
+from src.pricing import parse_many, parse_percent, parse_rating, to_reais
+from src.scrapers.fetcher import TieredFetcher
+from src.models import Deal
+from src.scrapers.ml_state import iter_ml_records
+
+ML_OFFERS_URL = Config.ML_BASE_URL + "/ofertas?container_id=MLB779362-1&promotion_type=lightning"
+ML_LIST_URL = Config.ML_LIST_BASE_URL + "/{}_Orden_price_asc"
+ML_LIST_PAGE_URL = Config.ML_LIST_BASE_URL + "/{}_Desde_{}_Orden_price_asc"
+ML_LIST_PAGE_SIZE = 48
+AMAZON_SEARCH_URL = Config.AMAZON_BASE_URL + "/s?k={}"
+
+# Markers a page must contain to count as a real result page (not a block/captcha page)
+# Coupon badge on offer/search cards (same card as price and title)
+ML_COUPON_SELECTOR = 'span.poly-component__coupon, span[class*="coupon"], span[class*="cupom"]'
+ML_MARKERS = ["__PRELOADED_STATE__", "andes-card", "ui-search-layout__item", "ui-search-result__wrapper"]
+AMAZON_MARKERS = ['data-component-type="s-search-result"']
+
+
+def _soup(html: str):
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html, 'html.parser')
+
+
+def _text(el) -> str:
+    return el.get_text().strip() if el else ""
+
+
+def _money_text(fraction_el) -> str:
+    """ML andes-money-amount: reais fraction span plus its cents span, if any ("1.299,90")."""
+    cents_el = fraction_el.find_next_sibling('span', class_='andes-money-amount__cents')
+    return f"{_text(fraction_el)},{_text(cents_el)}" if cents_el else _text(fraction_el)
+
 
 class PlaywrightScraper:
-    def scrape_ml_offers(self) -> List[Dict]:
-        deals = []
-        url = "https://www.mercadolivre.com.br/ofertas?container_id=MLB779362-1&promotion_type=lightning#filter_applied=promotion_type&filter_position=2&is_recommended_domain=false&origin=scut"
-        
-        with sync_playwright() as p:
-            print("   🕷️ Launching browser for scraping...")
-            browser = p.chromium.launch(
-                headless=True,
-                args=["--use-gl=egl", "--enable-gpu"],
-                timeout=30000
-            )
-            context = browser.new_context(
-                user_agent="Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
-                viewport={'width': 1280, 'height': 720}
-            )
-            page = context.new_page()
-            
+    """
+    Mercado Livre offers/search and Amazon search.
+    Pages come from the TieredFetcher (pooled HTTP first, Playwright only as a
+    fallback) and are parsed from ML's embedded state, with CSS selectors as backup.
+    With Config.ENABLE_COUPONS, ML coupon badges on those cards feed the
+    CouponCache, so discounts are judged with the coupon applied.
+    """
+
+    def __init__(self, fetcher: TieredFetcher = None, coupons: CouponCache = None):
+        self.fetcher = fetcher or TieredFetcher()
+        self.coupons = coupons or CouponCache()
+        self.filter = BatchFilter()
+
+    def scrape_ml_offers(self) -> List[Deal]:
+        return list(self.iter_ml_offers())
+
+    def iter_ml_offers(self, max_pages: Optional[int] = None, match_keywords: bool = False) -> Iterator[Deal]:
+        """
+        Walk the lightning offers pages, yielding deals page by page.
+
+        Stops at `max_pages` (Config.CRAWL_MAX_PAGES) or as soon as a page has
+        nothing at or above Config.MIN_DISCOUNT. Only one page is held in memory.
+        With `match_keywords`, only titles containing one of Config.KEYWORDS are kept.
+        """
+        max_pages = max_pages or Config.CRAWL_MAX_PAGES
+
+        try:
+            for page_number in range(1, max_pages + 1):
+                url = ML_OFFERS_URL if page_number == 1 else f"{ML_OFFERS_URL}&page={page_number}"
+                print(f"   🕷️ Fetching offers page {page_number}: {url[:50]}...")
+                page = self.fetcher.fetch(url, "ml_offers", ML_MARKERS, scroll_selector='div.andes-card')
+                if page is None:
+                    print("Error scraping ML Offers: every fetch tier failed")
+                    return
+                print(f"   🕷️ Page fetched via {page.tier} in {page.elapsed:.2f}s")
+
+                # Fast path: product data embedded as JSON in the page
+                records = iter_ml_records(page.html)
+                if records is not None:
+                    print("Streaming offers from ML embedded state")
+                else:
+                    # Use 'andes-card' as the main container for offers
+                    items = _soup(page.html).select('div.andes-card')
+                    print(f"Found {len(items)} potential offers on ML")
+                    records = self._parse_ml_offer_cards(items)
+                del page
+
+                # Quality gates run on the whole page at once
+                cards, discounts = self._with_coupons(records)
+                deals, result = self.filter.apply_deals(cards, discounts, require_rating=True, match_keywords=match_keywords)
+                print(f"   🧮 Offers page {page_number}: {describe(result)}")
+                for record in deals:
+                    yield record.with_link(self._append_affiliate_tag(record.link, "ML"))
+
+                if not result.has_discounts:
+                    print(f"   ⏹️ Page {page_number} has nothing above {Config.MIN_DISCOUNT}% off, stopping crawl.")
+                    return
+
+        except Exception as e:
+            print(f"Error scraping ML Offers: {e}")
+        finally:
+            self.fetcher.release_browser()
+
+    def _with_coupons(self, records) -> Tuple[List[Deal], Optional[List[int]]]:
+        """
+        A page's cards, plus the discounts to gate them on: with Config.ENABLE_COUPONS,
+        coupon badges are cached/filled in and count toward the discount; otherwise
+        the cards' own discounts are used (None).
+        """
+        cards = list(records)
+        if not Config.ENABLE_COUPONS:
+            return cards, None
+        cards = [self.coupons.apply(card) for card in cards]
+        return cards, [self.coupons.discount(card) for card in cards]
+
+    def _parse_ml_offer_cards(self, items) -> Iterator[Deal]:
+        """DOM fallback for the offers page: one unfiltered record per 'andes-card'."""
+        cards = []
+        for item in items:
+            # Selectors for "Ofertas" page (Poly components)
+            title_el = item.select_one('a.poly-component__title')
+            price_el = item.select_one('div.poly-price__current span.andes-money-amount__fraction')
+            if title_el and price_el:
+                cards.append((item, title_el, _money_text(price_el)))
+
+        # Prices for the whole page in one pass
+        prices = parse_many([price_text for _, _, price_text in cards])
+        for (item, title_el, _), price_cents in zip(cards, prices):
             try:
-                print(f"   🕷️ Navigating to: {url[:50]}...")
-                page.goto(url, timeout=60000)
-                print("   🕷️ Page loaded, waiting for DOM...")
-                page.wait_for_load_state('domcontentloaded')
-                
-                # Scroll to load items
-                for _ in range(3):
-                    page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                    time.sleep(1)
-                
-                # Use 'andes-card' as the main container for offers
-                items = page.query_selector_all('div.andes-card')
-                print(f"Found {len(items)} potential offers on ML")
-
-                for item in items:
-                    try:
-                        # Selectors for "Ofertas" page (Poly components)
-                        title_el = item.query_selector('a.poly-component__title')
-                        price_el = item.query_selector('div.poly-price__current span.andes-money-amount__fraction')
-                        link_el = item.query_selector('a.poly-component__title')
-                        
-                        if not title_el or not price_el:
-                            continue
-                            
-                        title = title_el.inner_text().strip()
-                        link = link_el.get_attribute('href')
-                        price = float(price_el.inner_text().replace('.', '').replace(',', '.'))
-                        
-                        # Discount
-                        discount = 0
-                        original_price = price
-                        
-                        discount_el = item.query_selector('span.poly-price__disc_label')
-                        if discount_el:
-                            d_text = discount_el.inner_text().replace('% OFF', '').strip()
-                            try:
-                                discount = int(d_text)
-                                original_price = price / (1 - discount/100)
-                            except:
-                                pass
-                        
-                        # Image
-                        image = ""
-                        img_el = item.query_selector('img.poly-component__picture')
-                        if img_el:
-                            image = img_el.get_attribute('data-src') or img_el.get_attribute('src')
-
-                        # Rating (Quality Check)
-                        rating = 0.0
-                        rating_el = item.query_selector('span.poly-reviews__rating')
-                        if rating_el:
-                            try:
-                                rating = float(rating_el.inner_text().strip())
-                            except:
-                                pass
-                        
-                        if rating > 0 and rating < Config.MIN_RATING:
-                            # print(f"Skipping {title[:20]}... (Rating {rating} < {Config.MIN_RATING})")
-                            continue
-
-                        # Seller Reputation (Basic Check)
-                        # We prefer "Loja oficial" or "MercadoLíder"
-                        seller = ""
-                        seller_el = item.query_selector('span.poly-component__seller')
-                        if seller_el:
-                            seller = seller_el.inner_text().strip()
-                        
-                        # If it's a new seller (no rating, no seller info), be cautious.
-                        # But for now, we rely on the rating filter. 
-                        # If rating is 0 (no reviews), we might want to skip if strict.
-                        # User said "Filter out new sellers". 0 rating usually means new.
-                        if rating == 0:
-                             # print(f"Skipping {title[:20]}... (No rating/New seller)")
-                             continue
-
-                        # Extract ID robustly
-                        # Link format: .../p/MLB12345 or .../MLB-12345...
-                        item_id = link
-                        mlb_match = re.search(r'(MLB-?\d+)', link)
-                        if mlb_match:
-                            item_id = mlb_match.group(1).replace('-', '') # Normalize to MLB12345
-                        
-                        if discount >= Config.MIN_DISCOUNT:
-                            deals.append({
-                                "source": "Mercado Livre",
-                                "id": item_id,
-                                "title": title,
-                                "price": price,
-                                "original_price": round(original_price, 2),
-                                "discount": discount,
-                                "rating": rating,
-                                "seller": seller,
-                                "link": self._append_affiliate_tag(link, "ML"),
-                                "image": image,
-                            })
-                    except Exception as e:
-                        # print(f"Error parsing ML offer: {e}")
-                        continue
+                if not price_cents:
+                    continue
 
+                title = _text(title_el)
+                link = title_el.get('href')
+                price = to_reais(price_cents)
+
+                # Discount
+                discount = parse_percent(_text(item.select_one('span.poly-price__disc_label'))) or 0
+                original_price = price / (1 - discount/100) if 0 < discount < 100 else price
+
+                # Image
+                image = ""
+                img_el = item.select_one('img.poly-component__picture')
+                if img_el:
+                    image = img_el.get('data-src') or img_el.get('src') or ""
+
+                # Rating (Quality Check)
+                rating = parse_rating(_text(item.select_one('span.poly-reviews__rating')))
+
+                # Seller Reputation (Basic Check)
+                # We prefer "Loja oficial" or "MercadoLíder"
+                seller = _text(item.select_one('span.poly-component__seller'))
+
+                coupon = _text(item.select_one(ML_COUPON_SELECTOR))
+
+                # Link format: .../p/MLB12345 or .../MLB-12345... (ID normalized by Deal.from_ml)
+                yield Deal.from_ml(link, title, link, price, original_price, discount,
+                                   rating=rating, seller=seller, image=image, coupon=coupon)
             except Exception as e:
-                print(f"Error scraping ML Offers: {e}")
-            
-            browser.close()
-            
+                # print(f"Error parsing ML offer: {e}")
+                continue
+
+    def search(self, query: str) -> List[Deal]:
+        deals = list(self.iter_ml_search(query))
+        deals.extend(self.iter_amazon_search(query))
         return deals
 
-    def search(self, query: str) -> List[Dict]:
-        deals = []
-        with sync_playwright() as p:
-            # Launch browser
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context(
-                user_agent="Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
-                viewport={'width': 1280, 'height': 720}
+    def iter_ml_search(self, query: str, max_pages: Optional[int] = None) -> Iterator[Deal]:
+        """
+        Walk the ML listing for `query` (price ascending), yielding deals page by page.
+
+        Stops at `max_pages` (Config.SEARCH_MAX_PAGES) or at the first page with
+        nothing at or above Config.MIN_DISCOUNT.
+        """
+        max_pages = max_pages or Config.SEARCH_MAX_PAGES
+
+        # Only apply brand gate if searching for Tools (Category A)
+        # We can infer this if the query is in the Tools list
+        is_tool_search = query in Config.KEYWORD_CATEGORIES["tools"]
+
+        try:
+            # Format query: "jogo de chaves" -> "jogo-de-chaves"
+            formatted_query = query.replace(" ", "-")
+
+            for page_number in range(1, max_pages + 1):
+                if page_number == 1:
+                    ml_url = ML_LIST_URL.format(formatted_query)
+                else:
+                    offset = (page_number - 1) * ML_LIST_PAGE_SIZE + 1
+                    ml_url = ML_LIST_PAGE_URL.format(formatted_query, offset)
+                print(f"Searching ML for {query} (page {page_number}): {ml_url}")
+
+                page = self.fetcher.fetch(ml_url, "ml_search", ML_MARKERS)
+                if page is None:
+                    raise RuntimeError("every fetch tier failed")
+
+                # Fast path: product data embedded as JSON in the page
+                records = iter_ml_records(page.html)
+                if records is not None:
+                    print(f"Streaming items from ML embedded state ({page.tier})")
+                else:
+                    # ML Search Results Selectors
+                    # Usually 'li.ui-search-layout__item' or 'div.ui-search-result__wrapper'
+                    soup = _soup(page.html)
+                    items = soup.select('li.ui-search-layout__item')
+                    if not items:
+                        items = soup.select('div.ui-search-result__wrapper')
+
+                    print(f"Found {len(items)} items on ML Search ({page.tier})")
+                    records = self._parse_ml_search_cards(items)
+                del page
+
+                # Quality Control Protocols (Phase 4), on the whole page at once:
+                # Protocol 2: Noise Canceller (negative keywords, always on)
+                # Protocol 1: Quality Gate (brand filtering, tool searches only)
+                cards, discounts = self._with_coupons(records)
+                deals, result = self.filter.apply_deals(cards, discounts, check_rating=False, brand_gate=is_tool_search)
+                print(f"   🧮 ML search page {page_number}: {describe(result)}")
+                yield from deals  # Original links, converted later
+
+                if not result.has_discounts:
+                    return
+
+        except Exception as e:
+            print(f"Error searching ML: {e}")
+        finally:
+            self.fetcher.release_browser()
+
+    def iter_amazon_search(self, query: str) -> Iterator[Deal]:
+        try:
+            print(f"Scraping Amazon for {query}...")
+            page = self.fetcher.fetch(
+                AMAZON_SEARCH_URL.format(quote_plus(query)), "amazon_search", AMAZON_MARKERS,
+                scroll_selector='div[data-component-type="s-search-result"]'
             )
-            page = context.new_page()
+            if page is None:
+                raise RuntimeError("every fetch tier failed")
+
+            items = _soup(page.html).select('div[data-component-type="s-search-result"]')
+            print(f"Found {len(items)} items on Amazon ({page.tier})")
+
+            # Skip new sellers/products (no rating) as well as low ratings
+            deals, result = self.filter.apply_deals(list(self._parse_amazon_cards(items)), require_rating=True)
+            print(f"   🧮 Amazon '{query}': {describe(result)}")
+            for record in deals:
+                yield record.with_link(self._append_affiliate_tag(record.link, "AMZ"))
+
+        except Exception as e:
+            print(f"Error scraping Amazon: {e}")
+        finally:
+            self.fetcher.release_browser()
+
+    def _parse_ml_search_cards(self, items) -> Iterator[Deal]:
+        """DOM fallback for ML search listings: one unfiltered record per result."""
+        cards = []
+        for item in items:
+            title_el = item.select_one('h2.ui-search-item__title')
+            link_el = item.select_one('a.ui-search-link')
+            price_el = item.select_one('span.andes-money-amount__fraction')
+            if title_el and link_el and price_el:
+                cards.append((item, title_el, link_el, _money_text(price_el)))
 
-            # --- 1. Mercado Livre Search ---
+        prices = parse_many([price_text for *_, price_text in cards])
+        for (item, title_el, link_el, _), price_cents in zip(cards, prices):
             try:
-                # Format query: "jogo de chaves" -> "jogo-de-chaves"
-                formatted_query = query.replace(" ", "-")
-                ml_url = f"https://lista.mercadolivre.com.br/{formatted_query}_Orden_price_asc"
-                print(f"Searching ML for {query}: {ml_url}")
-                
-                page.goto(ml_url, timeout=60000)
-                page.wait_for_load_state('domcontentloaded')
-                
-                # ML Search Results Selectors
-                # Usually 'li.ui-search-layout__item' or 'div.ui-search-result__wrapper'
-                items = page.query_selector_all('li.ui-search-layout__item')
-                if not items:
-                    items = page.query_selector_all('div.ui-search-result__wrapper')
-                
-                print(f"Found {len(items)} items on ML Search")
-                
-                for item in items:
-                    try:
-                        title_el = item.query_selector('h2.ui-search-item__title')
-                        link_el = item.query_selector('a.ui-search-link')
-                        price_el = item.query_selector('span.andes-money-amount__fraction')
-                        
-                        if not title_el or not link_el or not price_el:
-                            continue
-
-                        title = title_el.inner_text().strip()
-                        link = link_el.get_attribute('href')
-                        price = float(price_el.inner_text().replace('.', '').replace(',', '.'))
-                        
-                        # Discount
-                        discount = 0
-                        original_price = price
-                        
-                        discount_el = item.query_selector('span.ui-search-price__discount')
-                        if discount_el:
-                            d_text = discount_el.inner_text().replace('% OFF', '').strip()
-                            try:
-                                discount = int(d_text)
-                                original_price = price / (1 - discount/100)
-                            except:
-                                pass
-                        
-                        # Rating
-                        rating = 0.0
-                        # ML search sometimes doesn't show rating clearly, or uses different classes
-                        # Try to find star icon or aria-label
-                        
-                        # Image
-                        image = ""
-                        img_el = item.query_selector('img.ui-search-result-image__element')
-                        if img_el:
-                            image = img_el.get_attribute('src')
-
-                        # ID Extraction
-                        item_id = link
-                        mlb_match = re.search(r'(MLB-?\d+)', link)
-                        if mlb_match:
-                            item_id = mlb_match.group(1).replace('-', '')
-
-                        # Quality Control Protocols (Phase 4)
-                        
-                        # Protocol 2: Noise Canceller (Negative Keywords)
-                        if any(neg.lower() in title.lower() for neg in Config.NEGATIVE_KEYWORDS):
-                            # print(f"   Skipped (Negative Keyword): {title[:30]}...")
-                            continue
-
-                        # Protocol 1: Quality Gate (Brand Filtering)
-                        # Only apply if searching for Tools (Category A)
-                        # We can infer this if the query is in the Tools list
-                        is_tool_search = query in Config.KEYWORDS[:15] # First 15 are tools
-                        
-                        if is_tool_search:
-                            # Check if title contains any preferred brand
-                            has_preferred_brand = any(brand.lower() in title.lower() for brand in Config.PREFERRED_BRANDS)
-                            if not has_preferred_brand:
-                                # print(f"   Skipped (Brand Mismatch): {title[:30]}...")
-                                continue
-                        
-                        if discount >= Config.MIN_DISCOUNT:
-                            deals.append({
-                                "source": "Mercado Livre",
-                                "id": item_id,
-                                "title": title,
-                                "price": price,
-                                "original_price": round(original_price, 2),
-                                "discount": discount,
-                                "rating": rating, 
-                                "link": link, # Original link, will be converted later
-                                "image": image,
-                            })
-                        else:
-                             # print(f"   Skipped (Low Discount {discount}%): {title[:20]}...")
-                             pass
-                    except Exception as e:
-                        continue
+                if not price_cents:
+                    continue
 
+                title = _text(title_el)
+                link = link_el.get('href')
+                price = to_reais(price_cents)
+
+                # Discount
+                discount = parse_percent(_text(item.select_one('span.ui-search-price__discount'))) or 0
+                original_price = price / (1 - discount/100) if 0 < discount < 100 else price
+
+                # Rating
+                rating = 0.0
+                # ML search sometimes doesn't show rating clearly, or uses different classes
+                # Try to find star icon or aria-label
+
+                # Image
+                image = ""
+                img_el = item.select_one('img.ui-search-result-image__element')
+                if img_el:
+                    image = img_el.get('data-src') or img_el.get('src') or ""
+
+                coupon = _text(item.select_one(ML_COUPON_SELECTOR))
+
+                yield Deal.from_ml(link, title, link, price, original_price, discount,
+                                   rating=rating, image=image, coupon=coupon)
             except Exception as e:
-                print(f"Error searching ML: {e}")
+                continue
+
+    def _parse_amazon_cards(self, items) -> Iterator[Deal]:
+        """Amazon search results: one unfiltered record per 's-search-result'."""
+        cards = []
+        for item in items:
+            # Title: Try multiple selectors
+            title_el = item.select_one('h2 a span')
+            if not title_el: title_el = item.select_one('span.a-text-normal')
+
+            # Link
+            link_el = item.select_one('h2 a')
+            if not link_el: link_el = item.select_one('a.a-link-normal.s-no-outline')
 
-            # --- 2. Amazon Search ---
+            # Price: "1.299," whole span + "90" fraction span
+            price_whole = item.select_one('span.a-price-whole')
+
+            if not title_el or not link_el or not price_whole:
+                # print("Amazon: Missing core element")
+                continue
+            price_text = f"{_text(price_whole).rstrip(',')},{_text(item.select_one('span.a-price-fraction')) or '00'}"
+            # "List Price" or "Typical Price" ("R$ 1.499,90")
+            cards.append((item, title_el, link_el, price_text,
+                          _text(item.select_one('span.a-text-price span.a-offscreen'))))
+
+        prices = parse_many([card[3] for card in cards])
+        list_prices = parse_many([card[4] for card in cards])
+        for (item, title_el, link_el, _, _), price_cents, list_cents in zip(cards, prices, list_prices):
             try:
-                print(f"Scraping Amazon for {query}...")
-                page.goto(f"https://www.amazon.com.br/s?k={query}", timeout=60000)
-                page.wait_for_load_state('domcontentloaded')
-                time.sleep(2)
-                
-                items = page.query_selector_all('div[data-component-type="s-search-result"]')
-                print(f"Found {len(items)} items on Amazon")
-                
-                for item in items:
-                    try:
-                        # Title: Try multiple selectors
-                        title_el = item.query_selector('h2 a span')
-                        if not title_el: title_el = item.query_selector('span.a-text-normal')
-                        
-                        # Link
-                        link_el = item.query_selector('h2 a')
-                        if not link_el: link_el = item.query_selector('a.a-link-normal.s-no-outline')
-                        
-                        # Price
-                        price_whole = item.query_selector('span.a-price-whole')
-                        
-                        if not title_el or not link_el or not price_whole:
-                            # print("Amazon: Missing core element")
-                            continue
-                            
-                        title = title_el.inner_text().strip()
-                        link = "https://www.amazon.com.br" + link_el.get_attribute('href')
-                        price_str = price_whole.inner_text().replace('.', '').replace(',', '')
-                        price = float(price_str)
-                        
-                        # Discount
-                        discount = 0
-                        original_price = price
-                        
-                        # Look for "List Price" or "Typical Price"
-                        op_el = item.query_selector('span.a-text-price span.a-offscreen')
-                        if op_el:
-                             op_str = op_el.inner_text().replace('R$', '').strip().replace('.', '').replace(',', '.')
-                             try:
-                                 original_price = float(op_str)
-                                 if original_price > price:
-                                     discount = int(((original_price - price) / original_price) * 100)
-                             except:
-                                 pass
-
-                        # Rating
-                        rating = 0.0
-                        rating_el = item.query_selector('span.a-icon-alt')
-                        if rating_el:
-                            r_text = rating_el.inner_text().split(' ')[0].replace(',', '.')
-                            try:
-                                rating = float(r_text)
-                            except:
-                                pass
-                        
-                        if rating > 0 and rating < Config.MIN_RATING:
-                            continue
-                        
-                        # Skip if no rating (New seller/product)
-                        if rating == 0:
-                            continue
-
-                        if discount >= Config.MIN_DISCOUNT:
-                            deals.append({
-                                "source": "Amazon",
-                                "id": item.get_attribute('data-asin'),
-                                "title": title,
-                                "price": price,
-                                "original_price": round(original_price, 2),
-                                "discount": discount,
-                                "rating": rating,
-                                "link": self._append_affiliate_tag(link, "AMZ"),
-                                "image": item.query_selector('img.s-image').get_attribute('src') if item.query_selector('img.s-image') else "",
-                            })
-                    except Exception as e:
-                        continue
+                if not price_cents:
+                    continue
 
-            except Exception as e:
-                print(f"Error scraping Amazon: {e}")
+                title = _text(title_el)
+                link = "https://www.amazon.com.br" + link_el.get('href')
+                price = to_reais(price_cents)
 
-            browser.close()
-        
-        return deals
+                # Discount is derived by Deal.from_amazon from the list price
+                original_price = to_reais(list_cents) if list_cents else price
+
+                # Rating ("4,5 de 5 estrelas")
+                rating = parse_rating(_text(item.select_one('span.a-icon-alt')))
+
+                img_el = item.select_one('img.s-image')
+                yield Deal.from_amazon(item.get('data-asin'), title, link, price, original_price,
+                                       rating=rating, image=img_el.get('src') if img_el else "")
+            except Exception as e:
+                continue
 
     def _append_affiliate_tag(self, url: str, source: str) -> str:
         if not url: return ""
@@ -0,0 +1,106 @@
+"""
+Shopee Scraper - Product offers from the Shopee Affiliate GraphQL API.
+Keyword queries run concurrently behind a shared rate limiter; every page of
+results gets its affiliate short links in one batched mutation.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from src.config import Config
+from src.filtering import BatchFilter, describe
+from src.models import Deal
+from src.services.shopee_graphql_client import RateLimiter, ShopeeGraphQLClient
+
+
+class ShopeeScraper:
+    def __init__(self, client: Optional[ShopeeGraphQLClient] = None):
+        self.client = client or ShopeeGraphQLClient(
+            Config.SHOPEE_APP_ID,
+            Config.SHOPEE_SECRET,
+            RateLimiter(Config.SHOPEE_REQUESTS_PER_SECOND, burst=Config.SHOPEE_WORKERS),
+            cache_ttl=Config.SHOPEE_CACHE_TTL,
+        )
+        self.filter = BatchFilter()
+
+    def search(self, query: str) -> List[Deal]:
+        return list(self.iter_search([query]))
+
+    def iter_search(self, keywords: Iterable[str], max_pages: Optional[int] = None) -> Iterator[Deal]:
+        """
+        Query every keyword concurrently, yielding deals in keyword order.
+
+        Workers keep fetching later keywords while earlier ones are consumed;
+        pending queries are cancelled if the consumer stops early.
+        """
+        max_pages = max_pages or Config.SHOPEE_MAX_PAGES
+        executor = ThreadPoolExecutor(max_workers=Config.SHOPEE_WORKERS, thread_name_prefix="shopee")
+        futures = [executor.submit(self._search_keyword, keyword, max_pages) for keyword in keywords]
+        try:
+            for future in futures:
+                try:
+                    deals = future.result()
+                except Exception as e:
+                    print(f"Error searching Shopee: {e}")
+                    continue
+                yield from deals
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _search_keyword(self, keyword: str, max_pages: int) -> List[Deal]:
+        print(f"   🛍️ Querying Shopee for {keyword}...")
+        nodes = list(self.client.iter_product_offers(
+            keyword, limit=Config.SHOPEE_PAGE_LIMIT, max_pages=max_pages))
+        # Gate before asking for short links, so rejected offers cost nothing
+        result = self.filter.apply(*self._columns(nodes))
+        print(f"   🧮 Shopee '{keyword}': {describe(result)}")
+        nodes = [nodes[i] for i in result.accepted]
+        if not nodes:
+            return []
+
+        links = self.client.generate_short_links(
+            [node.get('productLink') for node in nodes],
+            [Config.SHOPEE_SUB_ID],
+            batch_size=Config.SHOPEE_SHORTLINK_BATCH,
+        )
+
+        deals = []
+        for node in nodes:
+            deal = self._to_deal(node, links)
+            if deal:
+                deals.append(deal)
+        print(f"   🛍️ Shopee '{keyword}': {len(deals)} deals")
+        return deals
+
+    @staticmethod
+    def _columns(nodes: List[Dict]) -> Tuple[List[float], List[float], List[float], List[float], List[str]]:
+        """price, original price, discount, rating, title per node; unparseable nodes get price 0."""
+        price, discount, rating, titles = [], [], [], []
+        for node in nodes:
+            try:
+                values = (float(node.get('priceMin') or 0), int(node.get('priceDiscountRate') or 0),
+                          float(node.get('ratingStar') or 0))
+            except (TypeError, ValueError):
+                values = (0.0, 0, 0.0)
+            price.append(values[0])
+            discount.append(values[1])
+            rating.append(values[2])
+            titles.append(node.get('productName') or "")
+        # The API only gives the discount rate, not the original price
+        return price, price, discount, rating, titles
+
+    @staticmethod
+    def _to_deal(node: Dict, links: Dict[str, str]) -> Optional[Deal]:
+        # Prefer our tagged short link; offerLink is already an affiliate link as fallback
+        link = links.get(node.get('productLink')) or node.get('offerLink')
+        try:
+            return Deal.from_shopee(
+                node.get('itemId'),
+                node.get('productName'),
+                link,
+                node.get('priceMin'),
+                discount=node.get('priceDiscountRate'),
+                rating=node.get('ratingStar'),
+                seller=node.get('shopName'),
+                image=node.get('imageUrl'),
+            )
+        except (TypeError, ValueError):
+            return None
@@ -0,0 +1,132 @@
+"""
+Synthetic Scraper - Seeded, scalable deal source for load testing
+Generates realistic deals from Config.KEYWORDS / PREFERRED_BRANDS /
+NEGATIVE_KEYWORDS with controlled duplicate and noise ratios, so filtering,
+dedup, DB writes and dispatch can be exercised at 10^3-10^6 deals without
+touching a marketplace. Same seed -> same stream.
+
+Enable with SCRAPER_BACKEND=synthetic (see Config.SYNTHETIC_*). Jobs consume
+iter_filtered(), which runs the stream through the same BatchFilter gates as a
+scraped page.
+"""
+import itertools
+import math
+import random
+from dataclasses import replace
+from typing import Iterator, List, Optional
+from src.config import Config
+from src.filtering import BatchFilter
+from src.models import Deal
+
+OTHER_BRANDS = ["Tramontina", "Mundial", "Gedore", "Tekbond", "Intelbras", "Multilaser", "Genérico", "Importado"]
+MODIFIERS = ["Profissional", "Sem Fio", "Bivolt", "110V", "220V", "com Maleta", "Kit Completo",
+             "Inox", "Original", "Compacto", "Reforçado", "Premium", "Portátil"]
+SELLERS = ["Loja Oficial", "MercadoLíder Platinum", "MercadoLíder Gold", "Loja Parceira", ""]
+
+# (source, share of the stream)
+SOURCE_MIX = (("ml", 0.6), ("amazon", 0.3), ("shopee", 0.1))
+
+PRICE_MEDIAN = 180.0   # R$; prices are log-normal around this
+PRICE_SIGMA = 0.9
+DUPLICATE_POOL = 10000  # Recent deals a duplicate is drawn from
+PAGE_SIZE = 48          # Deals per quality-gate batch, like one ML listing page
+
+
+class SyntheticScraper:
+    def __init__(self, seed: Optional[int] = None, volume: Optional[int] = None,
+                 duplicate_ratio: Optional[float] = None, negative_ratio: Optional[float] = None,
+                 discount_ratio: Optional[float] = None):
+        """
+        Args:
+            seed: RNG seed (Config.SYNTHETIC_SEED)
+            volume: Deals per stream, duplicates included (Config.SYNTHETIC_VOLUME)
+            duplicate_ratio: Share of re-emitted earlier deals, some with a new price
+            negative_ratio: Share of titles carrying a negative keyword
+            discount_ratio: Share of deals at or above Config.MIN_DISCOUNT
+        """
+        self.seed = Config.SYNTHETIC_SEED if seed is None else seed
+        self.volume = volume or Config.SYNTHETIC_VOLUME
+        self.duplicate_ratio = Config.SYNTHETIC_DUPLICATE_RATIO if duplicate_ratio is None else duplicate_ratio
+        self.negative_ratio = Config.SYNTHETIC_NEGATIVE_RATIO if negative_ratio is None else negative_ratio
+        self.discount_ratio = Config.SYNTHETIC_DISCOUNT_RATIO if discount_ratio is None else discount_ratio
+        self.filter = BatchFilter()
+
+    def search(self, query: str) -> List[Deal]:
+        """Small keyword-flavoured batch, for callers of the old MockScraper interface."""
+        rng = random.Random(f"{self.seed}:{query}")
+        return [self._make(rng, n, keyword=query) for n in range(rng.randint(2, 4))]
+
+    def iter_deals(self) -> Iterator[Deal]:
+        """Yield `volume` deals lazily; memory stays bounded by the duplicate pool."""
+        rng = random.Random(self.seed)
+        pool: List[Deal] = []
+        for n in range(self.volume):
+            if pool and rng.random() < self.duplicate_ratio:
+                deal = rng.choice(pool)
+                if rng.random() < 0.3:
+                    deal = self._reprice(rng, deal)
+                yield deal
+                continue
+
+            deal = self._make(rng, n)
+            if len(pool) < DUPLICATE_POOL:
+                pool.append(deal)
+            else:
+                pool[rng.randrange(DUPLICATE_POOL)] = deal
+            yield deal
+
+    def iter_filtered(self) -> Iterator[Deal]:
+        """iter_deals() through the scrapers' quality gates, a page at a time (what a job consumes)."""
+        deals = self.iter_deals()
+        while True:
+            page = list(itertools.islice(deals, PAGE_SIZE))
+            if not page:
+                return
+            kept, _ = self.filter.apply_deals(page, require_rating=True)
+            yield from kept
+
+    def _make(self, rng: random.Random, n: int, keyword: Optional[str] = None) -> Deal:
+        keyword = keyword or rng.choice(Config.KEYWORDS)
+        brand = rng.choice(Config.PREFERRED_BRANDS if rng.random() < 0.5 else OTHER_BRANDS)
+        words = [keyword, brand, rng.choice(MODIFIERS)]
+        if rng.random() < self.negative_ratio:
+            words.insert(1, rng.choice(Config.NEGATIVE_KEYWORDS))
+        title = f"{' '.join(words)} {rng.choice('ABCDEFGHKMRSTXZ')}{rng.randint(10, 9999)}"
+
+        price = round(min(max(rng.lognormvariate(math.log(PRICE_MEDIAN), PRICE_SIGMA), 9.9), 25000.0), 2)
+        if rng.random() < self.discount_ratio:
+            discount = rng.randint(Config.MIN_DISCOUNT, 70)
+        else:
+            discount = rng.randint(0, max(Config.MIN_DISCOUNT - 1, 0))
+        # ~10% new sellers without reviews
+        rating = 0.0 if rng.random() < 0.1 else round(rng.triangular(3.0, 5.0, 4.6), 1)
+        image = f"https://example.com/img/{n}.webp"
+
+        source = self._pick_source(rng)
+        if source == "ml":
+            item_id = f"MLB{1000000000 + n}"
+            return Deal.from_ml(item_id, title, f"https://example.com/ml/{item_id}", price,
+                                discount=discount, rating=rating, seller=rng.choice(SELLERS), image=image)
+        if source == "amazon":
+            asin = f"B0SYN{n:07d}"
+            original_price = round(price / (1 - discount / 100), 2)
+            return Deal.from_amazon(asin, title, f"https://example.com/amazon/{asin}", price,
+                                    original_price, rating=rating, image=image)
+        return Deal.from_shopee(n, title, f"https://example.com/shopee/{n}", price,
+                                discount=discount, rating=rating, seller=rng.choice(SELLERS), image=image)
+
+    @staticmethod
+    def _pick_source(rng: random.Random) -> str:
+        roll = rng.random()
+        for source, share in SOURCE_MIX:
+            if roll < share:
+                return source
+            roll -= share
+        return SOURCE_MIX[-1][0]
+
+    @staticmethod
+    def _reprice(rng: random.Random, deal: Deal) -> Deal:
+        """Same item seen again at a different price (original price kept)."""
+        price = round(deal.price * rng.uniform(0.8, 1.05), 2)
+        discount = max(0, min(int((1 - price / deal.original_price) * 100), 100))
+        return replace(deal, price=price, discount=discount)
@@ -0,0 +1,273 @@
+"""
+Mercado Livre Session Pool
+Keeps one warm, authenticated browser context per affiliate account (Playwright
+storage state) and rotates link generation across them.
+
+Accounts are storage-state files in Config.ML_ACCOUNTS_DIR (<name>.json, saved
+by `python -m src.auth_ml <name>`). The legacy ml_auth.json cookie list is
+still read as the "default" account.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+from src.config import Config
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+LAUNCH_ARGS = [
+    '--disable-blink-features=AutomationControlled',
+    '--disable-features=IsolateOrigins,site-per-process',
+    '--disable-dev-shm-usage',
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+    "--use-gl=egl",
+    "--enable-gpu"
+]
+
+# Inject anti-detection scripts
+STEALTH_SCRIPT = """
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined
+    });
+
+    Object.defineProperty(navigator, 'plugins', {
+        get: () => [1, 2, 3, 4, 5]
+    });
+
+    Object.defineProperty(navigator, 'languages', {
+        get: () => ['pt-BR', 'pt', 'en-US', 'en']
+    });
+
+    window.chrome = {
+        runtime: {}
+    };
+"""
+
+# Where ML sends a logged-out session
+LOGIN_URL_MARKERS = ("/jms/mlb/lgz", "/login", "registration")
+
+
+def load_storage_state(path: str) -> Optional[Dict]:
+    """Read a storage-state file; a bare cookie list (old ml_auth.json) is wrapped as one."""
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Could not read ML session {path}: {e}")
+        return None
+    if isinstance(data, list):
+        return {"cookies": data, "origins": []}
+    if isinstance(data, dict) and isinstance(data.get("cookies"), list):
+        return data
+    print(f"⚠️ {path} is not a Playwright storage state or cookie list")
+    return None
+
+
+@dataclass
+class Account:
+    name: str
+    path: str          # Storage state is loaded from, and saved back to, this file
+    state: Dict
+    mtime: float = 0.0
+    expired: bool = False
+    cooldown_until: float = 0.0
+    failures: int = 0
+    links: int = 0
+    last_used: float = 0.0
+    last_saved: float = field(default_factory=time.time)
+
+    def available(self, now: float) -> bool:
+        return not self.expired and self.cooldown_until <= now
+
+
+class MLSessionPool:
+    """Warm, rotating affiliate sessions; one browser, one context (and page) per account."""
+
+    def __init__(self, accounts_dir: Optional[str] = None, legacy_file: Optional[str] = None):
+        self.accounts_dir = accounts_dir or Config.ML_ACCOUNTS_DIR
+        self.legacy_file = legacy_file or Config.ML_AUTH_FILE
+        self.accounts: List[Account] = []
+        self._pages: Dict[str, object] = {}
+        self._contexts: Dict[str, object] = {}
+        self._playwright = None
+        self._browser = None
+        self._lock = threading.RLock()
+        self.load_accounts()
+
+    # --- Accounts ---
+
+    def load_accounts(self):
+        """(Re)load account files; accounts whose file changed on disk get a fresh chance."""
+        with self._lock:
+            known = {a.name: a for a in self.accounts}
+            found = []
+            if os.path.isdir(self.accounts_dir):
+                for name in sorted(os.listdir(self.accounts_dir)):
+                    if name.endswith(".json"):
+                        found.append((name[:-5], os.path.join(self.accounts_dir, name)))
+
+            legacy = self._legacy_path()
+            if legacy and "default" not in {n for n, _ in found}:
+                # Saved back as storage state under accounts_dir, not over the old cookie list
+                found.append(("default", legacy))
+
+            accounts = []
+            for name, path in found:
+                mtime = os.path.getmtime(path)
+                account = known.get(name)
+                if account and account.mtime == mtime:
+                    accounts.append(account)
+                    continue
+                state = load_storage_state(path)
+                if state is None:
+                    continue
+                if account:
+                    self._drop_session(name)  # File refreshed (e.g. re-login): rebuild its context
+                save_path = path if path != legacy else os.path.join(self.accounts_dir, f"{name}.json")
+                accounts.append(Account(name, save_path, state, mtime))
+            self.accounts = accounts
+
+        if not self.accounts:
+            print(f"⚠️ Warning: no ML sessions found in {self.accounts_dir}/ or {self.legacy_file}.")
+
+    def _legacy_path(self) -> Optional[str]:
+        for path in (self.legacy_file, os.path.join("src", self.legacy_file)):
+            if os.path.exists(path):
+                return path
+        return None
+
+    def pick(self) -> Optional[Account]:
+        """Least recently used account that is neither expired nor cooling down."""
+        now = time.time()
+        with self._lock:
+            candidates = [a for a in self.accounts if a.available(now)]
+            if not candidates:
+                return None
+            account = min(candidates, key=lambda a: a.last_used)
+            account.last_used = now
+            return account
+
+    def report(self, account: Account, ok: bool):
+        """Record a link outcome; repeated failures put the account on cooldown (likely rate limited)."""
+        with self._lock:
+            if ok:
+                account.failures = 0
+                account.links += 1
+                if time.time() - account.last_saved >= Config.ML_SESSION_SAVE_INTERVAL:
+                    self.save_state(account)
+                return
+            account.failures += 1
+            if account.failures >= Config.ML_SESSION_MAX_FAILURES:
+                account.cooldown_until = time.time() + Config.ML_SESSION_COOLDOWN
+                account.failures = 0
+                print(f"   ⏸️ ML account '{account.name}' cooling down for {Config.ML_SESSION_COOLDOWN}s")
+
+    def mark_expired(self, account: Account):
+        with self._lock:
+            account.expired = True
+            self._drop_session(account.name)
+        print(f"   🔒 ML session '{account.name}' expired; run `python -m src.auth_ml {account.name}` to log in again")
+
+    def status(self) -> List[Dict]:
+        now = time.time()
+        with self._lock:
+            return [{
+                "name": a.name, "available": a.available(now), "expired": a.expired,
+                "cooldown": max(0, int(a.cooldown_until - now)), "links": a.links,
+                "warm": a.name in self._pages,
+            } for a in self.accounts]
+
+    # --- Sessions ---
+
+    @contextmanager
+    def session(self) -> Iterator:
+        """
+        Yield (account, page) for the next available account, keeping the
+        context warm for the next call. Yields (None, None) if none is available.
+        """
+        account = self.pick()
+        if account is None:
+            self.load_accounts()  # Maybe someone logged in again meanwhile
+            account = self.pick()
+        if account is None:
+            yield None, None
+            return
+        with self._lock:
+            page = self._page_for(account)
+        yield account, page
+
+    def _page_for(self, account: Account):
+        page = self._pages.get(account.name)
+        if page is not None and not page.is_closed():
+            return page
+        context = self._new_context(account.state)
+        page = context.new_page()
+        self._contexts[account.name] = context
+        self._pages[account.name] = page
+        return page
+
+    def _new_context(self, state: Dict):
+        if self._browser is None:
+            from playwright.sync_api import sync_playwright
+            self._playwright = sync_playwright().start()
+            self._browser = self._playwright.chromium.launch(headless=True, args=LAUNCH_ARGS, timeout=60000)
+        context = self._browser.new_context(
+            storage_state=state,
+            user_agent=USER_AGENT,
+            viewport={'width': 1920, 'height': 1080},
+            locale='pt-BR',
+            timezone_id='America/Sao_Paulo',
+            permissions=['geolocation'],
+            geolocation={'latitude': -23.5505, 'longitude': -46.6333},
+        )
+        context.set_default_timeout(60000)
+        context.add_init_script(STEALTH_SCRIPT)
+        return context
+
+    @staticmethod
+    def is_logged_out(page) -> bool:
+        url = (page.url or "").lower()
+        return any(marker in url for marker in LOGIN_URL_MARKERS)
+
+    def save_state(self, account: Account):
+        """Write the context's refreshed cookies/storage back to the account file."""
+        context = self._contexts.get(account.name)
+        if context is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(account.path) or ".", exist_ok=True)
+            state = context.storage_state(path=account.path)
+            account.state = state
+            account.mtime = os.path.getmtime(account.path)
+            account.last_saved = time.time()
+        except Exception as e:
+            print(f"⚠️ Could not save ML session '{account.name}': {e}")
+
+    def _drop_session(self, name: str):
+        self._pages.pop(name, None)
+        context = self._contexts.pop(name, None)
+        if context is not None:
+            try:
+                context.close()
+            except Exception:
+                pass
+
+    def close(self):
+        """Save every live session and shut the browser down."""
+        with self._lock:
+            for account in self.accounts:
+                if not account.expired:
+                    self.save_state(account)
+            for name in list(self._contexts):
+                self._drop_session(name)
+            if self._browser is not None:
+                try:
+                    self._browser.close()
+                    self._playwright.stop()
+                except Exception:
+                    pass
+            self._browser = self._playwright = None
@@ -7,24 +7,77 @@ Handles authentication and API calls to Shopee affiliate GraphQL endpoint.
 import json
 import hashlib
 import hmac
+import threading
 import time
+from collections import OrderedDict
 import requests
-from typing import Dict, List, Optional
+from requests.adapters import HTTPAdapter
+from typing import Dict, Iterator, List, Optional
+
+
+class RateLimiter:
+    """Thread-safe token bucket: `rate` requests per second, bursts up to `burst`."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
 
 class ShopeeGraphQLClient:
     """Client for Shopee Affiliate GraphQL API"""
     
-    def __init__(self, app_id: str, secret: str):
+    # Pooled connections; concurrent keyword queries share them
+    POOL_SIZE = 10
+    # Query responses are reused for this long, or until the earliest offer in them ends
+    CACHE_TTL = 900
+    CACHE_MAX_ENTRIES = 500
+    
+    def __init__(self, app_id: str, secret: str, rate_limiter: Optional[RateLimiter] = None,
+                 cache_ttl: Optional[float] = None):
         """
         Initialize Shopee GraphQL client.
         
         Args:
             app_id: Your Shopee AppID
             secret: Your Shopee Secret/Password
+            rate_limiter: Optional limiter shared by every request from this client
+            cache_ttl: Seconds a query response is reused (0 disables the cache)
         """
         self.app_id = app_id
         self.secret = secret
         self.endpoint = "https://open-api.affiliate.shopee.com.br/graphql"
+        self.rate_limiter = rate_limiter
+        self.cache_ttl = self.CACHE_TTL if cache_ttl is None else cache_ttl
+        
+        # (query, variables json) -> (expires_at, response); oldest evicted first
+        self._responses: "OrderedDict[tuple, tuple]" = OrderedDict()
+        # (originUrl, subIds) -> short link; links don't expire
+        self._short_links: Dict[tuple, str] = {}
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Signature only changes with the (second resolution) timestamp
+        self._auth = (None, "")
+        
+        # Keep-alive session instead of a fresh connection per call
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.POOL_SIZE)
+        self.session.mount('https://', adapter)
     
     def _generate_signature(self, timestamp: int) -> str:
         """
@@ -53,13 +106,21 @@ class ShopeeGraphQLClient:
             Authorization header value
         """
         timestamp = int(time.time())
-        signature = self._generate_signature(timestamp)
+        cached_timestamp, header = self._auth
+        if cached_timestamp == timestamp:
+            return header
         
-        return f"SHA256 Credential={self.app_id}, Signature={signature}, Timestamp={timestamp}"
+        signature = self._generate_signature(timestamp)
+        header = f"SHA256 Credential={self.app_id}, Signature={signature}, Timestamp={timestamp}"
+        self._auth = (timestamp, header)
+        return header
     
     def execute_query(self, query: str, variables: Optional[Dict] = None) -> Dict:
         """
-        Execute a GraphQL query.
+        Execute a GraphQL query, serving repeated queries from the TTL cache.
+        
+        Mutations are never cached. A response is kept for `cache_ttl` seconds,
+        but never past the earliest periodEndTime among its nodes.
         
         Args:
             query: GraphQL query string
@@ -68,6 +129,53 @@ class ShopeeGraphQLClient:
         Returns:
             API response as dictionary
         """
+        if not self.cache_ttl or query.lstrip().startswith('mutation'):
+            return self._post(query, variables)
+        
+        key = (query, json.dumps(variables or {}, sort_keys=True))
+        now = time.time()
+        with self._cache_lock:
+            entry = self._responses.get(key)
+            if entry and entry[0] > now:
+                self.cache_hits += 1
+                return entry[1]
+            self.cache_misses += 1
+        
+        result = self._post(query, variables)
+        if result.get('data') and 'errors' not in result:
+            expires_at = now + self.cache_ttl
+            period_end = self._earliest_period_end(result['data'])
+            if period_end:
+                expires_at = min(expires_at, period_end)
+            with self._cache_lock:
+                self._responses[key] = (expires_at, result)
+                self._responses.move_to_end(key)
+                while len(self._responses) > self.CACHE_MAX_ENTRIES:
+                    self._responses.popitem(last=False)
+        return result
+    
+    @staticmethod
+    def _earliest_period_end(data: Dict) -> Optional[float]:
+        """Earliest non-zero periodEndTime across the nodes of every connection in `data`."""
+        ends = [
+            float(node['periodEndTime'])
+            for connection in data.values() if isinstance(connection, dict)
+            for node in connection.get('nodes') or []
+            if node.get('periodEndTime')
+        ]
+        return min(ends) if ends else None
+    
+    def cache_stats(self) -> Dict:
+        with self._cache_lock:
+            return {
+                'hits': self.cache_hits,
+                'misses': self.cache_misses,
+                'responses': len(self._responses),
+                'short_links': len(self._short_links),
+            }
+    
+    def _post(self, query: str, variables: Optional[Dict] = None) -> Dict:
+        """Send one GraphQL request (rate limited, pooled connection)."""
         headers = {
             'Authorization': self._get_auth_header(),
             'Content-Type': 'application/json'
@@ -77,8 +185,11 @@ class ShopeeGraphQLClient:
         if variables:
             payload['variables'] = variables
         
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        
         try:
-            response = requests.post(
+            response = self.session.post(
                 self.endpoint,
                 json=payload,
                 headers=headers,
@@ -92,19 +203,51 @@ class ShopeeGraphQLClient:
                 print(f"   Response: {e.response.text}")
             return {}
     
-    def get_shopee_offers(self, keyword: str = "", sort_type: int = 1, 
-                         page: int = 1, limit: int = 20) -> List[Dict]:
+    def iter_pages(self, query: str, root: str, variables: Optional[Dict] = None,
+                   max_pages: int = 1) -> Iterator[Dict]:
+        """
+        Yield nodes from a paginated connection (`root` { nodes pageInfo }).
+        
+        Follows pageInfo.hasNextPage from `variables['page']` for at most
+        `max_pages` pages, stopping early on errors or an empty page.
+        
+        Args:
+            query: GraphQL query taking a $page variable
+            root: Name of the connection field in `data`
+            variables: Query variables (page defaults to 1)
+            max_pages: Upper bound on pages fetched
+        """
+        variables = dict(variables or {})
+        page = variables.get('page', 1)
+        
+        for _ in range(max_pages):
+            variables['page'] = page
+            result = self.execute_query(query, variables)
+            
+            connection = (result.get('data') or {}).get(root)
+            if not connection:
+                if 'errors' in result:
+                    print(f"❌ GraphQL errors: {result['errors']}")
+                return
+            
+            nodes = connection.get('nodes') or []
+            yield from nodes
+            
+            if not nodes or not (connection.get('pageInfo') or {}).get('hasNextPage'):
+                return
+            page += 1
+    
+    def iter_shopee_offers(self, keyword: str = "", sort_type: int = 1, limit: int = 20,
+                           max_pages: int = 1, page: int = 1) -> Iterator[Dict]:
         """
-        Get Shopee offers/deals.
+        Iterate Shopee offers/deals (campaign collections) across pages.
         
         Args:
             keyword: Search keyword (optional)
             sort_type: 1 = Latest DESC, 2 = Highest Commission DESC
-            page: Page number
             limit: Results per page
-            
-        Returns:
-            List of offers
+            max_pages: Upper bound on pages fetched
+            page: First page to fetch
         """
         query = """
         query($keyword: String, $sortType: Int, $page: Int, $limit: Int) {
@@ -137,53 +280,137 @@ class ShopeeGraphQLClient:
             'limit': limit
         }
         
-        result = self.execute_query(query, variables)
-        
-        if 'data' in result and 'shopeeOfferV2' in result['data']:
-            return result['data']['shopeeOfferV2']['nodes']
-        elif 'errors' in result:
-            print(f"❌ GraphQL errors: {result['errors']}")
-        
-        return []
+        return self.iter_pages(query, 'shopeeOfferV2', variables, max_pages)
     
-    def generate_short_link(self, original_url: str, sub_ids: Optional[List[str]] = None) -> Optional[str]:
+    def get_shopee_offers(self, keyword: str = "", sort_type: int = 1, 
+                         page: int = 1, limit: int = 20) -> List[Dict]:
         """
-        Generate Shopee affiliate short link.
+        Get one page of Shopee offers/deals.
         
         Args:
-            original_url: Original product URL
-            sub_ids: Optional tracking sub IDs (up to 5)
+            keyword: Search keyword (optional)
+            sort_type: 1 = Latest DESC, 2 = Highest Commission DESC
+            page: Page number
+            limit: Results per page
             
         Returns:
-            Short link URL or None
+            List of offers
+        """
+        return list(self.iter_shopee_offers(keyword, sort_type, limit, max_pages=1, page=page))
+    
+    def iter_product_offers(self, keyword: str, sort_type: int = 2,
+                            limit: int = 20, max_pages: int = 1) -> Iterator[Dict]:
         """
-        if sub_ids is None:
-            sub_ids = []
+        Iterate individual products matching `keyword` across pages.
         
-        # Ensure max 5 sub IDs
-        sub_ids = sub_ids[:5]
+        Unlike shopeeOfferV2 (campaign collections), product offers carry
+        price, discount rate, rating and shop, which a deal needs.
         
+        Args:
+            keyword: Search keyword
+            sort_type: 2 = Item sold DESC, 3 = Price DESC, 4 = Price ASC, 5 = Commission DESC
+            limit: Results per page
+            max_pages: Upper bound on pages fetched
+        """
         query = """
-        mutation($originUrl: String!, $subIds: [String]) {
-          generateShortLink(input: {originUrl: $originUrl, subIds: $subIds}) {
-            shortLink
+        query($keyword: String, $sortType: Int, $page: Int, $limit: Int) {
+          productOfferV2(keyword: $keyword, sortType: $sortType, page: $page, limit: $limit) {
+            nodes {
+              itemId
+              productName
+              priceMin
+              priceMax
+              priceDiscountRate
+              ratingStar
+              sales
+              shopName
+              imageUrl
+              productLink
+              offerLink
+              commissionRate
+              periodStartTime
+              periodEndTime
+            }
+            pageInfo {
+              page
+              limit
+              hasNextPage
+            }
           }
         }
         """
         
         variables = {
-            'originUrl': original_url,
-            'subIds': sub_ids
+            'keyword': keyword,
+            'sortType': sort_type,
+            'limit': limit
         }
         
-        result = self.execute_query(query, variables)
+        return self.iter_pages(query, 'productOfferV2', variables, max_pages)
+    
+    def generate_short_links(self, original_urls: List[str], sub_ids: Optional[List[str]] = None,
+                             batch_size: int = 20) -> Dict[str, str]:
+        """
+        Generate affiliate short links for many URLs, one request per batch.
+        
+        Each URL becomes an aliased generateShortLink field of a single mutation.
+        
+        Args:
+            original_urls: Original product URLs
+            sub_ids: Optional tracking sub IDs (up to 5), shared by every link
+            batch_size: URLs per request
+            
+        Returns:
+            Mapping of original URL -> short link (failed URLs are left out)
+        """
+        sub_ids = (sub_ids or [])[:5]
+        sub_key = tuple(sub_ids)
+        links = {}
+        
+        # Reuse links already generated for the same URL and sub IDs
+        urls = []
+        for url in dict.fromkeys(u for u in original_urls if u):
+            short_link = self._short_links.get((url, sub_key))
+            if short_link:
+                links[url] = short_link
+            else:
+                urls.append(url)
         
-        if 'data' in result and 'generateShortLink' in result['data']:
-            return result['data']['generateShortLink']['shortLink']
-        elif 'errors' in result:
-            print(f"❌ GraphQL errors: {result['errors']}")
+        for start in range(0, len(urls), batch_size):
+            batch = urls[start:start + batch_size]
+            params = ", ".join(f"$u{i}: String!" for i in range(len(batch)))
+            fields = "\n".join(
+                f"l{i}: generateShortLink(input: {{originUrl: $u{i}, subIds: $subIds}}) {{ shortLink }}"
+                for i in range(len(batch))
+            )
+            query = f"mutation({params}, $subIds: [String]) {{\n{fields}\n}}"
+            variables = {f"u{i}": url for i, url in enumerate(batch)}
+            variables['subIds'] = sub_ids
+            
+            result = self.execute_query(query, variables)
+            data = result.get('data') or {}
+            for i, url in enumerate(batch):
+                short_link = (data.get(f"l{i}") or {}).get('shortLink')
+                if short_link:
+                    links[url] = short_link
+                    self._short_links[(url, sub_key)] = short_link
+            if 'errors' in result:
+                print(f"❌ GraphQL errors: {result['errors']}")
         
-        return None
+        return links
+    
+    def generate_short_link(self, original_url: str, sub_ids: Optional[List[str]] = None) -> Optional[str]:
+        """
+        Generate Shopee affiliate short link.
+        
+        Args:
+            original_url: Original product URL
+            sub_ids: Optional tracking sub IDs (up to 5)
+            
+        Returns:
+            Short link URL or None
+        """
+        return self.generate_short_links([original_url], sub_ids).get(original_url)
 
 
 def main():
@@ -0,0 +1,120 @@
+"""
+Message Templates
+Deal messages are compiled once per channel and rendered in a single pass.
+Rendered text is cached per deal version (Deal is frozen, so any field
+change is a new cache key) and relayed as-is by the Node WhatsApp service.
+
+Template syntax: str.format fields over the deal's display values. A line
+starting with '?' is optional and is dropped when any of its fields is empty
+(e.g. no rating, no coupon).
+"""
+from functools import lru_cache
+from string import Formatter
+from typing import Dict, List, Tuple
+from src.config import Config
+from src.models import Deal
+
+TEMPLATES = {
+    "whatsapp": (
+        "*OFERTA ENCONTRADA!* 🚀\n"
+        "\n"
+        "*{title}*\n"
+        "💰 De: ~R$ {original_price}~\n"
+        "🔥 *Por: R$ {price}*\n"
+        "📉 Desconto: {discount}%\n"
+        "?⭐ {rating}\n"
+        "?🎟️ Cupom: {coupon}\n"
+        "\n"
+        "🔗 *Link:* {link}"
+    ),
+    "telegram": (
+        "<b>OFERTA ENCONTRADA!</b> 🚀\n"
+        "\n"
+        "<b>{title}</b>\n"
+        "💰 De: <s>R$ {original_price}</s>\n"
+        "🔥 <b>Por: R$ {price}</b>\n"
+        "📉 Desconto: {discount}%\n"
+        "?⭐ {rating}\n"
+        "?🎟️ Cupom: {coupon}\n"
+        "\n"
+        "🔗 {link}"
+    ),
+    "plain": (
+        "OFERTA ENCONTRADA!\n"
+        "{title}\n"
+        "De: R$ {original_price}\n"
+        "Por: R$ {price} ({discount}% off)\n"
+        "?Avaliação: {rating}\n"
+        "?Cupom: {coupon}\n"
+        "{link}"
+    ),
+}
+
+
+def format_brl(value: float) -> str:
+    """1299.9 -> '1.299,90'"""
+    return f"{value:,.2f}".replace(",", "_").replace(".", ",").replace("_", ".")
+
+
+def display_values(deal: Deal) -> Dict[str, str]:
+    return {
+        "title": deal.title,
+        "price": format_brl(deal.price),
+        "original_price": format_brl(deal.original_price),
+        "discount": str(deal.discount),
+        "rating": f"{deal.rating:.1f}" if deal.rating else "",
+        "coupon": deal.coupon,
+        "seller": deal.seller,
+        "source": deal.source,
+        "link": deal.link,
+    }
+
+
+class MessageTemplate:
+    """A template pre-parsed into literal/field segments, line by line."""
+
+    def __init__(self, source: str):
+        self.source = source
+        self._lines: List[Tuple[bool, Tuple[Tuple[str, str, str], ...]]] = []
+        formatter = Formatter()
+        for line in source.split("\n"):
+            optional = line.startswith("?")
+            if optional:
+                line = line[1:]
+            segments = tuple(
+                (literal, field or "", spec or "")
+                for literal, field, spec, _ in formatter.parse(line)
+            )
+            self._lines.append((optional, segments))
+
+    def render(self, values: Dict[str, str]) -> str:
+        out = []
+        for optional, segments in self._lines:
+            parts = []
+            skip = False
+            for literal, field, spec in segments:
+                parts.append(literal)
+                if field:
+                    value = values[field]
+                    if optional and not value:
+                        skip = True
+                        break
+                    parts.append(format(value, spec) if spec else value)
+            if not skip:
+                out.append("".join(parts))
+        return "\n".join(out)
+
+
+_compiled: Dict[str, MessageTemplate] = {
+    channel: MessageTemplate(source) for channel, source in TEMPLATES.items()
+}
+
+
+@lru_cache(maxsize=Config.TEMPLATE_CACHE_SIZE)
+def render_deal(deal: Deal, channel: str = "whatsapp") -> str:
+    """Render `deal` for `channel`; repeated calls for the same deal version hit the cache."""
+    try:
+        template = _compiled[channel]
+    except KeyError:
+        raise ValueError(f"Unknown message channel: {channel}") from None
+    return template.render(display_values(deal))
@@ -1,6 +1,9 @@
 import requests
 import json
 from src.config import Config
+from typing import Optional
+from src.models import Deal
+from src.services.templates import render_deal
 
 class WhatsAppService:
     API_URL = "https://graph.facebook.com/v17.0"
@@ -51,3 +54,21 @@ class WhatsAppService:
         except Exception as e:
             print(f"Error sending Template: {e}")
             return None
+
+    def send_deal(self, deal: Deal, message: Optional[str] = None) -> bool:
+        """
+        Relay a deal to the Node.js WhatsApp service (whatsapp-service/index.js).
+        The message is rendered here; the Node side only attaches the image and sends it.
+        """
+        if message is None:
+            message = render_deal(deal, "whatsapp")
+        try:
+            payload = {'deal': deal.to_json(), 'message': message}
+            response = requests.post(Config.WHATSAPP_SERVICE_URL, json=payload, timeout=60)
+            if response.status_code == 200:
+                print("✅ Sent to WhatsApp Service!")
+                return True
+            print(f"❌ WhatsApp Service Error: {response.text}")
+        except Exception as e:
+            print(f"❌ Could not connect to WhatsApp Service: {e}")
+        return False
@@ -0,0 +1,104 @@
+"""
+Write Buffer - Group commit for sent-deal upserts
+Marking a deal as sent used to open a connection and commit one row in the
+send loop. Rows now wait here (keyed by deal id, so a repeat replaces the
+pending row) and are written with one executemany in one transaction when
+Config.WRITE_BATCH_SIZE rows are pending, Config.WRITE_FLUSH_SECONDS after the
+first pending row, on demand (flush), or at interpreter exit - including on
+SIGTERM once flush_on_sigterm() is installed (stop_all.sh sends SIGTERM before
+SIGKILL, which nothing survives).
+
+Readers that must see pending rows (counts, history) ask the buffer via
+pending(); Database handles that.
+"""
+import atexit
+import signal
+import sqlite3
+import sys
+import threading
+import weakref
+from typing import Dict, Optional, Sequence, Tuple
+from src.config import Config
+
+_buffers: "weakref.WeakSet[WriteBuffer]" = weakref.WeakSet()
+
+
+class WriteBuffer:
+    def __init__(self, db_path: str, sql: str, batch_size: Optional[int] = None,
+                 flush_seconds: Optional[float] = None):
+        """
+        Args:
+            sql: Parameterized INSERT/upsert run with executemany over the pending rows
+            batch_size: Pending rows that trigger a flush (Config.WRITE_BATCH_SIZE)
+            flush_seconds: Longest a row waits before it is written (Config.WRITE_FLUSH_SECONDS)
+        """
+        self.db_path = db_path
+        self.sql = sql
+        self.batch_size = batch_size or Config.WRITE_BATCH_SIZE
+        self.flush_seconds = Config.WRITE_FLUSH_SECONDS if flush_seconds is None else flush_seconds
+        self._pending: Dict[str, Tuple] = {}
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+        self.flushes = 0
+        self.rows_written = 0
+        _buffers.add(self)
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, key: str, row: Sequence, sync: bool = False):
+        """Queue a row; sync=True writes it (and everything pending) before returning."""
+        with self._lock:
+            self._pending[key] = tuple(row)
+            if sync or len(self._pending) >= self.batch_size:
+                self.flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_seconds, self._flush_in_background)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def pending(self) -> Dict[str, Tuple]:
+        with self._lock:
+            return dict(self._pending)
+
+    def flush(self) -> int:
+        """Write every pending row in one transaction. Returns how many were written."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return 0
+            rows = list(self._pending.values())
+            with sqlite3.connect(self.db_path) as conn:  # Commits once, on success
+                conn.executemany(self.sql, rows)
+            self._pending.clear()
+            self.flushes += 1
+            self.rows_written += len(rows)
+            return len(rows)
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        except sqlite3.Error as e:
+            # Rows stay pending; the next add/flush retries them
+            print(f"⚠️ Deferred DB write failed ({len(self._pending)} rows pending): {e}")
+
+    def stats(self) -> Dict:
+        return {"pending": len(self._pending), "flushes": self.flushes, "rows_written": self.rows_written}
+
+
+@atexit.register
+def _flush_all():
+    for buffer in list(_buffers):
+        buffer._flush_in_background()
+
+
+def _on_sigterm(signum, frame):
+    _flush_all()
+    sys.exit(128 + signum)
+
+
+def flush_on_sigterm():
+    """Write pending rows on SIGTERM before exiting (call from the main thread)."""
+    signal.signal(signal.SIGTERM, _on_sigterm)
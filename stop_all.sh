@@ -8,6 +8,12 @@ echo "========================================"
 echo "Killing processes by name..."
 pkill -9 -f "whatsapp-service/index.js" 2>/dev/null
 pkill -9 -f "node index.js" 2>/dev/null
+# The bot writes its buffered sends on SIGTERM; SIGKILL only if it hangs
+pkill -TERM -f "src.main" 2>/dev/null
+for _ in 1 2 3 4 5; do
+    pgrep -f "src.main" >/dev/null || break
+    sleep 1
+done
 pkill -9 -f "src.main" 2>/dev/null
 pkill -9 -f "chromium.*alfa-ofertas" 2>/dev/null
 pkill -9 -f "chrome.*alfa-ofertas" 2>/dev/null
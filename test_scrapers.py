@@ -11,8 +11,8 @@ def test_scrapers():
     pw_deals = pw_scraper.search(Config.KEYWORDS[0])
     print(f"Found {len(pw_deals)} Playwright deals.")
     for deal in pw_deals[:3]:
-        print(f"[{deal['discount']}% OFF] {deal['title']} - R$ {deal['price']}")
-        print(f"Link: {deal['link']}")
+        print(f"[{deal.discount}% OFF] {deal.title} - R$ {deal.price}")
+        print(f"Link: {deal.link}")
 
     # Test Mock
     # print(f"\nTesting Mock Scraper for: {Config.KEYWORDS[0]}...")
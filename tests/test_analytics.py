@@ -0,0 +1,119 @@
+"""
+Test Analytics Export
+Partitioned files and rollups from live + archived sends and scrape observations;
+/api/stats answers from the rollups.
+"""
+import glob
+import importlib
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import pytest
+import pyarrow.parquet as pq
+from src import analytics, maintenance, pipeline
+from src.config import Config
+from src.database import Database
+from src.models import Deal
+
+DAY = 86400
+
+
+def make_deal(i, title="Furadeira Bosch", discount=30, source="Amazon"):
+    deal = Deal.from_amazon(f"B{i}", f"{title} {i}", f"https://example.com/{i}", 70.0, 100.0)
+    return deal if discount == 30 and source == "Amazon" else Deal.coerce(
+        {**deal.to_json(), "discount": discount, "source": source})
+
+
+def test_categories_and_discount_bands():
+    assert analytics.categorize(["Parafusadeira de impacto Makita", "Lanterna tática", "Sofá azul"]) == ["tools", "tactical", "other"]
+    assert analytics.discount_bands([15, 25, 39, 40, 75]) == ["<25", "25-39", "25-39", "40-59", "60+"]
+
+
+def test_export_writes_partitions_and_rollups():
+    tmp = tempfile.mkdtemp()
+    path, archive, out = (os.path.join(tmp, name) for name in ("deals.db", "archive", "analytics"))
+    db = Database(path)
+    db.mark_deal_as_sent(make_deal(1))
+    db.mark_deal_as_sent(make_deal(2, title="Lanterna tática", discount=50, source="Mercado Livre"))
+    db.mark_deal_as_sent(make_deal(3, discount=20))
+    db.flush()
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE sent_deals SET sent_ts = sent_ts - ? WHERE id = 'B3'", (400 * DAY,))
+    maintenance.archive_old_deals(path, archive)  # B3 now lives only in the archive
+
+    log = analytics.ObservationLog()
+    assert len(list(pipeline.observe([make_deal(i) for i in range(5)], log))) == 5
+    exporter = analytics.Exporter(path, out, archive, log)
+    report = exporter.export({"filter": {"seen": 9}})
+
+    sent = report["sent"]
+    assert sent["deals"] == 3
+    assert sent["by_source"]["Amazon"]["deals"] == 2
+    assert sent["by_category"]["tactical"] == {"deals": 1, "avg_discount": 50.0, "avg_price": 70.0}
+    assert set(sent["by_discount_band"]) == {"<25", "25-39", "40-59"}
+    assert sum(group["deals"] for group in sent["by_day"].values()) == 2  # B3 is older than 30 days
+    assert report["filter"] == {"seen": 9}
+    assert len(log) == 0
+
+    months = sorted(glob.glob(os.path.join(out, "sent_deals", "month=*", "part.parquet")))
+    assert len(months) == 2
+    table = pq.read_table(months[-1])
+    assert {"id", "source", "sent_ts", "category", "discount_band"} <= set(table.column_names)
+    assert glob.glob(os.path.join(out, "observations", "date=*", "part-*"))
+
+    # Observations accumulate across exports; the rollups file is what stats() serves
+    log.record(make_deal(9))
+    second = exporter.export()
+    seen = sum(source["seen"] for day in second["observed"].values() for source in day.values())
+    assert seen == 6
+    assert exporter.stats()["generated_at"] == second["generated_at"]
+
+
+def test_closed_months_are_not_read_or_written_again():
+    tmp = tempfile.mkdtemp()
+    path, archive, out = (os.path.join(tmp, name) for name in ("deals.db", "archive", "analytics"))
+    db = Database(path)
+    for i in range(3):
+        db.mark_deal_as_sent(make_deal(i))
+    db.flush()
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE sent_deals SET sent_ts = sent_ts - ? WHERE id IN ('B0', 'B1')", (400 * DAY,))
+    maintenance.archive_old_deals(path, archive)
+    exporter = analytics.Exporter(path, out, archive)
+    assert exporter.export()["sent"]["deals"] == 3
+
+    closed = min(glob.glob(os.path.join(out, "sent_deals", "month=*", "part.parquet")))  # The archived month
+    mtime = os.stat(closed).st_mtime_ns
+    shutil.rmtree(archive)  # Closed totals come from the state file, not the archive
+    db.mark_deal_as_sent(make_deal(3), sync=True)
+    sent = exporter.export()["sent"]
+    assert sent["deals"] == 4
+    assert sent["by_source"]["Amazon"] == {"deals": 4, "avg_discount": 30.0, "avg_price": 70.0}
+    assert os.stat(closed).st_mtime_ns == mtime
+    assert pq.read_table(closed).num_rows == 2
+
+
+def test_stats_endpoint_serves_rollups(monkeypatch):
+    tmp = tempfile.mkdtemp()
+    monkeypatch.setattr(Config, "START_SCHEDULER", False)
+    monkeypatch.setattr(Config, "DB_PATH", os.path.join(tmp, "deals.db"))
+    monkeypatch.setattr(Config, "ANALYTICS_DIR", os.path.join(tmp, "analytics"))
+    sys.modules.pop("src.main", None)
+    main = importlib.import_module("src.main")  # Fresh module, built with the patched Config
+    try:
+        client = main.app.test_client()
+        assert client.get("/api/stats").status_code == 503
+
+        main.db.mark_deal_as_sent(make_deal(1), sync=True)
+        main.exporter.export()
+        assert client.get("/api/stats").json["sent"]["deals"] == 1
+        assert client.get("/api/stats?group=by_source").json["by_source"]["Amazon"]["deals"] == 1
+        assert client.get("/api/stats?group=nope").status_code == 404
+    finally:
+        sys.modules.pop("src.main", None)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
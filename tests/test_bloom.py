@@ -0,0 +1,52 @@
+"""
+Test Bloom Filter
+No false negatives, a false-positive rate near the target, and the Database pre-check.
+"""
+import os
+import tempfile
+import pytest
+from src.bloom import BloomFilter
+from src.database import Database
+from src.models import Deal
+
+
+def test_no_false_negatives_and_rate_near_target():
+    bloom = BloomFilter(capacity=10000, error_rate=0.01)
+    bloom.update(f"MLB{i}" for i in range(10000))
+
+    assert all(f"MLB{i}" in bloom for i in range(10000))
+    assert bloom.contains_many([f"MLB{i}" for i in range(10000)]).all()
+
+    false_positives = bloom.contains_many([f"B0NEW{i}" for i in range(20000)]).sum() / 20000
+    assert false_positives < 0.02
+    stats = bloom.stats()
+    assert 0.005 < stats["false_positive_rate"] < 0.015
+    assert stats["memory_kb"] < 15  # ~9.6 bits per id
+
+
+def test_single_and_batch_checks_agree():
+    bloom = BloomFilter(capacity=100, error_rate=0.05)
+    bloom.update(["A", "B"])
+    keys = [f"K{i}" for i in range(500)] + ["A", "B"]
+    assert [key in bloom for key in keys] == bloom.contains_many(keys).tolist()
+    assert not bloom.full
+    bloom.update(str(i) for i in range(100))
+    assert bloom.full
+
+
+def test_database_seeds_and_updates_the_filter():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "deals.db")
+        db = Database(path)
+        assert not db.is_deal_sent_today("B1")
+        assert db.bloom.stats()["db_lookups_skipped"] == 1
+
+        db.mark_deal_as_sent(Deal.from_amazon("B1", "Cooler", "https://x", 10.0, 20.0), sync=True)
+        assert db.is_deal_sent_today("B1")
+        assert db.get_last_prices(["B1", "B2"]) == {"B1": 10.0}
+
+        assert "B1" in Database(path).bloom  # Seeded from sent_deals on open
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -26,11 +26,11 @@ def test_coupon_integration():
 
     # Take the first deal and simulate processing
     deal = deals[0]
-    print(f"\n📝 Testing processing for deal: {deal['title']}")
-    print(f"   Original Link: {deal['link']}")
+    print(f"\n📝 Testing processing for deal: {deal.title}")
+    print(f"   Original Link: {deal.link}")
     
     # Verify it's a raw link (not already affiliated)
-    if "mercadolivre.com/sec/" in deal['link']:
+    if "mercadolivre.com/sec/" in deal.link:
         print("⚠️ Warning: Link looks like it's already affiliated!")
     
     # Simulate main.py processing
@@ -39,7 +39,7 @@ def test_coupon_integration():
     # For this test, we might want to mock it or just run it for one item to be sure.
     
     try:
-        affiliate_link = get_ml_affiliate_link(deal['link'])
+        affiliate_link = get_ml_affiliate_link(deal.link)
         print(f"✅ Generated Affiliate Link: {affiliate_link}")
         
         if "mercadolivre.com/sec/" in affiliate_link:
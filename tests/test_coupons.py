@@ -0,0 +1,78 @@
+"""
+Test Coupon Cache
+Coupon badges parsed from cards are cached by item id; the effective discount counts
+toward the gate only when coupons are enabled.
+"""
+import pytest
+from src.config import Config
+from src.coupons import CouponCache, parse_coupon
+from src.models import Deal, SOURCE_ML_COUPON
+from src.scrapers.coupon_scraper import CouponScraper
+from src.scrapers.playwright_scraper import PlaywrightScraper
+from src.services.templates import render_deal
+
+
+def make_deal(coupon=""):
+    return Deal.from_ml("MLB123", "Furadeira Bosch", "https://produto.mercadolivre.com.br/MLB-123",
+                        90.0, 100.0, coupon=coupon)
+
+
+def test_parse_coupon_percent_and_amount():
+    assert parse_coupon("Cupom 15% OFF").percent == 15
+    assert parse_coupon("R$ 20 OFF no cupom").amount == 20.0
+    assert parse_coupon("Cupom disponível") is None
+
+
+def test_badge_is_cached_and_reused_for_bare_cards():
+    cache = CouponCache()
+    with_badge = cache.apply(make_deal("Cupom 10% OFF"))
+
+    assert with_badge.discount == 10  # Card discount kept for the message
+    assert cache.discount(with_badge) == 19  # 90 * 0.9 = 81 vs 100
+    assert cache.get("MLB123").percent == 10
+
+    later = cache.apply(make_deal())
+    assert later.coupon == "Cupom 10% OFF" and cache.discount(later) == 19
+
+
+def test_coupons_only_count_toward_the_gate_when_enabled(monkeypatch):
+    # 10% off R$200 with a 10% coupon: 19% with it, below MIN_DISCOUNT without it
+    deal = Deal.from_ml("MLB9", "Furadeira Bosch", "https://produto.mercadolivre.com.br/MLB-9",
+                        180.0, 200.0, coupon="Cupom 10% OFF")
+    scraper = PlaywrightScraper(fetcher=object())
+
+    monkeypatch.setattr(Config, "ENABLE_COUPONS", False)
+    cards, discounts = scraper._with_coupons([deal])
+    assert discounts is None
+    assert scraper.filter.apply_deals(cards, discounts, check_rating=False)[0] == []
+
+    monkeypatch.setattr(Config, "ENABLE_COUPONS", True)
+    cards, discounts = scraper._with_coupons([deal])
+    kept, _ = scraper.filter.apply_deals(cards, discounts, check_rating=False)
+    assert [d.discount for d in kept] == [10]
+    assert "Desconto: 10%" in render_deal(kept[0], "whatsapp")
+
+
+def test_expired_coupons_are_dropped():
+    cache = CouponCache()
+    cache.put("MLB123", parse_coupon("Cupom 10% OFF", ttl=-1))
+    assert cache.get("MLB123") is None
+    assert cache.discount(cache.apply(make_deal())) == 10
+
+
+def test_cache_is_bounded():
+    cache = CouponCache(max_entries=2)
+    for item_id in ("A", "B", "C"):
+        cache.put(item_id, parse_coupon("5%"))
+    assert len(cache) == 2 and cache.get("A") is None
+
+
+def test_coupon_deals_come_from_offers_already_fetched():
+    offers = [make_deal(), make_deal("Cupom 10% OFF")]
+    coupon_deals = list(CouponScraper.couponed(offers))
+    assert [deal.coupon for deal in coupon_deals] == ["Cupom 10% OFF"]
+    assert coupon_deals[0].source == SOURCE_ML_COUPON and coupon_deals[0].discount == 10
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,65 @@
+"""
+Test Dedup Policy
+Per-source cooldowns from the exact send time, price-drop resends, and the
+batched dedup stage against a real (temporary) database.
+"""
+import os
+import tempfile
+import time
+from dataclasses import replace
+import pytest
+from src import pipeline
+from src.database import Database
+from src.dedup import DedupPolicy
+from src.models import Deal
+
+NOW = 1_700_000_000.0
+HOUR = 3600
+
+
+def make_deal(deal_id, price=100.0, source="Amazon"):
+    deal = Deal.from_amazon(deal_id, f"Furadeira {deal_id}", f"https://example.com/{deal_id}", price, 150.0)
+    return replace(deal, source=source)
+
+
+def test_cooldown_is_per_source_and_counted_from_send_time():
+    policy = DedupPolicy({"Amazon": 168, "Mercado Livre": 72}, default_hours=24, price_drop=0.10)
+    deals = [make_deal("A1"), make_deal("M1", source="Mercado Livre"), make_deal("S1", source="Shopee")]
+    history = {deal.id: (NOW - 80 * HOUR, 100.0) for deal in deals}
+
+    assert policy.evaluate(deals, history, now=NOW).tolist() == [False, True, True]
+    # Sent two minutes ago "yesterday" is still inside every cooldown
+    recent = {deal.id: (NOW - 120, 100.0) for deal in deals}
+    assert not policy.evaluate(deals, recent, now=NOW).any()
+
+
+def test_price_drop_allows_resend_inside_cooldown():
+    policy = DedupPolicy({}, default_hours=72, price_drop=0.10)
+    deals = [make_deal("A1", price=91.0), make_deal("A2", price=90.0), make_deal("A3", price=50.0)]
+    history = {"A1": (NOW - HOUR, 100.0), "A2": (NOW - HOUR, 100.0)}
+
+    assert policy.evaluate(deals, history, now=NOW).tolist() == [False, True, True]
+    assert policy.evaluate([], {}, now=NOW).shape == (0,)
+
+
+def test_dedup_stage_uses_recorded_history():
+    path = os.path.join(tempfile.mkdtemp(), "deals.db")
+    db = Database(path)
+    db.mark_deal_as_sent(make_deal("A1", price=100.0))
+    db.mark_deal_as_sent(make_deal("A2", price=100.0))
+
+    history = db.get_history(["A1", "A3"])
+    assert list(history) == ["A1"]
+    assert history["A1"][1] == 100.0 and time.time() - history["A1"][0] < 60
+
+    deals = [make_deal("A1", price=99.0), make_deal("A2", price=80.0), make_deal("A3"), make_deal("A3")]
+    passed = list(pipeline.dedup(deals, db, batch_size=2))
+    assert [deal.id for deal in passed] == ["A2", "A3"]
+
+    # The resend records the new price for the next comparison
+    db.mark_deal_as_sent(passed[0])
+    assert db.get_last_prices(["A2"]) == {"A2": 80.0}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -10,6 +10,8 @@ import sys
 sys.path.insert(0, '/home/nilsonpmjr/.gemini/antigravity/scratch/sales_finder')
 
 from src.database import Database
+from src.models import Deal
+from src.services.templates import render_deal
 from src.services.ml_link_generator import get_ml_affiliate_link
 from src.config import Config
 
@@ -51,49 +53,41 @@ def test_workflow():
     print(f"\n📦 Processing {len(mock_deals)} mock deals...\n")
     
     for i, deal in enumerate(mock_deals, 1):
-        print(f"[{i}/{len(mock_deals)}] {deal['source']}: {deal['title'][:40]}...")
+        deal = Deal.coerce(deal)
+        print(f"[{i}/{len(mock_deals)}] {deal.source}: {deal.title[:40]}...")
         
         # Step 1: Generate affiliate link for ML deals
-        if 'mercadolivre.com' in deal['link']:
+        if 'mercadolivre.com' in deal.link:
             print(f"  🔗 Generating ML affiliate link...")
-            original = deal['link']
-            affiliate = get_ml_affiliate_link(original)
-            if affiliate != original:
-                deal['link'] = affiliate
+            original = deal.link
+            affiliate = get_ml_affiliate_link(original, deal.title)
+            if affiliate and affiliate != original:
+                deal = deal.with_link(affiliate)
                 print(f"  ✅ Generated: {affiliate}")
             else:
                 print(f"  ⚠️ Using original (generation failed)")
         
         # Step 2: Append Amazon tag
-        elif 'amazon.com' in deal['link']:
+        elif 'amazon.com' in deal.link:
             tag = Config.AMAZON_TAG
-            if '?' in deal['link']:
-                deal['link'] = f"{deal['link']}&tag={tag}"
-            else:
-                deal['link'] = f"{deal['link']}?tag={tag}"
-            print(f"  🏷️ Appended Amazon tag: {deal['link']}")
+            separator = '&' if '?' in deal.link else '?'
+            deal = deal.with_link(f"{deal.link}{separator}tag={tag}")
+            print(f"  🏷️ Appended Amazon tag: {deal.link}")
         
         # Step 3: Check for duplicates
-        is_duplicate = db.is_deal_sent_today(deal['id'])
+        is_duplicate = db.is_deal_sent_today(deal.id)
         if is_duplicate:
             print(f"  ⚠️ Duplicate detected - would skip")
             continue
         else:
             print(f"  ✅ Not a duplicate - would send")
         
-        # Step 4: Format WhatsApp message
-        rating_str = f"⭐ {deal.get('rating', 'N/A')}" if deal.get('rating') else ""
-        msg = f"*OFERTA ENCONTRADA!* 🚀\\n\\n" \
-              f"*{deal['title']}*\\n" \
-              f"💰 De: ~R$ {deal['original_price']}~\\n" \
-              f"🔥 *Por: R$ {deal['price']}*\\n" \
-              f"📉 Desconto: {deal['discount']}%\\n" \
-              f"{rating_str}\\n\\n" \
-              f"🔗 *Link:* {deal['link']}"
+        # Step 4: Format WhatsApp message (the template the bot sends)
+        msg = render_deal(deal, "whatsapp")
         
         print(f"  📱 Message preview:")
         print("  " + "-" * 60)
-        for line in msg.split("\\n"):
+        for line in msg.split("\n"):
             print(f"  {line}")
         print("  " + "-" * 60)
         
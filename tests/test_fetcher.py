@@ -0,0 +1,64 @@
+"""
+Test Tiered Fetcher
+Checks HTTP-first escalation and per-source tier selection without network or browser.
+"""
+from src.config import Config
+from src.scrapers.fetcher import TieredFetcher, TIER_HTTP, TIER_BROWSER
+
+
+class FakeFetcher(TieredFetcher):
+    def __init__(self, http_pages):
+        super().__init__()
+        self.http_pages = list(http_pages)
+        self.calls = []
+
+    def _fetch_http(self, url):
+        self.calls.append(TIER_HTTP)
+        return self.http_pages.pop(0)
+
+    def _fetch_browser(self, url, scroll_selector):
+        self.calls.append(TIER_BROWSER)
+        return '<div class="andes-card"></div>', 200
+
+
+def test_http_success_skips_browser():
+    fetcher = FakeFetcher([('<div class="andes-card"></div>', 200)])
+    result = fetcher.fetch("https://example.com", "ml_offers", ["andes-card"])
+
+    assert result.tier == TIER_HTTP
+    assert fetcher.calls == [TIER_HTTP]
+
+
+def test_blocked_http_escalates_to_browser():
+    fetcher = FakeFetcher([("<html>captcha</html>", 403)])
+    result = fetcher.fetch("https://example.com", "ml_offers", ["andes-card"])
+
+    assert result.tier == TIER_BROWSER
+    assert fetcher.calls == [TIER_HTTP, TIER_BROWSER]
+
+
+def test_missing_markers_escalates():
+    fetcher = FakeFetcher([("<html>empty shell</html>", 200)])
+    result = fetcher.fetch("https://example.com", "ml_offers", ["andes-card"])
+
+    assert result.tier == TIER_BROWSER
+
+
+def test_failing_http_tier_is_demoted_per_source():
+    blocked = [("", 429)] * 50
+    fetcher = FakeFetcher(blocked)
+    for _ in range(Config.FETCH_MIN_SAMPLES):
+        fetcher.fetch("https://example.com", "amazon_search", ["andes-card"])
+
+    assert fetcher.success_rate("amazon_search", TIER_HTTP) == 0.0
+    assert fetcher.tier_order("amazon_search")[0] == TIER_BROWSER
+    # Other sources are judged independently
+    assert fetcher.tier_order("ml_offers")[0] == TIER_HTTP
+
+
+if __name__ == "__main__":
+    test_http_success_skips_browser()
+    test_blocked_http_escalates_to_browser()
+    test_missing_markers_escalates()
+    test_failing_http_tier_is_demoted_per_source()
+    print("✅ Tiered fetcher OK")
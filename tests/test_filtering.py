@@ -0,0 +1,62 @@
+"""
+Test Batch Filtering
+Vectorized quality gates over a page of cards, with per-rule rejection counts.
+"""
+import pytest
+from src.filtering import BatchFilter, any_of, describe, title_flags
+from src.models import Deal
+
+
+def make_deal(i, title="Parafusadeira de impacto Bosch", discount=30, rating=4.6):
+    return Deal.from_ml(f"MLB{i}", title, f"https://example.com/{i}", 70.0,
+                        70.0 / (1 - discount / 100), rating=rating)
+
+
+def test_title_flags_single_pass_matches_substring_check():
+    titles = ["Furadeira BOSCH", "Boneco infantil", "", "Kit churrasco inox\nTramontina", "Trena"]
+    pattern = any_of(["bosch", "infantil", "tramontina"])
+
+    flags = title_flags(titles, pattern)
+
+    assert flags.tolist() == [True, True, False, True, False]
+    assert title_flags([], pattern).tolist() == []
+
+
+def test_rejections_are_charged_to_the_first_failing_rule():
+    gate = BatchFilter()
+    cards = [
+        make_deal(1),                                   # kept
+        make_deal(2, discount=5),                       # discount
+        make_deal(3, rating=3.2),                       # rating
+        make_deal(4, rating=0),                         # unrated
+        make_deal(5, title="Parafusadeira Bosch infantil"),  # negative keyword
+        make_deal(6, title="Parafusadeira Genérica"),   # brand
+        make_deal(7, discount=5, rating=0),             # discount comes first
+    ]
+
+    kept, result = gate.apply_deals(cards, require_rating=True, brand_gate=True)
+
+    assert [d.id for d in kept] == ["MLB1"]
+    assert result.rejected == {"discount": 2, "rating": 1, "unrated": 1, "negative_keyword": 1, "brand": 1}
+    assert result.has_discounts
+    assert describe(result).startswith("1/7 kept")
+    assert gate.stats() == {"seen": 7, "rejected": result.rejected}
+
+
+def test_optional_rules_and_keyword_match():
+    gate = BatchFilter()
+    cards = [make_deal(1, rating=0), make_deal(2, title="Produto qualquer Bosch")]
+
+    kept, _ = gate.apply_deals(cards)
+    assert len(kept) == 2  # Unrated allowed, no keyword gate
+
+    kept, result = gate.apply_deals(cards, match_keywords=True)
+    assert [d.id for d in kept] == ["MLB1"] and result.rejected == {"keyword": 1}
+
+    _, result = gate.apply_deals([make_deal(3, discount=5)])
+    assert not result.has_discounts
+    assert gate.apply([], [], [], [], []).accepted.tolist() == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
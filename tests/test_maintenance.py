@@ -0,0 +1,108 @@
+"""
+Test DB Maintenance
+Old rows move to the monthly archive and out of the live table; hot queries use indexes.
+"""
+import os
+import sqlite3
+import tempfile
+import time
+import pytest
+from src import maintenance
+from src.database import Database
+from src.models import Deal
+
+DAY = 86400
+
+
+def make_deal(i):
+    return Deal.from_amazon(f"B{i}", f"Cooler {i}", f"https://example.com/{i}", 10.0 + i, 20.0 + i)
+
+
+def test_old_rows_are_archived_then_deleted():
+    tmp = tempfile.mkdtemp()
+    path, archive = os.path.join(tmp, "deals.db"), os.path.join(tmp, "archive")
+    db = Database(path)
+    for i in range(50):
+        db.mark_deal_as_sent(make_deal(i))
+    db.flush()
+    with sqlite3.connect(path) as conn:
+        # Half of them were sent 200 days ago
+        conn.execute("UPDATE sent_deals SET sent_ts = sent_ts - ? WHERE CAST(substr(id, 2) AS INTEGER) < 25", (200 * DAY,))
+
+    report = maintenance.run_maintenance(db, archive)
+
+    assert report["archived"] == 25
+    assert len(report["files"]) == 1 and next(iter(report["files"])).startswith("sent_deals-")
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM sent_deals").fetchone()[0] == 25
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    archived = list(maintenance.iter_archive(archive))
+    assert sorted(row["id"] for row in archived) == sorted(f"B{i}" for i in range(25))
+    assert archived[0]["price"] == 10.0 + int(archived[0]["id"][1:])
+
+    # Nothing left to move; a second run appends nothing
+    assert maintenance.run_maintenance(db, archive)["archived"] == 0
+    assert len(list(maintenance.iter_archive(archive))) == 25
+
+
+def test_row_resent_while_archiving_stays_live(monkeypatch):
+    tmp = tempfile.mkdtemp()
+    path, archive = os.path.join(tmp, "deals.db"), os.path.join(tmp, "archive")
+    db = Database(path)
+    db.mark_deal_as_sent(make_deal(0), sync=True)
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE sent_deals SET sent_ts = sent_ts - ?", (200 * DAY,))
+
+    open_archive = maintenance._open_archive
+
+    def resend_then_open(*args):
+        db.mark_deal_as_sent(make_deal(0), sync=True)  # Lands between the SELECT and the DELETE
+        return open_archive(*args)
+
+    monkeypatch.setattr(maintenance, "_open_archive", resend_then_open)
+    assert sum(maintenance.archive_old_deals(path, archive).values()) == 1
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM sent_deals WHERE id = 'B0'").fetchone()[0] == 1
+
+
+def test_compaction_frees_every_page():
+    path = os.path.join(tempfile.mkdtemp(), "deals.db")
+    db = Database(path)
+    maintenance.compact(path)  # Switch to incremental auto-vacuum while small
+    for i in range(2000):
+        db.mark_deal_as_sent(make_deal(i))
+    db.flush()
+    with sqlite3.connect(path) as conn:
+        conn.execute("DELETE FROM sent_deals")
+        freed_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    assert freed_pages > 10
+
+    assert maintenance.compact(path) == freed_pages
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+
+
+def test_retention_never_undercuts_dedup_cooldowns():
+    now = time.time()
+    assert maintenance.retention_cutoff(now, days=1) <= now - 7 * DAY  # Amazon cooldown is 168h
+    assert maintenance.retention_cutoff(now, days=90) == now - 90 * DAY
+
+
+def test_hot_queries_use_indexes():
+    path = os.path.join(tempfile.mkdtemp(), "deals.db")
+    Database(path)
+    with sqlite3.connect(path) as conn:
+        plans = {
+            query: " ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + query, params))
+            for query, params in (
+                ("SELECT * FROM sent_deals ORDER BY sent_at DESC, rowid DESC LIMIT 50", ()),
+                ("SELECT COUNT(*) FROM sent_deals WHERE sent_at = ?", ("2024-01-01",)),
+                ("SELECT rowid, * FROM sent_deals WHERE sent_ts < ?", (0,)),
+            )
+        }
+    for query, plan in plans.items():
+        assert "USING" in plan and "TEMP B-TREE" not in plan, (query, plan)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
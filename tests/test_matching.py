@@ -0,0 +1,70 @@
+"""
+Test Product Matching
+Fingerprints, the MinHash/LSH index, and cross-source dedup in the ranker and pipeline.
+"""
+import pytest
+from src import pipeline
+from src.matching import ProductIndex, SentProducts, fingerprint
+from src.models import Deal
+from src.scoring import DealRanker
+
+
+def test_fingerprint_extracts_brand_and_models():
+    fp = fingerprint("Parafusadeira/Furadeira DeWALT DCD-7781D2 20V Máx com 2 Baterias")
+    assert fp.brand == "DeWalt"
+    assert fp.models == {"dcd7781d2"}          # 20V is a voltage, not a model
+    assert "maxima" not in fp.tokens and "max" in fp.tokens
+    assert fingerprint("Furadeira Black+Decker 500W").brand == "Black+Decker"
+
+
+def test_index_matches_near_duplicates_only():
+    index = ProductIndex()
+    index.add("MLB1", "Furadeira Parafusadeira DeWalt DCD7781D2 20V Max 2 Baterias Maleta")
+    index.add("MLB2", "Garrafa Térmica Stanley Classic 1L Verde")
+    index.add("MLB3", "Parafusadeira Makita DF333DWYE 12V")
+
+    assert index.match("DEWALT DCD7781D2 Parafusadeira/Furadeira 20V") == "MLB1"
+    assert index.match("Garrafa Termica Stanley Classic 1 Litro Verde") == "MLB2"
+    assert index.match("Garrafa Térmica Stanley Quencher 1,18L") is None
+    assert index.match("Parafusadeira Bosch DF333DWYE 12V") is None  # Brands disagree
+    assert index.match("Parafusadeira Makita DF332DWYE 12V") is None  # Different model
+
+    index.remove("MLB1")
+    assert index.match("DEWALT DCD7781D2 Parafusadeira/Furadeira 20V") is None
+    assert len(index) == 2
+
+
+def test_ranker_keeps_the_cheaper_listing():
+    ranker = DealRanker(window=0)
+    ml = Deal.from_ml("MLB1", "Furadeira Parafusadeira DeWalt DCD7781D2 20V Max", "https://x/1", 900.0, 1200.0)
+    amazon = Deal.from_amazon("B0DEWALT", "DEWALT DCD7781D2 Parafusadeira Furadeira 20V Max", "https://x/2",
+                              850.0, 1100.0, rating=4.8)
+    ranker.offer([ml, amazon])
+    assert [deal.id for _, deal in ranker.release(5)] == ["B0DEWALT"]
+
+
+class MemoryDB:
+    def __init__(self, sent):
+        self.sent = sent
+
+    def get_today_deals(self):
+        return self.sent
+
+
+def test_same_product_stage_skips_items_sent_today():
+    sent = Deal.from_ml("MLB1", "Garrafa Térmica Stanley Classic 1L Verde", "https://x/1", 150.0, 200.0)
+    products = SentProducts()
+    deals = [
+        Deal.from_amazon("B1", "Garrafa Termica Stanley Classic 1 Litro Verde", "https://x/2", 140.0, 200.0),
+        Deal.from_amazon("B2", "Cooler Coleman 28QT", "https://x/3", 300.0, 400.0),
+    ]
+
+    kept = list(pipeline.same_product(deals, products, MemoryDB([sent])))
+    assert [deal.id for deal in kept] == ["B2"]
+
+    products.add(kept[0])
+    assert products.match(Deal.from_ml("MLB9", "Cooler Coleman 28QT Azul", "https://x/4", 280.0, 400.0)) == "B2"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,47 @@
+"""
+Test Schema Migrations
+Old databases are upgraded in place (rows kept) and re-running is a no-op.
+"""
+import os
+import sqlite3
+import tempfile
+import pytest
+from src import migrations
+from src.database import Database
+
+
+def test_legacy_table_is_upgraded_in_place():
+    path = os.path.join(tempfile.mkdtemp(), "deals.db")
+    with sqlite3.connect(path) as conn:
+        # Before source/seller/image existed; this used to be dropped
+        conn.execute("CREATE TABLE sent_deals (id TEXT PRIMARY KEY, title TEXT, price REAL, link TEXT, sent_at DATE)")
+        conn.execute("INSERT INTO sent_deals VALUES ('B1', 'Furadeira', 10.0, 'https://example.com/1', '2024-01-02')")
+
+    db = Database(path)
+
+    with sqlite3.connect(path) as conn:
+        assert migrations.current_version(conn) == migrations.LATEST
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(sent_deals)")}
+        indexes = {row[1] for row in conn.execute("PRAGMA index_list(sent_deals)")}
+        sent_ts = conn.execute("SELECT sent_ts FROM sent_deals WHERE id = 'B1'").fetchone()[0]
+    assert {"source", "seller", "image", "sent_ts"} <= columns
+    assert {"idx_sent_deals_history", "idx_sent_deals_sent_at"} <= indexes
+    assert sent_ts == 1704153600.0  # Backfilled from sent_at
+    assert db.get_last_prices(["B1"]) == {"B1": 10.0}  # History survived
+
+
+def test_migrate_is_idempotent_and_adopts_unversioned_dbs(capsys):
+    path = os.path.join(tempfile.mkdtemp(), "deals.db")
+    assert migrations.migrate(path) == migrations.LATEST
+    capsys.readouterr()
+    assert migrations.migrate(path) == migrations.LATEST
+    assert "Migrating" not in capsys.readouterr().out
+
+    # A current-schema DB from before versioning starts at 0 and must not fail
+    with sqlite3.connect(path) as conn:
+        conn.execute("PRAGMA user_version = 0")
+    assert migrations.migrate(path) == migrations.LATEST
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,108 @@
+"""
+Test ML Session Pool
+Account loading (storage state + legacy cookie list), rotation, cooldown and expiry,
+with fake browser contexts instead of Playwright.
+"""
+import json
+import os
+import tempfile
+import pytest
+from src.config import Config
+from src.services.ml_session import MLSessionPool
+
+
+class FakePage:
+    url = "https://www.mercadolivre.com.br/afiliados/linkbuilder"
+
+    def is_closed(self):
+        return False
+
+
+class FakeContext:
+    def __init__(self, state):
+        self.state = state
+        self.closed = False
+
+    def new_page(self):
+        return FakePage()
+
+    def storage_state(self, path=None):
+        with open(path, "w") as f:
+            json.dump(self.state, f)
+        return self.state
+
+    def close(self):
+        self.closed = True
+
+
+class FakePool(MLSessionPool):
+    def __init__(self, *args, **kwargs):
+        self.contexts_built = 0
+        super().__init__(*args, **kwargs)
+
+    def _new_context(self, state):
+        self.contexts_built += 1
+        return FakeContext(state)
+
+
+def make_pool(tmp, accounts=("a", "b"), legacy=None):
+    accounts_dir = os.path.join(tmp, "ml_accounts")
+    os.makedirs(accounts_dir)
+    for name in accounts:
+        with open(os.path.join(accounts_dir, f"{name}.json"), "w") as f:
+            json.dump({"cookies": [{"name": "ssid", "value": name}], "origins": []}, f)
+    legacy_file = os.path.join(tmp, "ml_auth.json")
+    if legacy is not None:
+        with open(legacy_file, "w") as f:
+            json.dump(legacy, f)
+    return FakePool(accounts_dir, legacy_file)
+
+
+def test_legacy_cookie_list_is_loaded_as_default_account():
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = make_pool(tmp, accounts=(), legacy=[{"name": "ssid", "value": "old"}])
+        [account] = pool.accounts
+        assert account.name == "default"
+        assert account.state["cookies"][0]["value"] == "old"
+        assert account.path.endswith(os.path.join("ml_accounts", "default.json"))
+
+
+def test_rotation_reuses_warm_contexts():
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = make_pool(tmp)
+        used = []
+        for _ in range(4):
+            with pool.session() as (account, page):
+                used.append(account.name)
+                pool.report(account, ok=True)
+
+        assert sorted(used) == ["a", "a", "b", "b"]
+        assert used[0] != used[1]
+        assert pool.contexts_built == 2
+
+
+def test_failing_account_cools_down_and_expired_is_skipped():
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = make_pool(tmp)
+        a, b = pool.accounts
+        for _ in range(Config.ML_SESSION_MAX_FAILURES):
+            pool.report(a, ok=False)
+        pool.mark_expired(b)
+
+        with pool.session() as (account, page):
+            assert account is None and page is None
+
+
+def test_refreshed_state_is_saved_back():
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = make_pool(tmp, accounts=("a",))
+        with pool.session() as (account, page):
+            pool._contexts[account.name].state = {"cookies": [{"name": "ssid", "value": "new"}], "origins": []}
+        pool.close()
+
+        with open(account.path) as f:
+            assert json.load(f)["cookies"][0]["value"] == "new"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,72 @@
+"""
+Test ML Embedded State Extraction
+Runs offline against small hand-written pages shaped like ML's preloaded state.
+"""
+import json
+from src.scrapers.ml_state import extract_ml_records, extract_preloaded_state
+
+POLYCARD_STATE = {
+    "pageState": {
+        "initialState": {
+            "items": [
+                {
+                    "polycard": {
+                        "metadata": {"id": "MLB123456", "url": "www.mercadolivre.com.br/parafusadeira/p/MLB123456"},
+                        "pictures": {"pictures": [{"id": "987-MLA"}]},
+                        "components": [
+                            {"type": "title", "title": {"text": "Parafusadeira Bosch 12V"}},
+                            {"type": "price", "price": {
+                                "current_price": {"value": 299.9},
+                                "previous_price": {"value": 399.9},
+                                "discount_label": {"text": "25% OFF"}
+                            }},
+                            {"type": "reviews", "reviews": {"rating_average": 4.8}},
+                            {"type": "seller", "seller": {"text": "{icon} Por Loja Bosch"}},
+                        ]
+                    }
+                }
+            ]
+        }
+    }
+}
+
+
+def test_script_tag_state():
+    html = f'<html><script id="__PRELOADED_STATE__" type="application/json">{json.dumps(POLYCARD_STATE)}</script></html>'
+    records = extract_ml_records(html)
+
+    assert len(records) == 1
+    record = records[0]
+    assert record.id == "MLB123456"
+    assert record.title == "Parafusadeira Bosch 12V"
+    assert record.price == 299.9
+    assert record.original_price == 399.9
+    assert record.discount == 25
+    assert record.rating == 4.8
+    assert record.seller == "Por Loja Bosch"
+    assert record.link.startswith("https://www.mercadolivre.com.br/")
+    assert record.image.endswith("987-MLA-O.webp")
+
+
+def test_inline_assignment_state():
+    results = {"results": [{
+        "id": "MLB-777", "title": "Trena a laser", "price": 100.0,
+        "original_price": 150.0, "permalink": "https://produto.mercadolivre.com.br/MLB-777-trena"
+    }]}
+    html = f"<script>window.__PRELOADED_STATE__ = {json.dumps(results)};</script>"
+    records = extract_ml_records(html)
+
+    assert records[0].id == "MLB777"
+    assert records[0].discount == 33
+
+
+def test_missing_state_falls_back():
+    assert extract_preloaded_state("<html><body>no state</body></html>") is None
+    assert extract_ml_records("<html></html>") is None
+
+
+if __name__ == "__main__":
+    test_script_tag_state()
+    test_inline_assignment_state()
+    test_missing_state_falls_back()
+    print("✅ ML state extraction OK")
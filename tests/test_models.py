@@ -0,0 +1,55 @@
+"""
+Test Deal Model and its Database round trip
+"""
+import os
+import tempfile
+import pytest
+from src.database import Database
+from src.models import Deal
+
+
+def test_ml_constructor_normalizes_and_derives():
+    deal = Deal.from_ml("https://produto.mercadolivre.com.br/MLB-123-furadeira", " Furadeira ",
+                        "produto.mercadolivre.com.br/MLB-123-furadeira", 80.0, discount=20)
+
+    assert deal.id == "MLB123"
+    assert deal.title == "Furadeira"
+    assert deal.original_price == 100.0
+    assert deal.link.startswith("https://")
+    assert deal.seller == "" and deal.coupon == ""
+
+
+def test_amazon_constructor_computes_discount():
+    deal = Deal.from_amazon("B0TEST", "Parafusadeira", "https://www.amazon.com.br/dp/B0TEST", 189.9, 299.9, rating=4.5)
+    assert deal.discount == 36
+    assert deal.source == "Amazon"
+
+
+def test_validation_rejects_bad_records():
+    with pytest.raises(ValueError):
+        Deal.from_amazon("", "No id", "https://x", 10.0)
+    with pytest.raises(ValueError):
+        Deal.from_amazon("B1", "Zero price", "https://x", 0)
+
+
+def test_records_are_slotted_and_immutable():
+    deal = Deal.from_amazon("B1", "Cooler", "https://x", 10.0)
+    assert not hasattr(deal, "__dict__")
+    with pytest.raises(AttributeError):
+        deal.link = "https://y"
+    assert deal.with_link("https://y").link == "https://y"
+
+
+def test_database_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "deals.db"))
+        deal = Deal.from_amazon("B1", "Cooler", "https://x", 10.0, 20.0, rating=4.2)
+        db.mark_deal_as_sent(deal)
+
+        assert db.is_deal_sent_today("B1")
+        assert db.get_today_deals_count() == 1
+        assert db.get_recent_deals()[0] == deal
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
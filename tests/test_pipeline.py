@@ -0,0 +1,116 @@
+"""
+Test Streaming Pipeline
+Composes the stages with an in-memory DB and sender; no network involved.
+"""
+import threading
+import time
+from src import pipeline
+from src.config import Config
+
+
+class MemoryDB:
+    def __init__(self):
+        self.sent = []
+
+    def is_deal_sent_today(self, deal_id):
+        return deal_id in self.sent
+
+    def get_history(self, deal_ids):
+        return {deal_id: (time.time(), 100.0) for deal_id in deal_ids if deal_id in self.sent}
+
+    def get_today_deals_count(self):
+        return len(self.sent)
+
+    def mark_deal_as_sent(self, deal):
+        self.sent.append(deal.id)
+
+
+def make_deal(i, title="Jogo de ferramentas Bosch", source="Amazon"):
+    return {"id": f"D{i}", "title": title, "source": source, "price": 100.0,
+            "original_price": 150.0, "discount": 33, "link": f"https://example.com/{i}"}
+
+
+def test_stages_filter_dedup_and_budget():
+    db = MemoryDB()
+    deals = [
+        make_deal(1),
+        make_deal(1),                                   # repeat in the same run
+        make_deal(2, title="Jogo de ferramentas infantil"),  # negative keyword
+        make_deal(3, source="Mercado Livre"),          # link generation fails -> discarded
+    ] + [make_deal(i) for i in range(4, 40)]
+
+    stream = pipeline.normalize(deals)
+    stream = pipeline.exclude_negative(stream)
+    stream = pipeline.dedup(stream, db)
+    stream = pipeline.within_budget(stream, db)
+    stream = pipeline.affiliate_links(stream, lambda link, title: None)
+    stream = pipeline.dispatch(stream, db.mark_deal_as_sent)
+    sent = pipeline.run(stream)
+
+    assert sent == Config.MAX_DAILY_DEALS
+    assert db.sent[0] == "D1"
+    assert "D2" not in db.sent and "D3" not in db.sent
+    assert len(set(db.sent)) == len(db.sent)
+
+
+def test_prefetch_streams_first_item_before_source_finishes():
+    release = threading.Event()
+
+    def slow_source():
+        yield make_deal(1)
+        release.wait(5)
+        yield make_deal(2)
+
+    stream = pipeline.prefetch(slow_source(), maxsize=1)
+    first = next(stream)
+    assert first["id"] == "D1"
+    release.set()
+    assert [d["id"] for d in stream] == ["D2"]
+
+
+def test_prefetch_stops_and_closes_source_when_consumer_stops():
+    closed = threading.Event()
+
+    def endless_source():
+        try:
+            i = 0
+            while True:
+                i += 1
+                yield make_deal(i)
+        finally:
+            closed.set()
+
+    stream = pipeline.prefetch(endless_source(), maxsize=2)
+    assert next(stream)["id"] == "D1"
+    stream.close()
+    assert closed.wait(5)
+
+
+def test_chained_sources_are_closed_on_the_producer_thread():
+    closed = {}
+
+    def source(name):
+        try:
+            while True:
+                yield make_deal(1)
+        finally:
+            closed[name] = threading.current_thread()
+
+    later = source("later")
+    stream = pipeline.prefetch(pipeline.chain(source("first"), later), maxsize=1)
+    assert next(stream)["id"] == "D1"
+    stream.close()
+
+    deadline = time.time() + 5
+    while "first" not in closed and time.time() < deadline:
+        time.sleep(0.01)
+    assert closed["first"] is not threading.main_thread()
+    assert later.gi_frame is None  # Never started, but closed all the same
+
+
+if __name__ == "__main__":
+    test_stages_filter_dedup_and_budget()
+    test_prefetch_streams_first_item_before_source_finishes()
+    test_prefetch_stops_and_closes_source_when_consumer_stops()
+    test_chained_sources_are_closed_on_the_producer_thread()
+    print("✅ Pipeline OK")
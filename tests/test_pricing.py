@@ -0,0 +1,42 @@
+"""
+Test Price Parsing
+BRL strings, split price spans and page batches to integer cents.
+"""
+import pytest
+from src.pricing import (discount_percent, parse_cents, parse_many, parse_parts,
+                         parse_percent, parse_rating, to_cents)
+
+
+def test_parse_cents_brl_formats():
+    assert parse_cents("R$ 1.299,90") == 129990
+    assert parse_cents("1.299") == 129900          # Thousands, not R$ 1,30
+    assert parse_cents("R$\xa089,9") == 8990
+    assert parse_cents("12.345.678,01") == 1234567801
+    assert parse_cents("49") == 4900
+    assert parse_cents("sem preço") is None
+
+
+def test_parse_parts_and_batch():
+    assert parse_parts("1.299,", "90") == 129990   # Amazon a-price-whole + a-price-fraction
+    assert parse_parts("1.299") == 129900
+    assert parse_many(["R$ 10,50", None, "", "2.000", "de R$ 5,00 por R$ 3,00"]) == [1050, None, None, 200000, 500]
+    assert parse_many(["90", "931,00"]) == [9000, 93100]  # Never joined across strings
+    assert parse_many([]) == []
+
+
+def test_discount_is_exact_on_cents():
+    assert discount_percent(to_cents(71.0), to_cents(100.0)) == 29  # float math gives 28
+    assert discount_percent(18990, 29990) == 36
+    assert discount_percent(100, 100) == 0 and discount_percent(100, 0) == 0
+
+
+def test_percent_and_rating():
+    assert parse_percent("20% OFF") == 20
+    assert parse_percent("OFF") is None
+    assert parse_rating("4,5 de 5 estrelas") == 4.5
+    assert parse_rating("4.8") == 4.8
+    assert parse_rating("") == 0.0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
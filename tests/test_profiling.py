@@ -0,0 +1,73 @@
+"""
+Test Profiling Hooks
+Armed runs write timestamped cProfile / collapsed-stack files; unarmed runs are untouched.
+"""
+import pstats
+import tempfile
+import threading
+import time
+import pytest
+from src.profiling import JobProfiler
+
+
+def busy_job():
+    deadline = time.perf_counter() + 0.1
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+    return "done"
+
+
+def test_only_armed_runs_are_profiled():
+    with tempfile.TemporaryDirectory() as tmp:
+        profiler = JobProfiler(tmp)
+        assert profiler.run(busy_job) == "done"
+        assert profiler.list_files() == []
+
+        profiler.arm("cprofile", runs=1)
+        assert profiler.run(busy_job) == "done"
+        profiler.run(busy_job)
+
+        files = profiler.list_files()
+        assert len(files) == 1 and files[0]["name"].endswith("-cprofile.pstats")
+        stats = pstats.Stats(f"{tmp}/{files[0]['name']}")
+        assert any(func[2] == "busy_job" for func in stats.stats)
+
+
+def threaded_job():
+    producer = threading.Thread(target=busy_job)
+    producer.start()
+    producer.join()
+
+
+def test_cprofile_covers_threads_started_by_the_job():
+    # Scraping runs in the prefetch producer thread, not the one calling job()
+    with tempfile.TemporaryDirectory() as tmp:
+        profiler = JobProfiler(tmp)
+        profiler.arm("cprofile", runs=1)
+        profiler.run(threaded_job)
+
+        [entry] = profiler.list_files()
+        stats = pstats.Stats(f"{tmp}/{entry['name']}")
+        assert {"threaded_job", "busy_job"} <= {func[2] for func in stats.stats}
+
+
+def test_sampling_profile_writes_collapsed_stacks():
+    with tempfile.TemporaryDirectory() as tmp:
+        profiler = JobProfiler(tmp)
+        profiler.arm("sample", runs=1)
+        profiler.run(busy_job)
+
+        [entry] = profiler.list_files()
+        with open(f"{tmp}/{entry['name']}") as f:
+            lines = f.read().splitlines()
+        assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+        assert any("busy_job" in line for line in lines)
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        JobProfiler().arm("perf")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,82 @@
+"""
+Test Deal Scoring
+Batch scores, the bounded heap, and the rank stage releasing the best deals first.
+"""
+import pytest
+from src import pipeline
+from src.models import Deal
+from src.scoring import DealRanker, score_batch
+
+
+class MemoryDB:
+    def __init__(self, last_prices=None, sent_today=0):
+        self.last_prices = last_prices or {}
+        self.sent_today = sent_today
+
+    def get_last_prices(self, deal_ids):
+        return {i: self.last_prices[i] for i in deal_ids if i in self.last_prices}
+
+    def get_today_deals_count(self):
+        return self.sent_today
+
+
+def make_deal(i, title="Furadeira Genérica", price=100.0, discount=20, rating=4.5):
+    # A distinct model number per id, so the listings aren't matched as one product
+    return Deal.from_amazon(f"B{i:04d}", f"{title} FG{i:03d}", f"https://example.com/{i}", price,
+                            price / (1 - discount / 100), rating=rating)
+
+
+def test_score_rewards_discount_brand_and_price_drop():
+    plain = make_deal(1)
+    scores = score_batch([
+        plain,
+        make_deal(2, discount=50),
+        make_deal(3, title="Parafusadeira de impacto Makita"),
+        make_deal(1, price=80.0, discount=36),
+    ], {"B0001": 120.0})
+
+    assert scores.shape == (4,)
+    assert all(0 <= s <= 1 for s in scores)
+    assert scores[1] > scores[0]
+    assert scores[2] > scores[0]  # Tier 1 brand + tools category
+    assert scores[3] > scores[1]  # Bigger discount and cheaper than last sent
+
+
+def test_ranker_heap_is_bounded_and_keeps_the_best():
+    ranker = DealRanker(capacity=3, window=0)
+    ranker.offer([make_deal(i, discount=10 + i) for i in range(10)])
+
+    assert len(ranker) == 3
+    released = ranker.release(2)
+    assert [deal.id for _, deal in released] == ["B0009", "B0008"]
+    assert len(ranker) == 0
+
+
+def test_quota_spreads_budget_over_remaining_windows():
+    ranker = DealRanker(window=3600)
+    assert DealRanker(window=0).quota(15) == 15
+    assert 1 <= ranker.quota(15) <= 15
+    assert ranker.quota(0) == 0
+
+
+def test_rank_stage_releases_best_first_within_budget():
+    deals = [make_deal(i, discount=15 + (i * 7) % 50) for i in range(30)]
+    ranker = DealRanker(window=0)
+
+    ranked = list(pipeline.rank(deals, ranker, MemoryDB(sent_today=10), batch_size=8))
+
+    assert len(ranked) == 5  # MAX_DAILY_DEALS (15) - 10 already sent
+    assert [d.discount for d in ranked] == sorted((d.discount for d in deals), reverse=True)[:5]
+
+
+def test_rank_stage_holds_deals_until_window_closes():
+    ranker = DealRanker(window=3600)
+    assert list(pipeline.rank([make_deal(1)], ranker, MemoryDB())) == []
+    assert len(ranker) == 1
+
+    ranker.window_start -= 3600
+    assert [d.id for d in pipeline.rank([make_deal(2, discount=40)], ranker, MemoryDB())][0] == "B0002"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,95 @@
+"""
+Test Shopee Source
+Pagination, batched short links and the scraper gates against a canned GraphQL endpoint.
+"""
+import time
+from src.scrapers.shopee import ShopeeScraper
+from src.services.shopee_graphql_client import RateLimiter, ShopeeGraphQLClient
+
+
+def product(item_id, discount=30, rating=4.6):
+    return {"itemId": item_id, "productName": f"Lanterna tática {item_id}", "priceMin": "59.90",
+            "priceDiscountRate": discount, "ratingStar": str(rating), "shopName": "Loja",
+            "imageUrl": "https://img", "productLink": f"https://shopee.com.br/p/{item_id}",
+            "offerLink": f"https://s.shopee.com.br/offer{item_id}"}
+
+
+class FakeClient(ShopeeGraphQLClient):
+    """Answers productOfferV2 from canned pages and aliased generateShortLink mutations."""
+
+    def __init__(self, pages):
+        super().__init__("app", "secret")
+        self.pages = pages
+        self.queries = []
+
+    def _post(self, query, variables=None):
+        self.queries.append((query, dict(variables or {})))
+        if query.lstrip().startswith("mutation"):
+            return {"data": {
+                f"l{i}": {"shortLink": f"https://s.shopee.com.br/short{i}"}
+                for i in range(len([k for k in variables if k.startswith("u")]))
+            }}
+        page = variables["page"]
+        return {"data": {"productOfferV2": {
+            "nodes": self.pages[page - 1],
+            "pageInfo": {"page": page, "hasNextPage": page < len(self.pages)},
+        }}}
+
+
+def test_pagination_follows_has_next_page_and_respects_max_pages():
+    client = FakeClient([[product(1)], [product(2)], [product(3)]])
+    assert [n["itemId"] for n in client.iter_product_offers("x", max_pages=5)] == [1, 2, 3]
+    assert [n["itemId"] for n in client.iter_product_offers("x", max_pages=2)] == [1, 2]
+
+
+def test_short_links_are_batched_with_aliases():
+    client = FakeClient([])
+    urls = [f"https://shopee.com.br/p/{i}" for i in range(5)]
+    links = client.generate_short_links(urls + urls[:1], batch_size=3)
+
+    mutations = [q for q, _ in client.queries]
+    assert len(mutations) == 2
+    assert "l2: generateShortLink" in mutations[0]
+    assert len(links) == 5
+
+
+def test_scraper_gates_and_builds_deals():
+    client = FakeClient([[product(1), product(2, discount=5), product(3, rating=3.0)]])
+    deals = list(ShopeeScraper(client).iter_search(["Lanterna", "Cooler"], max_pages=1))
+
+    assert [d.id for d in deals] == ["SHP1", "SHP1"]
+    deal = deals[0]
+    assert deal.source == "Shopee"
+    assert deal.link == "https://s.shopee.com.br/short0"
+    assert deal.discount == 30 and deal.original_price > deal.price
+
+
+def test_repeated_queries_are_served_from_cache():
+    client = FakeClient([[product(1)]])
+    for _ in range(3):
+        list(client.iter_product_offers("x"))
+        client.generate_short_links(["https://shopee.com.br/p/1"])
+
+    assert len(client.queries) == 2
+    assert client.cache_stats()["hits"] == 2
+
+
+def test_cache_expires_with_offer_period():
+    ended = dict(product(1), periodEndTime=int(time.time()) - 1)
+    client = FakeClient([[ended]])
+    list(client.iter_product_offers("x"))
+    list(client.iter_product_offers("x"))
+    assert len(client.queries) == 2
+
+
+def test_rate_limiter_spaces_requests():
+    limiter = RateLimiter(rate=50, burst=1)
+    start = time.monotonic()
+    for _ in range(4):
+        limiter.acquire()
+    assert time.monotonic() - start >= 0.05
+
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__])
@@ -0,0 +1,47 @@
+"""
+Test Startup
+Importing src.main is cheap: no scheduler, no Playwright, singletons built on demand.
+"""
+import os
+import sys
+import tempfile
+import pytest
+from src.config import Config
+
+
+@pytest.fixture
+def main_module(monkeypatch):
+    tmp = tempfile.mkdtemp()
+    monkeypatch.setattr(Config, "START_SCHEDULER", False)
+    monkeypatch.setattr(Config, "DB_PATH", os.path.join(tmp, "deals.db"))
+    sys.modules.pop("src.main", None)
+    from src import main
+    yield main
+    sys.modules.pop("src.main", None)
+
+
+def test_import_builds_nothing_heavy(main_module):
+    assert not main_module.scraper.ready
+    assert not main_module.link_generator.ready
+    assert "playwright.sync_api" not in sys.modules
+
+
+def test_healthz_reports_web_and_worker_separately(main_module):
+    client = main_module.app.test_client()
+    assert client.get("/healthz").json["worker"] == "disabled"
+
+    main_module.warm_up()
+    health = client.get("/healthz").json
+    assert health["web"] == "ready" and health["worker"] == "warmed"
+    assert main_module.scraper.ready
+
+
+def test_lazy_singleton_is_built_once(main_module):
+    calls = []
+    lazy = main_module.Lazy(lambda: calls.append(1) or object())
+    assert lazy.get() is lazy.get()
+    assert calls == [1]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
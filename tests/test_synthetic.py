@@ -0,0 +1,58 @@
+"""
+Test Synthetic Scraper
+Seeded stream: reproducible, exact volume, and the requested duplicate/noise mix.
+"""
+import pytest
+from src.config import Config
+from src.scrapers.synthetic import SyntheticScraper
+
+
+def test_same_seed_same_stream():
+    first = list(SyntheticScraper(seed=7, volume=500).iter_deals())
+    second = list(SyntheticScraper(seed=7, volume=500).iter_deals())
+    other = list(SyntheticScraper(seed=8, volume=500).iter_deals())
+
+    assert first == second
+    assert first != other
+    assert len(first) == 500
+
+
+def test_duplicate_and_negative_ratios():
+    deals = list(SyntheticScraper(seed=1, volume=5000, duplicate_ratio=0.3, negative_ratio=0.1).iter_deals())
+
+    duplicates = 1 - len({d.id for d in deals}) / len(deals)
+    assert 0.25 < duplicates < 0.35
+
+    negatives = sum(any(neg in d.title.lower() for neg in Config.NEGATIVE_KEYWORDS) for d in deals)
+    assert 0.05 < negatives / len(deals) < 0.15
+
+
+def test_deals_look_like_marketplace_records():
+    deals = list(SyntheticScraper(seed=3, volume=1000, duplicate_ratio=0).iter_deals())
+
+    assert {d.source for d in deals} == {"Mercado Livre", "Amazon", "Shopee"}
+    assert all(d.price > 0 and 0 <= d.discount <= 100 for d in deals)
+    assert any(d.discount >= Config.MIN_DISCOUNT for d in deals)
+    assert any(keyword in deals[0].title for keyword in Config.KEYWORDS)
+
+
+def test_filtered_stream_passes_the_quality_gates():
+    scraper = SyntheticScraper(seed=5, volume=2000)
+    deals = list(scraper.iter_filtered())
+
+    assert 0 < len(deals) < 2000 * Config.SYNTHETIC_DISCOUNT_RATIO
+    assert all(d.discount >= Config.MIN_DISCOUNT and d.rating > 0 for d in deals)
+    assert scraper.filter.stats()["seen"] == 2000
+    assert {"discount", "unrated"} <= set(scraper.filter.stats()["rejected"])
+
+
+def test_every_seed_yields_valid_deals():
+    # Item number 0 used to become an empty Shopee id and kill the stream
+    for seed in range(200):
+        assert len(list(SyntheticScraper(seed=seed, volume=5).iter_deals())) == 5
+        for query in Config.KEYWORDS[:3]:
+            assert all(deal.id for deal in SyntheticScraper(seed=seed).search(query))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
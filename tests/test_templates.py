@@ -0,0 +1,67 @@
+"""
+Test Message Templates
+"""
+import pytest
+from src.models import Deal
+from src.services.templates import MessageTemplate, format_brl, render_deal
+
+
+def make_deal(**overrides):
+    fields = dict(asin="B1", title="Parafusadeira Bosch", link="https://x", price=1299.9, original_price=1999.0)
+    fields.update(overrides)
+    return Deal.from_amazon(**fields)
+
+
+def test_whatsapp_message_drops_empty_optional_lines():
+    text = render_deal(make_deal(), "whatsapp")
+
+    assert "*Parafusadeira Bosch*" in text
+    assert "~R$ 1.999,00~" in text and "*Por: R$ 1.299,90*" in text
+    assert "⭐" not in text and "Cupom" not in text
+    assert "⭐ 4.5" in render_deal(make_deal(rating=4.5), "whatsapp")
+
+
+def test_channels_render_their_own_markup():
+    deal = make_deal()
+    assert "<b>Parafusadeira Bosch</b>" in render_deal(deal, "telegram")
+    plain = render_deal(deal, "plain")
+    assert "*" not in plain and "<b>" not in plain
+    with pytest.raises(ValueError):
+        render_deal(deal, "sms")
+
+
+def test_render_is_cached_per_deal_version():
+    deal = make_deal(asin="B-cache")
+    first = render_deal(deal)
+    assert render_deal(make_deal(asin="B-cache")) is first
+    assert "https://y" in render_deal(deal.with_link("https://y"))
+
+
+def test_compiled_template_and_brl_format():
+    template = MessageTemplate("{title} {price:>6}\n?x {coupon}")
+    assert template.render({"title": "A", "price": "9,90", "coupon": ""}) == "A   9,90"
+    assert format_brl(1234567.5) == "1.234.567,50"
+
+
+def test_whatsapp_service_posts_the_rendered_message(monkeypatch):
+    # whatsapp-service/index.js rejects payloads without a message
+    from src.services import whatsapp
+
+    posted = {}
+
+    class Response:
+        status_code = 200
+
+    def fake_post(url, json=None, **kwargs):
+        posted.update(json)
+        return Response()
+
+    monkeypatch.setattr(whatsapp.requests, "post", fake_post)
+    deal = make_deal()
+    assert whatsapp.WhatsAppService().send_deal(deal)
+    assert posted["message"] == render_deal(deal, "whatsapp")
+    assert posted["deal"]["id"] == "B1"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
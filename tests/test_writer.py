@@ -0,0 +1,90 @@
+"""
+Test Write Buffer
+Sends are group-committed on size/time/demand, and reads see them before they land.
+"""
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+import pytest
+from src.database import Database
+from src.models import Deal
+
+
+def make_deal(i, price=10.0):
+    return Deal.from_amazon(f"B{i}", f"Cooler {i}", f"https://example.com/{i}", price, 20.0)
+
+
+def rows_on_disk(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM sent_deals").fetchone()[0]
+
+
+def test_pending_sends_are_visible_then_flushed_in_one_batch():
+    path = os.path.join(tempfile.mkdtemp(), "deals.db")
+    db = Database(path)
+    db.writes.flush_seconds = 60
+    for i in range(3):
+        db.mark_deal_as_sent(make_deal(i))
+    db.mark_deal_as_sent(make_deal(0, price=8.0))  # Resend replaces the pending row
+
+    assert rows_on_disk(path) == 0
+    assert db.get_today_deals_count() == 3
+    assert db.is_deal_sent_today("B1")
+    assert db.get_last_prices(["B0", "B9"]) == {"B0": 8.0}
+
+    assert db.flush() == 3
+    assert rows_on_disk(path) == 3
+    assert db.writes.stats() == {"pending": 0, "flushes": 1, "rows_written": 3}
+    # A same-day resend already on disk is still counted once
+    db.mark_deal_as_sent(make_deal(1))
+    assert db.get_today_deals_count() == 3
+
+
+def test_flush_on_size_time_and_sync():
+    path = os.path.join(tempfile.mkdtemp(), "deals.db")
+    db = Database(path)
+    db.writes.batch_size, db.writes.flush_seconds = 3, 0.05
+
+    db.mark_deal_as_sent(make_deal(0))
+    time.sleep(0.3)
+    assert rows_on_disk(path) == 1  # Time threshold
+
+    db.writes.flush_seconds = 60
+    for i in range(1, 4):
+        db.mark_deal_as_sent(make_deal(i))
+    assert rows_on_disk(path) == 4  # Size threshold
+
+    db.mark_deal_as_sent(make_deal(4), sync=True)
+    assert rows_on_disk(path) == 5
+
+
+def test_pending_sends_are_written_on_sigterm():
+    path = os.path.join(tempfile.mkdtemp(), "deals.db")
+    script = textwrap.dedent(f"""
+        import time
+        from src.database import Database
+        from src.models import Deal
+        from src.writer import flush_on_sigterm
+        flush_on_sigterm()
+        db = Database({path!r})
+        db.writes.flush_seconds = 60
+        db.mark_deal_as_sent(Deal.from_amazon("B1", "Cooler 1", "https://example.com/1", 10.0, 20.0))
+        print("ready", flush=True)
+        time.sleep(60)
+    """)
+    bot = subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.PIPE, text=True,
+                           cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert "ready\n" in iter(bot.stdout.readline, "")  # After the migration log lines
+    assert rows_on_disk(path) == 0
+    bot.send_signal(signal.SIGTERM)
+    assert bot.wait(timeout=10) == 128 + signal.SIGTERM
+    assert rows_on_disk(path) == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -57,8 +57,9 @@ function startService() {
     app.post('/send-deal', async (req, res) => {
         if (!client) return res.status(503).json({ error: 'WhatsApp not ready' });
 
-        const { deal } = req.body;
-        if (!deal) return res.status(400).json({ error: 'Missing deal data' });
+        // The message is rendered by the Python side (src/services/templates.py)
+        const { deal, message } = req.body;
+        if (!deal || !message) return res.status(400).json({ error: 'Missing deal data' });
 
         try {
             let groupsToSend = [];
@@ -87,14 +88,6 @@ function startService() {
                 groupsToSend.push({ id: { _serialized: '120363423459795612@g.us' }, name: 'Hardcoded Backup' });
             }
 
-            const message = `*OFERTA ENCONTRADA!* 🚀\n\n` +
-                `*${deal.title}*\n` +
-                `💰 De: ~R$ ${deal.original_price}~\n` +
-                `🔥 *Por: R$ ${deal.price}*\n` +
-                `📉 Desconto: ${deal.discount}%\n` +
-                `⭐ ${deal.rating}\n\n` +
-                `🔗 *Link:* ${deal.link}`;
-
             const results = [];
             for (const group of groupsToSend) {
                 console.log(`Sending to group: ${group.name} (${group.id._serialized})`);